@@ -0,0 +1,365 @@
+"""
+bench.py
+--------
+Micro-benchmarks for the in-memory engines. Run one with:
+
+    python bench.py <name> [--n N]
+
+Prints wall-clock timings; nothing here is imported by the apps.
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import Callable, Dict
+
+
+def _timed(label: str, fn: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<40} {dt * 1000:10.1f} ms")
+    return dt
+
+
+# ---------------------------
+# social_style: text vectorization
+# ---------------------------
+def bench_tokenizer(n: int) -> None:
+    import numpy as np
+    from social_style import VOCAB, text_to_vec, texts_to_matrix
+
+    rng = random.Random(0)
+    filler = ["nice", "great", "condition", "size", "worn", "once", "10", "-", "&"]
+    words = VOCAB + filler * 4
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(3, 14))).title() for _ in range(n)]
+
+    per_text = _timed(f"text_to_vec x {n}", lambda: [text_to_vec(t) for t in texts])
+    batched = _timed(f"texts_to_matrix({n})", lambda: texts_to_matrix(texts))
+    print(f"speedup: {per_text / batched:.1f}x")
+
+    sample = texts[:1000]
+    assert np.allclose(np.stack([text_to_vec(t) for t in sample]), texts_to_matrix(sample), atol=1e-6)
+
+
+# ---------------------------
+# social_style: listing memory, dict vs columnar storage
+# ---------------------------
+def bench_memory(n: int) -> None:
+    import gc
+    import tracemalloc
+    from social_style import COLORS, STYLES, TYPES, SocialApp
+
+    rng = random.Random(0)
+    words = TYPES + STYLES + COLORS
+    rows = [(1 + i % 100, " ".join(rng.sample(words, 3)).title(), " ".join(rng.sample(words, 6)), "public")
+            for i in range(n)]
+    for storage in ("dict", "columnar"):
+        gc.collect()
+        tracemalloc.start()
+        app = SocialApp(storage=storage)
+        for i in range(100):
+            app.add_user(f"user {i}", "usyd")
+        before = tracemalloc.get_traced_memory()[0]
+        app.add_listings(rows)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(f"{storage:<10} {n} listings: {used / 1e6:8.1f} MB, {used / n:6.0f} B/listing")
+        del app
+
+
+# ---------------------------
+# ratings.py: batch summaries vs one request per card
+# ---------------------------
+def bench_summaries(n: int) -> None:
+    from fastapi.testclient import TestClient
+    import ratings
+
+    eng = ratings.eng
+    rng = random.Random(0)
+    owner = eng.add_user("Owner", "USYD")
+    raters = [eng.add_user(f"r{i}", "USYD") for i in range(50)]
+    lids = [eng.add_listing(owner, f"item {i}") for i in range(max(n, 1000))]
+    for lid in lids:
+        for r in rng.sample(raters, rng.randint(0, 10)):
+            eng.add_or_update_review(r, lid, rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5))
+
+    client = TestClient(ratings.app)
+    for size in (100, 1000):
+        ids = lids[:size]
+        per_card = _timed(f"{size} x GET /listings/{{id}}/summary",
+                          lambda: [client.get(f"/listings/{lid}/summary").json() for lid in ids])
+        resp = []
+        batch = _timed(f"POST /listings/summaries ({size} ids)",
+                       lambda: resp.append(client.post("/listings/summaries", json={"listing_ids": ids})))
+        print(f"  response: {len(resp[0].content) / 1024:.1f} KiB, speedup {per_card / batch:.1f}x")
+
+
+# ---------------------------
+# customer_reviews: bulk ingest vs per-call loop
+# ---------------------------
+def bench_ingest(n: int) -> None:
+    from customer_reviews import RatingsEngine
+
+    def setup():
+        eng = RatingsEngine()
+        owners = [eng.add_user(f"o{i}", "USYD") for i in range(100)]
+        raters = [eng.add_user(f"r{i}", "USYD") for i in range(5000)]
+        listings = [eng.add_listing(owners[i % 100], f"item {i}") for i in range(2000)]
+        return eng, raters, listings
+
+    rng = random.Random(0)
+    eng, raters, listings = setup()
+    rows = [{"rater_id": rng.choice(raters), "listing_id": rng.choice(listings),
+             "material_construction": rng.randint(1, 5), "performance_durability": rng.randint(1, 5),
+             "aesthetics_comfort": rng.randint(1, 5), "comment": "ok"} for _ in range(n)]
+
+    def loop():
+        for r in rows:
+            eng.add_or_update_review(r["rater_id"], r["listing_id"], r["material_construction"],
+                                     r["performance_durability"], r["aesthetics_comfort"], r["comment"])
+    per_call = _timed(f"add_or_update_review x {n}", loop)
+    expected = eng.get_listing_summaries(listings)[0]
+
+    eng, _, _ = setup()
+    report = []
+    bulk = _timed(f"ingest_reviews({n})", lambda: report.append(eng.ingest_reviews(rows)))
+    print(f"speedup: {per_call / bulk:.1f}x  (applied {report[0].applied}, rejected {len(report[0].rejected)})")
+    got = eng.get_listing_summaries(listings)[0]
+    assert all(got[l]["count"] == expected[l]["count"] and got[l]["overall_score"] == expected[l]["overall_score"]
+               for l in listings)
+
+
+# ---------------------------
+# rent_tracker: availability window query
+# ---------------------------
+def bench_availability(n: int) -> None:
+    from datetime import datetime, timedelta
+    from rent_tracker import ACTIVE_STATUSES, RentalService, Repo
+
+    repo = Repo()
+    service = RentalService(repo)
+    rng = random.Random(0)
+    day0 = datetime(2025, 1, 1)
+    start, end = day0 + timedelta(days=180), day0 + timedelta(days=183)
+    items = [repo.create_item(owner_id=i % 1000, title=f"item {i}").id for i in range(n)]
+    for item_id in items:
+        t = day0
+        for _ in range(rng.randint(0, 12)):
+            t += timedelta(days=rng.randint(0, 20))
+            stop = t + timedelta(days=rng.randint(1, 7))
+            r = repo.create_rental(item_id, renter_id=1, start=t, end=stop)
+            if stop < start:   # history: completed before the query window
+                service.accept(r.id); service.handover(r.id); service.mark_returned(r.id)
+            t = stop
+    res = []
+    _timed(f"available_items over {n} items ({len(repo.rentals)} rentals)",
+           lambda: res.append(repo.available_items(start, end)))
+    def scan():
+        busy = {r.item_id for r in repo.rentals.values()
+                if r.status in ACTIVE_STATUSES and r.start_date < end and start < r.end_date}
+        return [it for i, it in repo.items.items() if i not in busy]
+    _timed("full scan of Repo.rentals", scan)
+    print(f"  {len(res[0])} free")
+
+
+# ---------------------------
+# rental_events: startup replay, full log vs snapshot + tail
+# ---------------------------
+def bench_events(n: int) -> None:
+    import shutil
+    import tempfile
+    from datetime import datetime, timedelta
+    from rent_tracker import RentalService
+    from rental_events import EventSourcedRepo
+    from review_store import ReviewStore
+
+    rng = random.Random(0)
+    d = tempfile.mkdtemp()
+    try:
+        store = ReviewStore(d, snapshot_every=n * 10)   # no automatic snapshots while loading
+        repo = EventSourcedRepo(store=store)
+        service = RentalService(repo)
+        items = [repo.create_item(owner_id=i % 500, title=f"item {i}").id for i in range(max(1, n // 40))]
+        t = {i: datetime(2024, 1, 1) for i in items}
+        events = len(items)
+        while events < n:
+            item_id = rng.choice(items)
+            start = t[item_id] + timedelta(days=rng.randint(0, 5))
+            t[item_id] = start + timedelta(days=rng.randint(1, 4))
+            r = repo.create_rental(item_id, renter_id=rng.randint(1, 10_000), start=start, end=t[item_id])
+            service.accept(r.id); service.handover(r.id); service.mark_returned(r.id)
+            events += 4
+        store.close()
+        print(f"{events} events, {len(repo.rentals)} rentals")
+        _timed("restore: replay full log", lambda: EventSourcedRepo(store=ReviewStore(d)))
+        repo = EventSourcedRepo(store=ReviewStore(d))
+        repo._store.checkpoint(repo); repo._store.close()
+        _timed("restore: compacted snapshot", lambda: EventSourcedRepo(store=ReviewStore(d)))
+    finally:
+        shutil.rmtree(d)
+
+
+# ---------------------------
+# rent_tracker: batched transitions vs per-call loop
+# ---------------------------
+def bench_batch(n: int) -> None:
+    import os
+    import shutil
+    import tempfile
+    from datetime import datetime, timedelta
+    from rent_tracker import Repo, RentalService
+    from sqlite_repo import SqliteRepo
+
+    def setup(repo, count):
+        items = [repo.create_item(owner_id=1, title=f"item {i}").id for i in range(max(1, count // 10))]
+        t0 = datetime(2025, 1, 1)
+        return [repo.create_rental(items[k % len(items)], renter_id=1, start=t0 + timedelta(days=k // len(items)),
+                                   end=t0 + timedelta(days=k // len(items), hours=12)).id for k in range(count)]
+
+    def run(label, make_repo, count):
+        loop_service = RentalService(make_repo()); loop_ids = setup(loop_service.repo, count)
+        batch_service = RentalService(make_repo()); batch_ids = setup(batch_service.repo, count)
+        def loop():
+            for i in loop_ids: loop_service.accept(i)
+            for i in loop_ids: loop_service.handover(i)
+            for i in loop_ids: loop_service.mark_returned(i)
+        def batch():
+            batch_service.accept_many(batch_ids)
+            batch_service.handover_many(batch_ids)
+            batch_service.mark_returned_many(batch_ids)
+        per_call = _timed(f"{label}: per-call x {count} x 3", loop)
+        batched = _timed(f"{label}: *_many({count}) x 3", batch)
+        print(f"  speedup: {per_call / batched:.1f}x")
+
+    run("Repo", Repo, n)
+    d = tempfile.mkdtemp()
+    try:
+        paths = iter(range(2))
+        count = min(n, 50_000)   # the per-call loop pays a commit per transition
+        run("SqliteRepo", lambda: SqliteRepo(os.path.join(d, f"r{next(paths)}.db")), count)
+    finally:
+        shutil.rmtree(d)
+
+
+# ---------------------------
+# dijkstra_algorithm: routing
+# ---------------------------
+def _road_graph(n: int, seed: int = 0):
+    """
+    Jittered grid of ~n intersections around Sydney with 2-way streets, ~4 edges/node
+    (counting both directions). Edge km = straight-line km x a detour factor >= 1.
+    Returns (graph, {node: (lat, lon)}).
+    """
+    import math
+    from dijkstra_algorithm import Graph
+
+    rng = random.Random(seed)
+    side = max(2, int(math.sqrt(n)))
+    coords = {}
+    for i in range(side):
+        for j in range(side):
+            coords[i * side + j] = (-33.87 + i * 0.0018 + rng.uniform(-4e-4, 4e-4),
+                                    151.21 + j * 0.0022 + rng.uniform(-4e-4, 4e-4))
+    g = Graph()
+    def km(u, v):
+        (la1, lo1), (la2, lo2) = coords[u], coords[v]
+        x = math.radians(lo2 - lo1) * math.cos(math.radians((la1 + la2) / 2))
+        y = math.radians(la2 - la1)
+        return 6371.0 * math.hypot(x, y) * 1.02   # >= great-circle km at this scale
+    for i in range(side):
+        for j in range(side):
+            u = i * side + j
+            if j + 1 < side and rng.random() < 0.95:
+                g.add_edge(u, u + 1, km(u, u + 1) * rng.uniform(1.0, 1.3))
+            if i + 1 < side and rng.random() < 0.95:
+                g.add_edge(u, u + side, km(u, u + side) * rng.uniform(1.0, 1.3))
+    return g, coords
+
+
+def bench_matrix(n: int) -> None:
+    from dijkstra_algorithm import dijkstra, distance_matrix
+
+    g, _ = _road_graph(n)
+    rng = random.Random(1)
+    nodes = list(g.adj)
+    sources, targets = rng.sample(nodes, 8), rng.sample(nodes, 50)
+    print(f"{len(nodes)} nodes, {sum(map(len, g.adj.values()))} edges; {len(sources)} x {len(targets)} matrix")
+    pairwise = _timed("dijkstra() per pair", lambda: [[dijkstra(g, s, t).distance_km for t in targets] for s in sources])
+    single = _timed("distance_matrix()", lambda: distance_matrix(g, sources, targets))
+    _timed("distance_matrix(processes=4)", lambda: distance_matrix(g, sources, targets, processes=4, chunk_size=2))
+    print(f"speedup (single process): {pairwise / single:.1f}x")
+
+
+def bench_csr(n: int) -> None:
+    import sys
+    from dijkstra_algorithm import dijkstra, dijkstra_csr
+
+    from dijkstra_algorithm import Graph
+
+    base, _ = _road_graph(n)
+    g = Graph()   # string labels, like the campus demo: the dict version hashes them on every relax
+    g.adj = {f"n{u}": [(f"n{v}", w) for v, w in edges] for u, edges in base.adj.items()}
+    del base
+    frozen = []
+    _timed("Graph.freeze()", lambda: frozen.append(g.freeze()))
+    csr = frozen[0]
+    m = csr.num_edges
+    # list + one tuple + one float object per edge, plus the dict slot per node
+    dict_bytes = sys.getsizeof(g.adj) + sum(sys.getsizeof(e) for e in g.adj.values()) + m * (64 + 24)
+    csr_bytes = csr.indptr.nbytes + csr.indices.nbytes + csr.weights.nbytes
+    print(f"{len(csr)} nodes, {m} edges: adjacency dict ~{dict_bytes / 1e6:.0f} MB, CSR arrays {csr_bytes / 1e6:.0f} MB")
+
+    _timed("CSRGraph.as_lists() (once per graph)", csr.as_lists)
+
+    rng = random.Random(2)
+    pairs = [tuple(rng.sample(csr.nodes, 2)) for _ in range(10)]
+    for s, t in pairs:   # same answers
+        assert dijkstra(g, s, t).distance_km == dijkstra_csr(csr, s, t).distance_km
+    per_dict = _timed(f"dijkstra() x {len(pairs)}", lambda: [dijkstra(g, s, t) for s, t in pairs])
+    per_csr = _timed(f"dijkstra_csr() x {len(pairs)}", lambda: [dijkstra_csr(csr, s, t) for s, t in pairs])
+    print(f"speedup: {per_dict / per_csr:.1f}x")
+
+
+def bench_p2p(n: int) -> None:
+    from dijkstra_algorithm import astar, bidirectional_dijkstra, dijkstra
+
+    g, coords = _road_graph(n)
+    g.coords = coords
+    rng = random.Random(3)
+    nodes = list(g.adj)
+    pairs = [tuple(rng.sample(nodes, 2)) for _ in range(20)]
+    print(f"{len(nodes)} nodes, {sum(map(len, g.adj.values()))} edges; {len(pairs)} random pairs")
+    base = None
+    for name, search in (("dijkstra", dijkstra), ("astar", astar), ("bidirectional", bidirectional_dijkstra)):
+        results = []
+        dt = _timed(name, lambda: results.extend(search(g, s, t) for s, t in pairs))
+        if base is None:
+            base = (dt, results)
+        assert [r.distance_km for r in results] == [r.distance_km for r in base[1]]
+        settled = sum(r.settled for r in results)
+        print(f"  settled {settled / len(pairs):10.0f} nodes/query "
+              f"({settled / sum(r.settled for r in base[1]):.2f}x), time {dt / base[0]:.2f}x")
+
+
+BENCHES: Dict[str, Callable[[int], None]] = {
+    "tokenizer": bench_tokenizer,
+    "memory": bench_memory,
+    "summaries": bench_summaries,
+    "ingest": bench_ingest,
+    "availability": bench_availability,
+    "events": bench_events,
+    "batch": bench_batch,
+    "matrix": bench_matrix,
+    "csr": bench_csr,
+    "p2p": bench_p2p,
+}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("name", choices=sorted(BENCHES))
+    ap.add_argument("--n", type=int, default=1_000_000)
+    args = ap.parse_args()
+    BENCHES[args.name](args.n)
@@ -0,0 +1,133 @@
+"""
+concurrency.py
+--------------
+Small locking primitives shared by the in-memory engines when they are served
+from a threaded web server (see ratings.py).
+
+  - RWLock: many concurrent readers or one writer (writers are preferred, so a
+    steady stream of reads cannot starve mutations). Not reentrant.
+  - StripedLock: a fixed pool of locks picked by key hash, so unrelated keys
+    (e.g. different listings) don't contend while the same key is serialized.
+  - BoundedExecutor: a dedicated thread pool for CPU-heavy work (NumPy scoring)
+    with an in-flight limit (load shedding) and per-call timeouts, for asyncio.
+
+No external dependencies. Pure Python.
+"""
+
+from __future__ import annotations
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+
+class RWLock:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class StripedLock:
+    def __init__(self, stripes: int = 64):
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, key: Hashable) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def groups(self, keys: Iterable[Hashable]) -> List[Tuple[threading.Lock, List[Hashable]]]:
+        """`keys` grouped by stripe, so a scan can take each stripe once instead of per key."""
+        locks, n = self._locks, len(self._locks)
+        buckets: List[List[Hashable]] = [[] for _ in range(n)]
+        for key in keys:
+            buckets[hash(key) % n].append(key)
+        return [(lock, bucket) for lock, bucket in zip(locks, buckets) if bucket]
+
+    @contextmanager
+    def all(self) -> Iterator[None]:
+        """Hold every stripe (always acquired in the same order)."""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+
+class Overloaded(Exception):
+    """Raised by BoundedExecutor when the in-flight limit is reached."""
+
+
+class BoundedExecutor:
+    """
+    Runs blocking callables on its own threads, off the event loop and off the web
+    server's shared threadpool. At most `max_pending` calls may be queued or running;
+    beyond that run() raises Overloaded immediately instead of queueing.
+    A call that exceeds `timeout` raises asyncio.TimeoutError for the caller; the
+    worker thread still finishes it, and it keeps counting against max_pending until then.
+    """
+    def __init__(self, workers: int = 4, max_pending: int = 64, timeout: Optional[float] = 5.0):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring")
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _fut) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded(f"{self._pending} scoring calls in flight")
+            self._pending += 1
+        fut = self._pool.submit(fn, *args)
+        fut.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
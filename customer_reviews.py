@@ -8,19 +8,36 @@ Standalone, in-memory ratings engine with 3 sub-categories (all 1..5):
 
 Features
 - Add users and listings (minimal scaffolding so reviews make sense)
-- Add or update a review (1 per (user, listing))
+- Add or update a review (1 per (user, listing)), or bulk-ingest many with per-row rejections
 - Prevent owners from reviewing their own listing
-- Get per-listing summary with averages and overall score (ALL on a 1..5 scale)
-- Optional: fetch all reviews; delete a review
+- Get per-listing summary with averages and overall score (ALL on a 1..5 scale),
+  served in O(1) from running per-listing sums
+- Bayesian-smoothed and time-decayed scores (maintained incrementally), also as a
+  sortable per-listing array for ranking
+- Optional: fetch all reviews (or page through them by updated_at, or stream them all); delete a review
+- Per-listing and per-rater review indexes (reads scale with that listing's / rater's reviews)
+- Optional durability: pass a review_store.ReviewStore to log every mutation (WAL + snapshots)
+- Thread-safe: id allocation under one lock, review state under per-listing lock stripes
 
-No external dependencies. Pure Python.
+NumPy for validating bulk ingests; otherwise pure Python (concurrency.py for the lock helpers).
 """
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from enum import Enum
 from datetime import datetime, UTC   # timezone-aware UTC
+import base64
+import bisect
+import math
+import operator
+import threading
+from array import array
+from itertools import islice, repeat
+
+import numpy as np
+
+from concurrency import StripedLock
 
 # ---------------------------
 # Minimal user/listing model
@@ -57,6 +74,129 @@ class Review:
     created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
     updated_at: datetime = field(default_factory=lambda: datetime.now(UTC))
 
+def _overall(r: Review) -> float:
+    return (r.material_construction + r.performance_durability + r.aesthetics_comfort) / 3.0
+
+@dataclass
+class ListingAggregate:
+    """
+    Running sums over a listing's reviews; summaries are derived in O(1).
+    Besides the exact integer sums it keeps exponentially time-decayed sums of the
+    overall score: weights are stored as of `decay_ref` (epoch seconds) and only
+    rescaled when a newer review arrives, never by rescanning reviews.
+    """
+    count: int = 0
+    sum_material: int = 0
+    sum_performance: int = 0
+    sum_aesthetics: int = 0
+    decayed_sum: float = 0.0      # sum of weight_i * overall_i, weights as of decay_ref
+    decayed_weight: float = 0.0   # sum of weight_i (1.0 for a review written at decay_ref)
+    decay_ref: float = 0.0
+
+    def add(self, r: Review, sign: int = 1, decay_rate: float = 0.0) -> None:
+        self.count += sign
+        self.sum_material += sign * r.material_construction
+        self.sum_performance += sign * r.performance_durability
+        self.sum_aesthetics += sign * r.aesthetics_comfort
+
+        t = r.updated_at.timestamp()
+        if t > self.decay_ref:
+            f = math.exp(-decay_rate * (t - self.decay_ref))
+            self.decayed_sum *= f; self.decayed_weight *= f
+            self.decay_ref = t
+        w = math.exp(-decay_rate * (self.decay_ref - t))
+        self.decayed_sum += sign * w * _overall(r)
+        self.decayed_weight += sign * w
+        if self.count == 0:   # drop accumulated float residue
+            self.decayed_sum = self.decayed_weight = 0.0
+
+    def remove(self, r: Review, decay_rate: float = 0.0) -> None:
+        self.add(r, sign=-1, decay_rate=decay_rate)
+
+    def sum_overall(self) -> float:
+        return (self.sum_material + self.sum_performance + self.sum_aesthetics) / 3.0
+
+    def decayed_at(self, now: float, decay_rate: float) -> Tuple[float, float]:
+        """(decayed sum, decayed weight) as of `now`."""
+        f = math.exp(-decay_rate * max(0.0, now - self.decay_ref))
+        return self.decayed_sum * f, self.decayed_weight * f
+
+@dataclass
+class IngestReport:
+    """Result of RatingsEngine.ingest_reviews: rows applied, and (row index, reason) per rejected row."""
+    applied: int = 0
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+
+def _encode_cursor(key: Tuple[float, int]) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]!r}|{key[1]}".encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        ts, rater_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(ts), int(rater_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+_MISSING = object()
+_REQUIRED = ("rater_id", "listing_id", "material_construction", "performance_durability", "aesthetics_comfort")
+_REJECT_REASONS = ("missing field", "rater not found", "listing not found", "owners cannot review their own listing",
+                   "All ratings must be integers in the range 1..5", "updated_at must be a timezone-aware datetime")
+
+def _field(row, key, default=_MISSING):
+    try:
+        return row.get(key, default)
+    except (AttributeError, TypeError):   # not a mapping
+        return _MISSING
+
+def _int_column(values: list) -> Tuple[np.ndarray, np.ndarray]:
+    """(int64 column, mask of entries that are exact ints); other entries become 0."""
+    ok = np.fromiter(map(operator.is_, map(type, values), repeat(int)), dtype=bool, count=len(values))
+    try:
+        col = np.array(values if ok.all() else [v if o else 0 for v, o in zip(values, ok.tolist())], dtype=np.int64)
+    except OverflowError:   # ints beyond int64 are no valid id or score either
+        ok &= np.fromiter((o and -2**63 <= v < 2**63 for v, o in zip(values, ok.tolist())), dtype=bool, count=len(values))
+        col = np.array([v if o else 0 for v, o in zip(values, ok.tolist())], dtype=np.int64)
+    return col, ok
+
+def _validate_chunk(chunk: list, owners: np.ndarray, known: np.ndarray) -> Tuple[List[list], List[Tuple[int, str]]]:
+    """
+    Validate one ingest chunk column-wise. Returns the valid rows as bulk-record rows
+    [listing_id, rater_id, mc, pd, ac, comment, at_iso|None] and (chunk index, reason)
+    for the rest; the first failing check (in _REJECT_REASONS order) is the reason.
+    """
+    try:
+        cols = [[r.get(k, _MISSING) for r in chunk] for k in _REQUIRED]
+        ats = [r.get("updated_at") for r in chunk]
+    except (AttributeError, TypeError):   # some row is not a mapping: take the slow path for this chunk
+        cols = [[_field(r, k) for r in chunk] for k in _REQUIRED]
+        ats = [_field(r, "updated_at", None) for r in chunk]
+    missing = np.zeros(len(chunk), dtype=bool)
+    for col in cols:
+        missing |= np.fromiter(map(operator.is_, col, repeat(_MISSING)), dtype=bool, count=len(chunk))
+    (rid, rid_ok), (lid, lid_ok), *scores = [_int_column(col) for col in cols]
+
+    rater_ok = rid_ok & (rid > 0) & (rid < len(known))
+    rater_ok[rater_ok] = known[rid[rater_ok]]
+    listing_ok = lid_ok & (lid > 0) & (lid < len(owners))
+    owner = np.where(listing_ok, owners[np.where(listing_ok, lid, 0)], -1)
+    listing_ok &= owner >= 0
+    scores_ok = np.logical_and.reduce([ok & (col >= 1) & (col <= 5) for col, ok in scores])
+    at_bad = np.zeros(len(chunk), dtype=bool)
+    for i in [i for i, a in enumerate(ats) if a is not None]:   # usually none: rows default to now
+        at_bad[i] = not isinstance(ats[i], datetime) or ats[i].tzinfo is None
+
+    reason = np.select([missing, ~rater_ok, ~listing_ok, owner == rid, ~scores_ok, at_bad],
+                       range(len(_REJECT_REASONS)), default=-1)
+    valid = np.flatnonzero(reason < 0)
+    rejected = [(i, _REJECT_REASONS[c]) for i, c in zip(np.flatnonzero(reason >= 0).tolist(),
+                                                          reason[reason >= 0].tolist())]
+    idx = valid.tolist()
+    comments = [chunk[i].get("comment", "") for i in idx]   # valid rows are mappings
+    stamps = [ats[i].isoformat() if ats[i] is not None else None for i in idx]
+    batch = list(map(list, zip(lid[valid].tolist(), rid[valid].tolist(), *(col[valid].tolist() for col, _ in scores),
+                               comments, stamps)))
+    return batch, rejected
+
 def _ensure_1_to_5(*vals: int):
     for v in vals:
         if not isinstance(v, int) or not (1 <= v <= 5):
@@ -70,18 +210,102 @@ class RatingsEngine:
     Manages users, listings, and customer reviews.
     Focused purely on ratings; no matching/suggestions here.
     """
-    def __init__(self):
+    def __init__(self, store=None, prior_weight: float = 5.0, half_life_days: float = 180.0):
+        """
+        prior_weight: pseudo-review count pulling smoothed scores toward the global mean.
+        half_life_days: age at which a review counts half as much in the decayed score.
+        """
+        self.prior_weight = prior_weight
+        self.decay_rate = math.log(2) / (half_life_days * 86400.0)
         self._next_user_id = 1
         self._next_listing_id = 1
         self.users: Dict[int, User] = {}
         self.listings: Dict[int, Listing] = {}
         # key = (listing_id, rater_id) -> Review
         self._reviews: Dict[Tuple[int, int], Review] = {}
+        # secondary indexes over the same Review objects
+        self._by_listing: Dict[int, Dict[int, Review]] = {}   # listing_id -> {rater_id: Review}
+        self._by_rater: Dict[int, Dict[int, Review]] = {}     # rater_id -> {listing_id: Review}
+        self._agg: Dict[int, ListingAggregate] = {}           # listing_id -> running sums
+        self._totals = ListingAggregate()                     # all reviews (global mean for smoothing)
+        self._by_time: Dict[int, List[Tuple[float, int]]] = {}  # listing_id -> sorted (updated_at, rater_id)
+        self._totals_lock = threading.Lock()
+        # thread safety: _meta_lock guards id counters and user/listing creation; review
+        # state for a listing is guarded by its stripe. Lock order: meta, then stripes.
+        self._meta_lock = threading.Lock()
+        self._listing_locks = StripedLock()
+        # optional durability backend (see review_store.ReviewStore); every mutation is
+        # expressed as a record, logged to the store, then applied
+        self._store = None
+        if store is not None:
+            store.restore(self)
+            self._store = store
+
+    # ----- Mutation records -----
+    def _commit(self, rec: dict):
+        # caller holds the lock that guards the state `rec` touches; log order = apply order.
+        # Returns the store's ticket: pass it to _settle() once the lock is released.
+        ticket = self._store.append(rec) if self._store is not None else None
+        self._apply(rec)
+        return ticket
+
+    def _settle(self, ticket) -> None:
+        # caller must hold no engine locks: wait for the record's fsync (if the store
+        # acknowledges only durable writes), so writers sharing a lock share the fsync too
+        if self._store is not None:
+            self._store.wait(ticket)
+            self._maybe_checkpoint()
+
+    def _maybe_checkpoint(self) -> None:
+        # caller must hold no engine locks; snapshots need the whole engine quiescent
+        if self._store is not None and self._store.checkpoint_due():
+            with self._meta_lock, self._listing_locks.all():
+                if self._store.checkpoint_due():
+                    self._store.checkpoint(self)
+
+    def _apply(self, rec: dict) -> None:
+        op = rec["op"]
+        if op == "user":
+            uid = rec["user_id"]
+            self.users[uid] = User(user_id=uid, name=rec["name"], circle=rec["circle"])
+            self._next_user_id = max(self._next_user_id, uid + 1)
+        elif op == "listing":
+            lid = rec["listing_id"]
+            self.listings[lid] = Listing(listing_id=lid, owner_id=rec["owner_id"], title=rec["title"],
+                                         description=rec["description"], privacy=Privacy(rec["privacy"]))
+            self._next_listing_id = max(self._next_listing_id, lid + 1)
+        elif op == "review":
+            at = datetime.fromisoformat(rec["at"])
+            created = datetime.fromisoformat(rec["created_at"]) if "created_at" in rec else at
+            self._put_review(rec["listing_id"], rec["rater_id"], rec["material_construction"],
+                             rec["performance_durability"], rec["aesthetics_comfort"], rec["comment"], at, created)
+        elif op == "reviews":
+            self._put_reviews_bulk(rec["rows"], datetime.fromisoformat(rec["at"]))
+        elif op == "delete":
+            self._drop_review(rec["rater_id"], rec["listing_id"])
+        else:
+            raise ValueError(f"unknown record op {op!r}")
+
+    def _records(self):
+        """Records that rebuild the current state (used for compacted snapshots)."""
+        for u in self.users.values():
+            yield {"op": "user", "user_id": u.user_id, "name": u.name, "circle": u.circle}
+        for l in self.listings.values():
+            yield {"op": "listing", "listing_id": l.listing_id, "owner_id": l.owner_id, "title": l.title,
+                   "description": l.description, "privacy": l.privacy.value}
+        for r in self._reviews.values():
+            yield {"op": "review", "listing_id": r.listing_id, "rater_id": r.rater_id,
+                   "material_construction": r.material_construction,
+                   "performance_durability": r.performance_durability,
+                   "aesthetics_comfort": r.aesthetics_comfort, "comment": r.comment,
+                   "at": r.updated_at.isoformat(), "created_at": r.created_at.isoformat()}
 
     # ----- Users / Listings (minimal scaffolding) -----
     def add_user(self, name: str, circle: str) -> int:
-        uid = self._next_user_id; self._next_user_id += 1
-        self.users[uid] = User(user_id=uid, name=name, circle=circle)
+        with self._meta_lock:
+            uid = self._next_user_id
+            ticket = self._commit({"op": "user", "user_id": uid, "name": name, "circle": circle})
+        self._settle(ticket)
         return uid
 
     def add_listing(self, owner_id: int, title: str, description: str = "", privacy: str = "public") -> int:
@@ -91,8 +315,11 @@ class RatingsEngine:
             p = Privacy(privacy.lower())
         except Exception:
             raise ValueError("privacy must be 'public' or 'circle'")
-        lid = self._next_listing_id; self._next_listing_id += 1
-        self.listings[lid] = Listing(listing_id=lid, owner_id=owner_id, title=title, description=description, privacy=p)
+        with self._meta_lock:
+            lid = self._next_listing_id
+            ticket = self._commit({"op": "listing", "listing_id": lid, "owner_id": owner_id, "title": title,
+                                   "description": description, "privacy": p.value})
+        self._settle(ticket)
         return lid
 
     # ----- Reviews API (ALL 1..5) -----
@@ -114,35 +341,224 @@ class RatingsEngine:
 
         _ensure_1_to_5(material_construction, performance_durability, aesthetics_comfort)
 
+        with self._listing_locks(listing_id):
+            ticket = self._commit({"op": "review", "listing_id": listing_id, "rater_id": rater_id,
+                                   "material_construction": material_construction,
+                                   "performance_durability": performance_durability,
+                                   "aesthetics_comfort": aesthetics_comfort, "comment": comment,
+                                   "at": datetime.now(UTC).isoformat()})
+        self._settle(ticket)
+
+    def _put_review(self, listing_id: int, rater_id: int, material_construction: int, performance_durability: int,
+                    aesthetics_comfort: int, comment: str, now: datetime, created_at: datetime) -> None:
         key = (listing_id, rater_id)
-        now = datetime.now(UTC)
         if key in self._reviews:
             r = self._reviews[key]
+            self._untrack_review(listing_id, r)
             r.material_construction = material_construction
             r.performance_durability = performance_durability
             r.aesthetics_comfort = aesthetics_comfort
             r.comment = comment
             r.updated_at = now
+            self._track_review(listing_id, r)
         else:
-            self._reviews[key] = Review(
+            r = Review(
                 listing_id=listing_id,
                 rater_id=rater_id,
                 material_construction=material_construction,
                 performance_durability=performance_durability,
                 aesthetics_comfort=aesthetics_comfort,
                 comment=comment,
-                created_at=now,
+                created_at=created_at,
                 updated_at=now
             )
+            self._reviews[key] = r
+            self._by_listing.setdefault(listing_id, {})[rater_id] = r
+            self._by_rater.setdefault(rater_id, {})[listing_id] = r
+            self._track_review(listing_id, r)
+
+    def ingest_reviews(self, rows: Iterable[dict], chunk_size: int = 50_000) -> IngestReport:
+        """
+        Bulk add_or_update_review for backfills (e.g. partner stores). Each row is a dict with
+        rater_id, listing_id, the three 1..5 scores, and optionally comment and updated_at
+        (timezone-aware datetime; defaults to now). Rows are taken chunk by chunk: each field
+        becomes a column, the columns are validated with NumPy against id lookup arrays (exact
+        ints only, so odd values are rejected, never hashed), and the valid rows are applied as
+        one log record per chunk: aggregates updated in place, each time index re-sorted once.
+        Invalid rows are skipped and reported; later rows for the same review win.
+        Users and listings created while the ingest runs are not visible to it.
+        """
+        with self._meta_lock:
+            owners = np.full(max(self.listings, default=0) + 1, -1, dtype=np.int64)
+            listings = list(self.listings.values())
+            owners[[l.listing_id for l in listings]] = [l.owner_id for l in listings]
+            known = np.zeros(max(self.users, default=0) + 1, dtype=bool)
+            known[list(self.users)] = True
+        report = IngestReport()
+        rows, base = iter(rows), 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return report
+            batch, rejected = _validate_chunk(chunk, owners, known)
+            report.rejected.extend((base + i, reason) for i, reason in rejected)
+            if batch:
+                report.applied += self._commit_bulk(batch)
+            base += len(chunk)
+
+    def _commit_bulk(self, batch: List[list]) -> int:
+        with self._listing_locks.all():
+            ticket = self._commit({"op": "reviews", "at": datetime.now(UTC).isoformat(), "rows": batch})
+        self._settle(ticket)
+        return len(batch)
+
+    def _put_reviews_bulk(self, rows: List[list], at: datetime) -> None:
+        """
+        Apply a chunk of [listing_id, rater_id, mc, pd, ac, comment, at_iso|None] rows. Caller
+        holds every stripe. Rows are grouped by listing so each aggregate is rescaled and
+        written once, and each time index is merged once.
+        """
+        rate, exp = self.decay_rate, math.exp
+        reviews, by_listing, by_rater, aggs = self._reviews, self._by_listing, self._by_rater, self._agg
+        groups: Dict[int, List[list]] = {}
+        for row in rows:
+            groups.setdefault(row[0], []).append(row)
+        at_ts = at.timestamp()
+        custom_times = any(row[6] for row in rows)   # else every row is stamped `at`
+        total_c = total_m = total_p = total_a = 0
+
+        for lid, lrows in groups.items():
+            if custom_times:
+                stamps = [(datetime.fromisoformat(x[6]), None) if x[6] else (at, at_ts) for x in lrows]
+                stamps = [(dt, ts if ts is not None else dt.timestamp()) for dt, ts in stamps]
+                t_max = max(ts for _, ts in stamps)
+            else:
+                stamps, t_max = repeat((at, at_ts)), at_ts
+            agg = aggs.get(lid)
+            if agg is None:
+                agg = aggs[lid] = ListingAggregate()
+            if t_max > agg.decay_ref:
+                f = exp(-rate * (t_max - agg.decay_ref))
+                agg.decayed_sum *= f; agg.decayed_weight *= f
+                agg.decay_ref = t_max
+            ref = agg.decay_ref
+            by_r = by_listing.setdefault(lid, {})
+            c = sm = sp = sa = 0
+            d_sum = d_w = 0.0
+            final_keys: Dict[int, Tuple[float, int]] = {}
+
+            for (_, rid, mc, pd, ac, comment, _), (now, t) in zip(lrows, stamps):
+                r = by_r.get(rid)
+                if r is not None:
+                    old_t = final_keys[rid][0] if rid in final_keys else r.updated_at.timestamp()
+                    w = exp(-rate * (ref - old_t))
+                    c -= 1; sm -= r.material_construction; sp -= r.performance_durability; sa -= r.aesthetics_comfort
+                    d_sum -= w * _overall(r); d_w -= w
+                    r.material_construction, r.performance_durability, r.aesthetics_comfort = mc, pd, ac
+                    r.comment, r.updated_at = comment, now
+                else:
+                    r = reviews[(lid, rid)] = by_r[rid] = Review(lid, rid, mc, pd, ac, comment, now, now)
+                    by_rater.setdefault(rid, {})[lid] = r
+                w = 1.0 if t == ref else exp(-rate * (ref - t))
+                c += 1; sm += mc; sp += pd; sa += ac
+                d_sum += w * (mc + pd + ac) / 3.0; d_w += w
+                final_keys[rid] = (t, rid)
+
+            agg.count += c; agg.sum_material += sm; agg.sum_performance += sp; agg.sum_aesthetics += sa
+            agg.decayed_sum += d_sum; agg.decayed_weight += d_w
+            if agg.count == 0:
+                agg.decayed_sum = agg.decayed_weight = 0.0
+            total_c += c; total_m += sm; total_p += sp; total_a += sa
+
+            # merge: existing keys minus the re-timed reviews, plus their new keys (timsort merges the runs)
+            keys = [k for k in self._by_time.get(lid, ()) if k[1] not in final_keys]
+            keys.extend(sorted(final_keys.values()))
+            keys.sort()
+            self._by_time[lid] = keys
+
+        with self._totals_lock:
+            t = self._totals
+            t.count += total_c; t.sum_material += total_m
+            t.sum_performance += total_p; t.sum_aesthetics += total_a
 
     def delete_review(self, rater_id: int, listing_id: int) -> bool:
         """Returns True if a review existed and was deleted."""
-        return self._reviews.pop((listing_id, rater_id), None) is not None
+        with self._listing_locks(listing_id):
+            if (listing_id, rater_id) not in self._reviews:
+                return False
+            ticket = self._commit({"op": "delete", "listing_id": listing_id, "rater_id": rater_id})
+        self._settle(ticket)
+        return True
+
+    def _drop_review(self, rater_id: int, listing_id: int) -> None:
+        r = self._reviews.pop((listing_id, rater_id))
+        self._untrack_review(listing_id, r)
+        del self._by_listing[listing_id][rater_id]
+        del self._by_rater[rater_id][listing_id]
+
+    def _track_review(self, listing_id: int, r: Review) -> None:
+        # caller holds the listing's stripe; updates aggregates and the time index
+        self._agg.setdefault(listing_id, ListingAggregate()).add(r, decay_rate=self.decay_rate)
+        with self._totals_lock:
+            self._totals.add(r)
+        bisect.insort(self._by_time.setdefault(listing_id, []), (r.updated_at.timestamp(), r.rater_id))
+
+    def _untrack_review(self, listing_id: int, r: Review) -> None:
+        self._agg[listing_id].remove(r, decay_rate=self.decay_rate)
+        with self._totals_lock:
+            self._totals.remove(r)
+        keys = self._by_time[listing_id]
+        del keys[bisect.bisect_left(keys, (r.updated_at.timestamp(), r.rater_id))]
 
     def get_reviews_for_listing(self, listing_id: int) -> List[Review]:
         if listing_id not in self.listings:
             raise ValueError("listing not found")
-        return [rv for (lid, _), rv in self._reviews.items() if lid == listing_id]
+        with self._listing_locks(listing_id):
+            return list(self._by_listing.get(listing_id, {}).values())
+
+    def get_reviews_page(self, listing_id: int, limit: int = 50, cursor: Optional[str] = None,
+                         newest_first: bool = True) -> Tuple[List[Review], Optional[str]]:
+        """
+        One page of a listing's reviews ordered by updated_at (ties by rater_id).
+        Pass the returned cursor to get the next page; it is None after the last page.
+        Reviews updated between calls move to their new position (they may be seen twice or
+        skipped, like any keyset pagination).
+        """
+        if listing_id not in self.listings:
+            raise ValueError("listing not found")
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        after = _decode_cursor(cursor) if cursor else None
+        with self._listing_locks(listing_id):
+            keys = self._by_time.get(listing_id, [])
+            if newest_first:
+                end = bisect.bisect_left(keys, after) if after else len(keys)
+                page_keys = keys[max(0, end - limit):end][::-1]
+                more = end - limit > 0
+            else:
+                start = bisect.bisect_right(keys, after) if after else 0
+                page_keys = keys[start:start + limit]
+                more = start + limit < len(keys)
+            by_rater = self._by_listing[listing_id] if page_keys else {}
+            page = [by_rater[rater_id] for _, rater_id in page_keys]
+        return page, (_encode_cursor(page_keys[-1]) if more and page_keys else None)
+
+    def iter_reviews(self) -> Iterator[Review]:
+        """
+        Lazily yield every review, listing by listing (for exports). Only one listing's
+        reviews are copied at a time, under that listing's lock.
+        """
+        for listing_id in list(self._by_listing):
+            with self._listing_locks(listing_id):
+                chunk = list(self._by_listing[listing_id].values())
+            yield from chunk
+
+    def get_reviews_by_rater(self, rater_id: int) -> List[Review]:
+        """All reviews written by rater_id ("my reviews")."""
+        if rater_id not in self.users:
+            raise ValueError("rater not found")
+        # inner dict spans listing stripes; list() copies it in one step under the GIL
+        return list(self._by_rater.get(rater_id, {}).values())
 
     def get_listing_summary(self, listing_id: int) -> dict:
         """
@@ -152,34 +568,99 @@ class RatingsEngine:
           "avg_material": float|None,
           "avg_performance": float|None,
           "avg_aesthetics": float|None,
-          "overall_score": float|None
+          "overall_score": float|None,
+          "bayesian_score": float,   # mean shrunk toward the global mean by prior_weight
+          "decayed_score": float     # same, with reviews down-weighted by age
         }
         """
-        reviews = self.get_reviews_for_listing(listing_id)
-        if not reviews:
+        if listing_id not in self.listings:
+            raise ValueError("listing not found")
+        prior, now = self._prior(), datetime.now(UTC).timestamp()
+        with self._listing_locks(listing_id):
+            return self._summary(self._agg.get(listing_id), prior, now)
+
+    def get_listing_summaries(self, listing_ids: Iterable[int]) -> Tuple[Dict[int, dict], List[int]]:
+        """
+        Batch get_listing_summary for a grid of listings, in one pass over the aggregates.
+        Returns ({listing_id: summary}, [ids that are not listings]).
+        """
+        listings, aggs, locks = self.listings, self._agg, self._listing_locks
+        prior, now = self._prior(), datetime.now(UTC).timestamp()
+        found: Dict[int, dict] = {}
+        missing: List[int] = []
+        for lid in listing_ids:
+            if lid in listings:
+                with locks(lid):
+                    found[lid] = self._summary(aggs.get(lid), prior, now)
+            else:
+                missing.append(lid)
+        return found, missing
+
+    def _prior(self) -> float:
+        """Global mean overall score (3.0 before any reviews) used as the smoothing prior."""
+        with self._totals_lock:
+            t = self._totals
+            return t.sum_overall() / t.count if t.count else 3.0
+
+    def _smoothed(self, agg: Optional[ListingAggregate], prior: float, now: float) -> Tuple[float, float]:
+        """(bayesian_score, decayed_score) for one listing; prior only when unreviewed."""
+        C = self.prior_weight
+        if agg is None or agg.count == 0:
+            return prior, prior
+        bayes = (C * prior + agg.sum_overall()) / (C + agg.count)
+        d_sum, d_weight = agg.decayed_at(now, self.decay_rate)
+        decayed = (C * prior + d_sum) / (C + d_weight) if C + d_weight > 0 else prior
+        return bayes, decayed
+
+    def ranking_scores(self, kind: str = "bayesian", now: Optional[datetime] = None) -> array:
+        """
+        Sortable score column for ranking every listing at once: array('d') indexed by
+        listing_id (index 0 and missing ids are NaN). kind is "bayesian" or "decayed".
+        Zero-copy into NumPy with np.frombuffer(scores).
+        Recomputed on every call (an O(listings) loop over the aggregates): cache the result
+        if you rank often. Listings added while it runs are left out; each listing is read
+        under its stripe, so no score mixes the sums from before and after a write.
+        """
+        if kind not in ("bayesian", "decayed"):
+            raise ValueError("kind must be 'bayesian' or 'decayed'")
+        pick = 0 if kind == "bayesian" else 1
+        prior = self._prior()
+        ts = (now or datetime.now(UTC)).timestamp()
+        ids = list(self.listings)   # one snapshot sizes and fills the column
+        out = array("d", [math.nan]) * (max(ids, default=0) + 1)
+        aggs, locks = self._agg, self._listing_locks
+        for lock, lids in locks.groups(ids):   # one acquisition per stripe, not per listing
+            with lock:
+                for lid in lids:
+                    out[lid] = self._smoothed(aggs.get(lid), prior, ts)[pick]
+        return out
+
+    def _summary(self, agg: Optional[ListingAggregate], prior: float, now: float) -> dict:
+        bayes, decayed = self._smoothed(agg, prior, now)
+        if agg is None or agg.count == 0:
             return {
                 "count": 0,
                 "avg_material": None,
                 "avg_performance": None,
                 "avg_aesthetics": None,
-                "overall_score": None
+                "overall_score": None,
+                "bayesian_score": round(bayes, 2),
+                "decayed_score": round(decayed, 2)
             }
 
-        mc_vals = [r.material_construction for r in reviews]
-        pd_vals = [r.performance_durability for r in reviews]
-        ac_vals = [r.aesthetics_comfort for r in reviews]
-
-        avg_material = sum(mc_vals) / len(mc_vals)
-        avg_performance = sum(pd_vals) / len(pd_vals)
-        avg_aesthetics = sum(ac_vals) / len(ac_vals)
+        avg_material = agg.sum_material / agg.count
+        avg_performance = agg.sum_performance / agg.count
+        avg_aesthetics = agg.sum_aesthetics / agg.count
         overall = (avg_material + avg_performance + avg_aesthetics) / 3.0
 
         return {
-            "count": len(reviews),
+            "count": agg.count,
             "avg_material": round(avg_material, 2),
             "avg_performance": round(avg_performance, 2),
             "avg_aesthetics": round(avg_aesthetics, 2),
-            "overall_score": round(overall, 2)
+            "overall_score": round(overall, 2),
+            "bayesian_score": round(bayes, 2),
+            "decayed_score": round(decayed, 2)
         }
 
 # ---------------------------
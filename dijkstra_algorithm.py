@@ -1,8 +1,12 @@
 # --- same Graph + dijkstra classes as before ---
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterable, List, Tuple, Optional, Any
+from concurrent.futures import ProcessPoolExecutor
 import heapq
+import math
+
+import numpy as np
 
 Node = Any
 Weight = float
@@ -12,21 +16,100 @@ class RouteResult:
     path: List[Node]
     distance_km: float
     emissions_kg: Optional[float] = None
+    settled: Optional[int] = None   # nodes the search settled (how much work it did)
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle km between two (lat, lon) points in degrees."""
+    lat1, lon1 = math.radians(a[0]), math.radians(a[1])
+    lat2, lon2 = math.radians(b[0]), math.radians(b[1])
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
 
 class Graph:
     def __init__(self) -> None:
         self.adj: Dict[Node, List[Tuple[Node, Weight]]] = {}
+        self.coords: Dict[Node, Tuple[float, float]] = {}   # node -> (lat, lon), for astar()
+        self.directed = False   # any one-way edge added
+        self._radj: Optional[Dict[Node, List[Tuple[Node, Weight]]]] = None
 
     def add_edge(self, u: Node, v: Node, km: float, bidirectional: bool = True) -> None:
+        self._radj = None
         self.adj.setdefault(u, []).append((v, km))
         if bidirectional:
             self.adj.setdefault(v, []).append((u, km))
         else:
             self.adj.setdefault(v, [])
+            self.directed = True
+
+    def set_coords(self, node: Node, lat: float, lon: float) -> None:
+        self.coords[node] = (lat, lon)
+
+    def reverse_adj(self) -> Dict[Node, List[Tuple[Node, Weight]]]:
+        """Incoming edges per node; the adjacency itself when every edge is two-way. Cached until add_edge()."""
+        if not self.directed:
+            return self.adj
+        if self._radj is None:
+            radj: Dict[Node, List[Tuple[Node, Weight]]] = {u: [] for u in self.adj}
+            for u, edges in self.adj.items():
+                for v, w in edges:
+                    radj[v].append((u, w))
+            self._radj = radj
+        return self._radj
 
     def neighbors(self, u: Node) -> List[Tuple[Node, Weight]]:
         return self.adj.get(u, [])
 
+    def freeze(self) -> "CSRGraph":
+        """Compact read-only copy with integer node ids (see CSRGraph)."""
+        return CSRGraph.from_graph(self)
+
+
+class CSRGraph:
+    """
+    Graph frozen into compressed sparse rows. Node i's edges are
+    indices[indptr[i]:indptr[i + 1]] (neighbor ids) with the matching `weights` (km);
+    `nodes[i]` is the original label and `index` maps labels back to ids.
+    About 12 bytes per edge instead of a tuple per edge.
+    """
+    def __init__(self, nodes: List[Node], indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray) -> None:
+        self.nodes = nodes
+        self.index: Dict[Node, int] = {n: i for i, n in enumerate(nodes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._lists: Optional[Tuple[List[int], List[int], List[float]]] = None
+
+    def as_lists(self) -> Tuple[List[int], List[int], List[float]]:
+        """
+        (indptr, indices, weights) as plain lists, built on first use and kept: pure-Python
+        searches index these far faster than NumPy arrays. Costs ~70 bytes per edge on top
+        of the arrays.
+        """
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._lists
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "CSRGraph":
+        nodes = list(graph.adj)
+        index = {n: i for i, n in enumerate(nodes)}
+        degree = np.fromiter((len(graph.adj[n]) for n in nodes), dtype=np.int64, count=len(nodes))
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(degree, out=indptr[1:])
+        m = int(indptr[-1])
+        indices = np.fromiter((index[v] for n in nodes for v, _ in graph.adj[n]), dtype=np.int32, count=m)
+        weights = np.fromiter((w for n in nodes for _, w in graph.adj[n]), dtype=np.float64, count=m)
+        return cls(nodes, indptr, indices, weights)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
 def dijkstra(graph: Graph, source: Node, target: Node,
              *, emission_rate_kg_per_km: Optional[float] = None) -> RouteResult:
     if source not in graph.adj or target not in graph.adj:
@@ -35,13 +118,16 @@ def dijkstra(graph: Graph, source: Node, target: Node,
     pq: List[Tuple[float, Node]] = [(0.0, source)]
     dist: Dict[Node, float] = {source: 0.0}
     prev: Dict[Node, Node] = {}
+    settled = 0
 
     while pq:
         d_u, u = heapq.heappop(pq)
         if u == target:
+            settled += 1
             break
         if d_u > dist.get(u, float("inf")):
             continue
+        settled += 1
         for v, w in graph.neighbors(u):
             alt = d_u + w
             if alt < dist.get(v, float("inf")):
@@ -51,7 +137,11 @@ def dijkstra(graph: Graph, source: Node, target: Node,
 
     if target not in dist:
         raise ValueError(f"No route found from {source} to {target}.")
+    return _route(prev, dist, source, target, emission_rate_kg_per_km, settled)
 
+
+def _route(prev: Dict[Node, Node], dist: Dict[Node, float], source: Node, target: Node,
+           emission_rate_kg_per_km: Optional[float], settled: Optional[int] = None) -> RouteResult:
     # reconstruct path
     path: List[Node] = []
     cur = target
@@ -63,28 +153,269 @@ def dijkstra(graph: Graph, source: Node, target: Node,
 
     distance_km = dist[target]
     emissions_kg = distance_km * emission_rate_kg_per_km if emission_rate_kg_per_km else None
-    return RouteResult(path=path, distance_km=distance_km, emissions_kg=emissions_kg)
-
-
-# --- Build a mini USYD campus graph ---
-g = Graph()
-
-# Approx walking distances (km)
-g.add_edge("Fisher Library", "New Law Building", 0.2)
-g.add_edge("Fisher Library", "Wentworth Building", 0.3)
-g.add_edge("Fisher Library", "Quadrangle", 0.15)
-g.add_edge("New Law Building", "Abercrombie Building", 0.5)
-g.add_edge("Abercrombie Building", "Merewether Building", 0.25)
-g.add_edge("Merewether Building", "Wentworth Building", 0.35)
-g.add_edge("Quadrangle", "Great Hall", 0.1)
-g.add_edge("Great Hall", "Manning House", 0.25)
-g.add_edge("Manning House", "Wentworth Building", 0.2)
-g.add_edge("Wentworth Building", "Charles Perkins Centre", 0.6)
-
-# Example: shortest path from Fisher Library → Charles Perkins Centre
-result = dijkstra(g, "Fisher Library", "Charles Perkins Centre",
-                  emission_rate_kg_per_km=0.18)  # 0.18 kg/km (small petrol car)
-
-print("Shortest path:", " → ".join(result.path))
-print(f"Distance: {result.distance_km:.2f} km")
-print(f"Estimated emissions: {result.emissions_kg:.2f} kg CO₂")
+    return RouteResult(path=path, distance_km=distance_km, emissions_kg=emissions_kg, settled=settled)
+
+
+# --- point-to-point: A* and bidirectional Dijkstra ---
+
+def astar(graph: Graph, source: Node, target: Node,
+          *, emission_rate_kg_per_km: Optional[float] = None) -> RouteResult:
+    """
+    dijkstra() guided by the straight-line (haversine) km to the target, from graph.coords.
+    Exact as long as no edge is shorter than the great-circle distance between its ends
+    (true for road/walking km); nodes without coordinates get no guidance.
+    """
+    if source not in graph.adj or target not in graph.adj:
+        raise ValueError("Source or target not present in graph.")
+    coords, goal = graph.coords, graph.coords.get(target)
+    h_cache: Dict[Node, float] = {}
+    def h(n: Node) -> float:
+        est = h_cache.get(n)
+        if est is None:
+            c = coords.get(n)
+            est = h_cache[n] = haversine_km(c, goal) if c is not None and goal is not None else 0.0
+        return est
+
+    pq: List[Tuple[float, float, Node]] = [(h(source), 0.0, source)]
+    dist: Dict[Node, float] = {source: 0.0}
+    prev: Dict[Node, Node] = {}
+    settled = 0
+
+    while pq:
+        _, d_u, u = heapq.heappop(pq)
+        if d_u > dist[u]:
+            continue
+        settled += 1
+        if u == target:
+            break
+        for v, w in graph.adj[u]:
+            alt = d_u + w
+            if alt < dist.get(v, float("inf")):
+                dist[v] = alt
+                prev[v] = u
+                heapq.heappush(pq, (alt + h(v), alt, v))
+
+    if target not in dist:
+        raise ValueError(f"No route found from {source} to {target}.")
+    return _route(prev, dist, source, target, emission_rate_kg_per_km, settled)
+
+
+def bidirectional_dijkstra(graph: Graph, source: Node, target: Node,
+                           *, emission_rate_kg_per_km: Optional[float] = None) -> RouteResult:
+    """
+    Dijkstra from both ends at once (backward over incoming edges), always expanding the
+    side whose queue head has the smaller distance; stops once the two queue heads
+    together can't beat the best meeting found. distance_km is summed along the path source -> target, like dijkstra().
+    """
+    if source not in graph.adj or target not in graph.adj:
+        raise ValueError("Source or target not present in graph.")
+    inf = float("inf")
+    adj = (graph.adj, graph.reverse_adj())
+    dist: Tuple[Dict[Node, float], Dict[Node, float]] = ({source: 0.0}, {target: 0.0})
+    prev: Tuple[Dict[Node, Node], Dict[Node, Node]] = ({}, {})
+    done: Tuple[set, set] = (set(), set())
+    pq: Tuple[List[Tuple[float, Node]], List[Tuple[float, Node]]] = ([(0.0, source)], [(0.0, target)])
+    best, meet = (0.0, source) if source == target else (inf, None)
+    settled = 0
+
+    while pq[0] and pq[1] and pq[0][0][0] + pq[1][0][0] < best:
+        side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+        d_u, u = heapq.heappop(pq[side])
+        if u in done[side]:
+            continue
+        done[side].add(u)
+        settled += 1
+        near, far, back = dist[side], dist[1 - side], prev[side]
+        for v, w in adj[side][u]:
+            alt = d_u + w
+            if alt < near.get(v, inf):
+                near[v] = alt
+                back[v] = u
+                heapq.heappush(pq[side], (alt, v))
+            if v in far and near[v] + far[v] < best:
+                best, meet = near[v] + far[v], v
+
+    if meet is None:
+        raise ValueError(f"No route found from {source} to {target}.")
+
+    path: List[Node] = [meet]
+    while path[-1] != source:
+        path.append(prev[0][path[-1]])
+    path.reverse()
+    while path[-1] != target:
+        path.append(prev[1][path[-1]])
+
+    distance_km = 0.0
+    for a, b in zip(path, path[1:]):
+        distance_km += min(w for v, w in graph.adj[a] if v == b)
+    emissions_kg = distance_km * emission_rate_kg_per_km if emission_rate_kg_per_km else None
+    return RouteResult(path=path, distance_km=distance_km, emissions_kg=emissions_kg, settled=settled)
+
+
+def dijkstra_csr(csr: CSRGraph, source: Node, target: Node,
+                 *, emission_rate_kg_per_km: Optional[float] = None) -> RouteResult:
+    """dijkstra() on a frozen graph: same result, with list-indexed state instead of dicts keyed by label."""
+    s, t = csr.index.get(source), csr.index.get(target)
+    if s is None or t is None:
+        raise ValueError("Source or target not present in graph.")
+
+    inf = float("inf")
+    dist = [inf] * len(csr)
+    prev = [-1] * len(csr)
+    dist[s] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, s)]
+    indptr, indices, weights = csr.as_lists()   # converted once per graph, not per node
+    settled = 0
+
+    while pq:
+        d_u, u = heapq.heappop(pq)
+        if u == t:
+            settled += 1
+            break
+        if d_u > dist[u]:
+            continue
+        settled += 1
+        a, b = indptr[u], indptr[u + 1]
+        for v, w in zip(indices[a:b], weights[a:b]):
+            alt = d_u + w
+            if alt < dist[v]:
+                dist[v] = alt
+                prev[v] = u
+                heapq.heappush(pq, (alt, v))
+
+    if dist[t] == inf:
+        raise ValueError(f"No route found from {source} to {target}.")
+
+    ids = [t]
+    while ids[-1] != s:
+        ids.append(prev[ids[-1]])
+    nodes = csr.nodes
+    path = [nodes[i] for i in reversed(ids)]
+    distance_km = dist[t]
+    emissions_kg = distance_km * emission_rate_kg_per_km if emission_rate_kg_per_km else None
+    return RouteResult(path=path, distance_km=distance_km, emissions_kg=emissions_kg, settled=settled)
+
+
+# --- one-to-many / many-to-many ---
+
+class SearchTree:
+    """
+    Result of one single-source search: settled distances and the shortest-path tree.
+    Routes to any settled node come from the same tree, no new search.
+    """
+    def __init__(self, source: Node, dist: Dict[Node, float], prev: Dict[Node, Node]) -> None:
+        self.source = source
+        self.dist = dist
+        self.prev = prev
+
+    def distance(self, target: Node) -> float:
+        """Shortest distance in km, or inf if the target is unreachable (or was not searched for)."""
+        return self.dist.get(target, float("inf"))
+
+    def route(self, target: Node, *, emission_rate_kg_per_km: Optional[float] = None) -> RouteResult:
+        if target not in self.dist:
+            raise ValueError(f"No route found from {self.source} to {target}.")
+        return _route(self.prev, self.dist, self.source, target, emission_rate_kg_per_km)
+
+
+def shortest_paths(graph: Graph, source: Node, targets: Optional[Iterable[Node]] = None) -> SearchTree:
+    """
+    Dijkstra from `source`, stopping once every node in `targets` is settled (or the
+    whole reachable graph when targets is None). Only settled nodes end up in the tree.
+    """
+    if source not in graph.adj:
+        raise ValueError("Source not present in graph.")
+    remaining = None if targets is None else set(targets) - {source}
+    pq: List[Tuple[float, Node]] = [(0.0, source)]
+    best: Dict[Node, float] = {source: 0.0}
+    dist: Dict[Node, float] = {}
+    prev: Dict[Node, Node] = {}
+    parent: Dict[Node, Node] = {}
+    adj = graph.adj
+
+    while pq:
+        d_u, u = heapq.heappop(pq)
+        if u in dist:
+            continue
+        dist[u] = d_u
+        if u != source:
+            prev[u] = parent[u]
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+        for v, w in adj[u]:
+            alt = d_u + w
+            if alt < best.get(v, float("inf")):
+                best[v] = alt
+                parent[v] = u
+                heapq.heappush(pq, (alt, v))
+    return SearchTree(source, dist, prev)
+
+
+# per-process graph for distance_matrix(processes=...): sent once per worker, not per task
+_worker_graph: Optional[Graph] = None
+
+def _init_worker(graph: Graph) -> None:
+    global _worker_graph
+    _worker_graph = graph
+
+def _matrix_rows(sources: List[Node], targets: List[Node]) -> np.ndarray:
+    return _distance_rows(_worker_graph, sources, targets)
+
+def _distance_rows(graph: Graph, sources: List[Node], targets: List[Node]) -> np.ndarray:
+    out = np.full((len(sources), len(targets)), np.inf)
+    for i, s in enumerate(sources):
+        dist = shortest_paths(graph, s, targets).dist
+        out[i] = [dist.get(t, np.inf) for t in targets]
+    return out
+
+def distance_matrix(graph: Graph, sources: List[Node], targets: List[Node],
+                    *, processes: Optional[int] = None, chunk_size: int = 16) -> np.ndarray:
+    """
+    km from every source (rows) to every target (columns); inf where unreachable.
+    One early-stopping search per source. With processes > 1, sources are split into
+    chunks of `chunk_size` and searched in a process pool.
+    """
+    sources, targets = list(sources), list(targets)
+    missing = [n for n in sources + targets if n not in graph.adj]
+    if missing:
+        raise ValueError(f"Nodes not present in graph: {missing[:5]}")
+    if not processes or processes <= 1 or len(sources) <= chunk_size:
+        return _distance_rows(graph, sources, targets)
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(graph,)) as pool:
+        rows = list(pool.map(_matrix_rows, chunks, [targets] * len(chunks)))
+    return np.vstack(rows)
+
+
+if __name__ == "__main__":
+    # --- Build a mini USYD campus graph ---
+    g = Graph()
+
+    # Approx walking distances (km)
+    g.add_edge("Fisher Library", "New Law Building", 0.2)
+    g.add_edge("Fisher Library", "Wentworth Building", 0.3)
+    g.add_edge("Fisher Library", "Quadrangle", 0.15)
+    g.add_edge("New Law Building", "Abercrombie Building", 0.5)
+    g.add_edge("Abercrombie Building", "Merewether Building", 0.25)
+    g.add_edge("Merewether Building", "Wentworth Building", 0.35)
+    g.add_edge("Quadrangle", "Great Hall", 0.1)
+    g.add_edge("Great Hall", "Manning House", 0.25)
+    g.add_edge("Manning House", "Wentworth Building", 0.2)
+    g.add_edge("Wentworth Building", "Charles Perkins Centre", 0.6)
+
+    # Example: shortest path from Fisher Library → Charles Perkins Centre
+    result = dijkstra(g, "Fisher Library", "Charles Perkins Centre",
+                      emission_rate_kg_per_km=0.18)  # 0.18 kg/km (small petrol car)
+
+    print("Shortest path:", " → ".join(result.path))
+    print(f"Distance: {result.distance_km:.2f} km")
+    print(f"Estimated emissions: {result.emissions_kg:.2f} kg CO₂")
+
+    # Distances from every pickup point to every user, one search per pickup point
+    pickups = ["Fisher Library", "Great Hall"]
+    users = ["Charles Perkins Centre", "Abercrombie Building", "Manning House"]
+    matrix = distance_matrix(g, pickups, users)
+    for name, row in zip(pickups, matrix):
+        print(f"{name:>15}: " + ", ".join(f"{u} {km:.2f} km" for u, km in zip(users, row)))
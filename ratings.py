@@ -1,28 +1,80 @@
-from dataclasses import Field
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict
-
-from customer_reviews import RatingsEngine
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, List, Dict
+
+import asyncio
+import atexit
+import json
+import os
+
+from concurrency import BoundedExecutor, Overloaded
+from customer_reviews import RatingsEngine, Review
+from result_cache import ResultCache
+from review_store import ReviewStore
 from social_style import SocialApp   # your suggestions engine
 
 # ---- Create app + engines FIRST ----
 app = FastAPI(title="Ratings API", version="1.0.0")
-eng = RatingsEngine()        # for reviews
+# set RATINGS_DATA_DIR to keep reviews across restarts (WAL + snapshots); a write is
+# acknowledged only once it is on disk (concurrent writers share each fsync)
+_data_dir = os.environ.get("RATINGS_DATA_DIR")
+_store = ReviewStore(_data_dir, wait_for_fsync=True) if _data_dir else None
+if _store is not None:
+    atexit.register(_store.close)
+eng = RatingsEngine(store=_store)   # for reviews
 app_suggest = SocialApp()    # for suggestions
 
+# Suggestion scoring is CPU-bound (NumPy releases the GIL), so it runs on its own
+# bounded pool: a burst of suggestion queries is shed with 503s instead of tying up
+# the threadpool that serves the plain `def` CRUD endpoints below.
+scoring = BoundedExecutor(
+    workers=int(os.environ.get("SUGGEST_WORKERS", "4")),
+    max_pending=int(os.environ.get("SUGGEST_MAX_PENDING", "64")),
+    timeout=float(os.environ.get("SUGGEST_TIMEOUT_S", "5")),
+)
+atexit.register(scoring.shutdown)
+
+# top-k results per (endpoint, user_id, k); valid while app_suggest.generation is unchanged
+suggest_cache = ResultCache(
+    max_entries=int(os.environ.get("SUGGEST_CACHE_ENTRIES", "10000")),
+    ttl=float(os.environ.get("SUGGEST_CACHE_TTL_S", "60")),
+)
+
+async def _score(key, fn):
+    generation = app_suggest.generation   # read before scoring: a concurrent write makes the entry stale
+    cached = suggest_cache.get(key, generation)
+    if cached is not None:
+        return cached
+    try:
+        res = await scoring.run(fn)
+    except Overloaded:
+        raise HTTPException(status_code=503, detail="suggestions overloaded, retry later",
+                            headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="suggestion scoring timed out")
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    suggest_cache.put(key, generation, res)
+    return res
+
 # ---- Now define endpoints ----
 @app.get("/suggestions/people")
-def suggest_people(user_id: int, k: int = 5) -> List[Dict]:
-    res = app_suggest.suggest_people(user_id, k=k, min_sim=0.0, exclude_followed=False)
+async def suggest_people(user_id: int, k: int = 5) -> List[Dict]:
+    res = await _score(("people", user_id, k),
+                       lambda: app_suggest.suggest_people(user_id, k=k, min_sim=0.0, exclude_followed=False))
     return [{"user_id": uid, "name": name, "score": score} for uid, name, score in res]
 
 @app.get("/suggestions/listings")
-def suggest_listings(user_id: int, k: int = 10) -> List[Dict]:
-    res = app_suggest.suggest_listings(user_id, k=k)
+async def suggest_listings(user_id: int, k: int = 10) -> List[Dict]:
+    res = await _score(("listings", user_id, k), lambda: app_suggest.suggest_listings(user_id, k=k))
     return [{"listing_id": lid, "title": title, "owner": owner, "score": score}
             for lid, title, owner, score in res]
 
+@app.get("/suggestions/cache")
+async def suggestions_cache_stats() -> Dict[str, Any]:
+    return {"generation": app_suggest.generation, **suggest_cache.stats()}
+
 # ---- Your other endpoints for users, listings, reviews go here ----
 
 
@@ -45,10 +97,15 @@ class ReviewIn(BaseModel):
     aesthetics_comfort: int = Field(..., ge=1, le=5)
     comment: str = ""
 
+class SummariesIn(BaseModel):
+    listing_ids: List[int] = Field(..., max_length=5000)
+
 # ----------- Health / root -----------
 @app.get("/health")
-def health() -> Dict[str, str]:
-    return {"status": "ok"}
+async def health() -> Dict[str, Any]:
+    # async: answered on the event loop even when every worker thread is busy
+    return {"status": "ok", "scoring_pending": scoring.pending,
+            "scoring_rejected": scoring.rejected, "scoring_timed_out": scoring.timed_out}
 
 @app.get("/")
 def root() -> Dict[str, str]:
@@ -105,23 +162,50 @@ def listing_summary(listing_id: int) -> Dict[str, Any]:
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@app.post("/listings/summaries")
+def listing_summaries(payload: SummariesIn) -> Dict[str, Any]:
+    """Summaries for many listings in one round trip (e.g. a whole ItemGrid page)."""
+    found, missing = eng.get_listing_summaries(payload.listing_ids)
+    return {
+        "summaries": [{"listing_id": lid, **summary} for lid, summary in found.items()],
+        "not_found": missing,
+    }
+
+def _review_json(r: Review) -> Dict[str, Any]:
+    # make dataclasses JSONable
+    return {
+        "listing_id": r.listing_id,
+        "rater_id": r.rater_id,
+        "material_construction": r.material_construction,
+        "performance_durability": r.performance_durability,
+        "aesthetics_comfort": r.aesthetics_comfort,
+        "comment": r.comment,
+        "created_at": r.created_at.isoformat(),
+        "updated_at": r.updated_at.isoformat(),
+    }
+
 @app.get("/listings/{listing_id}/reviews")
 def listing_reviews(listing_id: int) -> List[Dict[str, Any]]:
     try:
-        reviews = eng.get_reviews_for_listing(listing_id)
-        # make dataclasses JSONable
-        return [
-            {
-                "listing_id": r.listing_id,
-                "rater_id": r.rater_id,
-                "material_construction": r.material_construction,
-                "performance_durability": r.performance_durability,
-                "aesthetics_comfort": r.aesthetics_comfort,
-                "comment": r.comment,
-                "created_at": r.created_at.isoformat(),
-                "updated_at": r.updated_at.isoformat(),
-            }
-            for r in reviews
-        ]
+        return [_review_json(r) for r in eng.get_reviews_for_listing(listing_id)]
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/listings/{listing_id}/reviews/page")
+def listing_reviews_page(listing_id: int, limit: int = Query(50, ge=1, le=500), cursor: str = "",
+                         newest_first: bool = True) -> Dict[str, Any]:
+    """Reviews ordered by updated_at; follow next_cursor until it is null."""
+    if listing_id not in eng.listings:
+        raise HTTPException(status_code=404, detail="listing not found")
+    try:
+        page, next_cursor = eng.get_reviews_page(listing_id, limit=limit, cursor=cursor or None,
+                                                 newest_first=newest_first)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"reviews": [_review_json(r) for r in page], "next_cursor": next_cursor}
+
+@app.get("/reviews/export")
+def export_reviews() -> StreamingResponse:
+    """Every review as NDJSON (one object per line), generated lazily."""
+    lines = (json.dumps(_review_json(r), separators=(",", ":")) + "\n" for r in eng.iter_reviews())
+    return StreamingResponse(lines, media_type="application/x-ndjson")
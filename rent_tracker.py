@@ -1,6 +1,9 @@
+from bisect import bisect_left, bisect_right
+import heapq
+import math
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 # --- Domain models ---
@@ -12,20 +15,87 @@ class RentalStatus(Enum):
     RETURNED = auto()
     CANCELLED = auto()
 
+def _clamp_stars(stars: int) -> int:
+    # clamp stars to [1,5]
+    return max(1, min(5, stars))
+
 @dataclass
 class Item:
+    """
+    Ratings are kept as a 1-5 histogram plus integer count / sum / sum of squares, so
+    mean and variance are exact (no running-average drift) and a rating can be
+    removed or changed in O(1). Item(..., avg_item_rating, rating_count) still works:
+    with no histogram given, the old aggregates seed one with that count and mean.
+    """
     id: int
     owner_id: int
     title: str
     times_rented: int = 0                 # <-- the tracker you asked for
     avg_item_rating: float = 0.0
     rating_count: int = 0
+    rating_hist: List[int] = field(default_factory=lambda: [0] * 5)   # counts of 1..5 stars
+    rating_sum: int = field(default=0, init=False)
+    rating_sumsq: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.rating_count > 0 and not any(self.rating_hist):
+            # legacy aggregates: the histogram with that count whose sum is closest to avg * count
+            n = self.rating_count
+            total = max(n, min(5 * n, round(self.avg_item_rating * n)))
+            low, high_n = divmod(total, n)
+            self.rating_hist = [0] * 5
+            self.rating_hist[low - 1] = n - high_n
+            if high_n:
+                self.rating_hist[low] = high_n
+        self.rating_count = sum(self.rating_hist)
+        self.rating_sum = sum(n * s for s, n in enumerate(self.rating_hist, 1))
+        self.rating_sumsq = sum(n * s * s for s, n in enumerate(self.rating_hist, 1))
+        self._refresh_avg()
 
     def add_rating(self, stars: int) -> None:
-        # clamp stars to [1,5]
-        s = max(1, min(5, stars))
-        self.avg_item_rating = ((self.avg_item_rating * self.rating_count) + s) / (self.rating_count + 1)
-        self.rating_count += 1
+        self._adjust(_clamp_stars(stars), 1)
+
+    def remove_rating(self, stars: int) -> None:
+        s = _clamp_stars(stars)
+        if not self.rating_hist[s - 1]:
+            raise ValueError(f"Item has no {s}-star rating to remove.")
+        self._adjust(s, -1)
+
+    def update_rating(self, old_stars: int, new_stars: int) -> None:
+        self.remove_rating(old_stars)
+        self.add_rating(new_stars)
+
+    def _adjust(self, s: int, sign: int) -> None:
+        self.rating_hist[s - 1] += sign
+        self.rating_count += sign
+        self.rating_sum += sign * s
+        self.rating_sumsq += sign * s * s
+        self._refresh_avg()
+
+    def _refresh_avg(self) -> None:
+        self.avg_item_rating = self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    @property
+    def rating_variance(self) -> float:
+        """Sample variance of the ratings (0.0 with fewer than two)."""
+        n = self.rating_count
+        if n < 2:
+            return 0.0
+        # exact integer numerator: no cancellation error however many ratings
+        return (n * self.rating_sumsq - self.rating_sum ** 2) / (n * (n - 1))
+
+    def rating_score(self, z: float = 1.96) -> float:
+        """
+        Lower confidence bound on the mean rating, for ranking: mean - z * stderr.
+        Few ratings -> wide interval -> low score. With fewer than two ratings the
+        variance is taken as 4.0, the largest population variance on a 1-5 scale
+        (half 1s, half 5s). 0.0 when unrated.
+        """
+        n = self.rating_count
+        if not n:
+            return 0.0
+        var = self.rating_variance if n >= 2 else 4.0
+        return max(1.0, self.avg_item_rating - z * math.sqrt(var / n))
 
 @dataclass
 class Rental:
@@ -36,73 +106,308 @@ class Rental:
     end_date: datetime
     status: RentalStatus = RentalStatus.PENDING
 
+# Statuses that hold the item's calendar
+ACTIVE_STATUSES = (RentalStatus.PENDING, RentalStatus.ACCEPTED, RentalStatus.RENTED)
+
+# --- Availability calendar ---
+
+class AvailabilityIndex:
+    """
+    Per-item booking calendar: sorted, non-overlapping [start, end) intervals kept in
+    parallel lists, so overlap checks are two binary searches. Back-to-back bookings
+    (one ends exactly when the next starts) are allowed.
+    """
+    def __init__(self):
+        self._starts: Dict[int, List[datetime]] = {}
+        self._ends: Dict[int, List[datetime]] = {}
+        self._rental_ids: Dict[int, List[int]] = {}
+
+    def _conflict(self, item_id: int, start: datetime, end: datetime) -> Optional[int]:
+        ends = self._ends.get(item_id)
+        if not ends:
+            return None
+        # first booking ending after `start` is the only one that can overlap
+        i = bisect_right(ends, start)
+        return i if i < len(ends) and self._starts[item_id][i] < end else None
+
+    def is_free(self, item_id: int, start: datetime, end: datetime) -> bool:
+        return self._conflict(item_id, start, end) is None
+
+    def conflicting_rental(self, item_id: int, start: datetime, end: datetime) -> Optional[int]:
+        i = self._conflict(item_id, start, end)
+        return None if i is None else self._rental_ids[item_id][i]
+
+    def book(self, item_id: int, rental_id: int, start: datetime, end: datetime) -> None:
+        if self._conflict(item_id, start, end) is not None:
+            raise ValueError("Item is already booked for those dates.")
+        starts = self._starts.setdefault(item_id, [])
+        i = bisect_left(starts, start)
+        starts.insert(i, start)
+        self._ends.setdefault(item_id, []).insert(i, end)
+        self._rental_ids.setdefault(item_id, []).insert(i, rental_id)
+
+    def release(self, item_id: int, rental_id: int, start: datetime) -> bool:
+        starts = self._starts.get(item_id, [])
+        i = bisect_left(starts, start)
+        if i == len(starts) or self._rental_ids[item_id][i] != rental_id:
+            return False
+        del starts[i]; del self._ends[item_id][i]; del self._rental_ids[item_id][i]
+        return True
+
+    def bookings(self, item_id: int) -> List[Tuple[datetime, datetime, int]]:
+        return list(zip(self._starts.get(item_id, []), self._ends.get(item_id, []), self._rental_ids.get(item_id, [])))
+
+    def available_items(self, item_ids: Iterable[int], start: datetime, end: datetime) -> List[int]:
+        """Items from `item_ids` with no booking overlapping [start, end)."""
+        starts = self._starts
+        busy = set()
+        for item_id, e in self._ends.items():
+            i = bisect_right(e, start)
+            if i < len(e) and starts[item_id][i] < end:
+                busy.add(item_id)
+        return [i for i in item_ids if i not in busy]
+
 # --- In-memory “repository” ---
 
 class Repo:
+    """
+    In-memory store. Rental status must change through set_status(), which keeps the
+    secondary indexes (renter, item, status, due-date heap) and the calendar in sync.
+    """
     def __init__(self):
         self.items: Dict[int, Item] = {}
         self.rentals: Dict[int, Rental] = {}
         self._next_item_id = 1
         self._next_rental_id = 1
+        self.availability = AvailabilityIndex()
+        # secondary indexes (rental ids, in creation order)
+        self._by_renter: Dict[int, List[int]] = {}
+        self._by_item: Dict[int, List[int]] = {}
+        self._by_status: Dict[RentalStatus, Dict[int, None]] = {s: {} for s in RentalStatus}
+        # (end_date, rental_id) for rentals that went RENTED; stale entries skipped lazily
+        self._due_heap: List[Tuple[datetime, int]] = []
 
     def create_item(self, owner_id: int, title: str) -> Item:
-        item = Item(id=self._next_item_id, owner_id=owner_id, title=title)
+        return self._add_item(Item(id=self._next_item_id, owner_id=owner_id, title=title))
+
+    def _add_item(self, item: Item) -> Item:
         self.items[item.id] = item
-        self._next_item_id += 1
+        self._next_item_id = max(self._next_item_id, item.id + 1)
         return item
 
     def get_item(self, item_id: int) -> Optional[Item]:
         return self.items.get(item_id)
 
     def create_rental(self, item_id: int, renter_id: int, start: datetime, end: datetime) -> Rental:
-        rental = Rental(id=self._next_rental_id, item_id=item_id, renter_id=renter_id,
-                        start_date=start, end_date=end, status=RentalStatus.PENDING)
+        if item_id not in self.items:
+            raise ValueError("Item not found.")
+        if end <= start:
+            raise ValueError("Rental must end after it starts.")
+        return self._add_rental(Rental(id=self._next_rental_id, item_id=item_id, renter_id=renter_id,
+                                       start_date=start, end_date=end, status=RentalStatus.PENDING))
+
+    def _add_rental(self, rental: Rental) -> Rental:
+        """Insert a rental with a known id and status (creation, or replaying a log)."""
+        if rental.status in ACTIVE_STATUSES:
+            self.availability.book(rental.item_id, rental.id, rental.start_date, rental.end_date)
         self.rentals[rental.id] = rental
-        self._next_rental_id += 1
+        self._by_renter.setdefault(rental.renter_id, []).append(rental.id)
+        self._by_item.setdefault(rental.item_id, []).append(rental.id)
+        self._by_status[rental.status][rental.id] = None
+        if rental.status == RentalStatus.RENTED:
+            heapq.heappush(self._due_heap, (rental.end_date, rental.id))
+        self._next_rental_id = max(self._next_rental_id, rental.id + 1)
         return rental
 
     def get_rental(self, rental_id: int) -> Optional[Rental]:
         return self.rentals.get(rental_id)
 
+    def set_status(self, rental: Rental, status: RentalStatus) -> None:
+        old = rental.status
+        del self._by_status[old][rental.id]
+        self._by_status[status][rental.id] = None
+        rental.status = status
+        if status == RentalStatus.RENTED:
+            heapq.heappush(self._due_heap, (rental.end_date, rental.id))
+        if old in ACTIVE_STATUSES and status not in ACTIVE_STATUSES:
+            # cancelled or returned: free the dates (an early return frees the remaining days)
+            self.availability.release(rental.item_id, rental.id, rental.start_date)
+
+    def complete_rental(self, rental: Rental) -> None:
+        """RENTED -> RETURNED and bump the item's times_rented (one transaction in SqliteRepo)."""
+        item = self.items[rental.item_id]
+        self.set_status(rental, RentalStatus.RETURNED)
+        item.times_rented += 1
+
+    def rate_item(self, item_id: int, stars: int, previous: Optional[int] = None) -> Item:
+        """Add a rating, or replace the rater's `previous` one."""
+        item = self.items.get(item_id)
+        if item is None:
+            raise ValueError("Item not found.")
+        if previous is None:
+            item.add_rating(stars)
+        else:
+            item.update_rating(previous, stars)
+        return item
+
+    def get_rentals(self, rental_ids: Iterable[int]) -> Dict[int, Rental]:
+        """The rentals that exist among `rental_ids`, by id."""
+        rentals = self.rentals
+        return {i: rentals[i] for i in rental_ids if i in rentals}
+
+    def set_status_many(self, rentals: List[Rental], status: RentalStatus) -> List[int]:
+        """set_status for each rental; returns the ids that could not be applied (none in memory)."""
+        for r in rentals:
+            self.set_status(r, status)
+        return []
+
+    def complete_rentals(self, rentals: List[Rental]) -> List[int]:
+        """complete_rental for each rental, with one times_rented update per item."""
+        per_item: Dict[int, int] = {}
+        for r in rentals:
+            self.set_status(r, RentalStatus.RETURNED)
+            per_item[r.item_id] = per_item.get(r.item_id, 0) + 1
+        for item_id, n in per_item.items():
+            self.items[item_id].times_rented += n
+        return []
+
+    # --- queries ---
+    def rentals_for_renter(self, renter_id: int, statuses: Optional[Iterable[RentalStatus]] = None) -> List[Rental]:
+        ids = self._by_renter.get(renter_id, [])
+        if statuses is None:
+            return [self.rentals[i] for i in ids]
+        wanted = set(statuses)
+        return [r for r in (self.rentals[i] for i in ids) if r.status in wanted]
+
+    def active_rentals_for_renter(self, renter_id: int) -> List[Rental]:
+        return self.rentals_for_renter(renter_id, ACTIVE_STATUSES)
+
+    def rentals_for_item(self, item_id: int) -> List[Rental]:
+        """The item's rental history, oldest first."""
+        return [self.rentals[i] for i in self._by_item.get(item_id, [])]
+
+    def rentals_with_status(self, status: RentalStatus) -> List[Rental]:
+        return [self.rentals[i] for i in self._by_status[status]]
+
+    def count_by_status(self) -> Dict[RentalStatus, int]:
+        return {s: len(ids) for s, ids in self._by_status.items()}
+
+    def overdue_rentals(self, now: datetime) -> List[Rental]:
+        """RENTED rentals whose end_date has passed, most overdue first. Cost ~ k log n for k overdue."""
+        heap, overdue = self._due_heap, []
+        while heap and heap[0][0] < now:
+            end, rid = heapq.heappop(heap)
+            r = self.rentals[rid]
+            if r.status == RentalStatus.RENTED and r.end_date == end:
+                overdue.append(r)
+        for r in overdue:   # still out: keep them in the heap for the next scan
+            heapq.heappush(heap, (r.end_date, r.id))
+        return overdue
+
+    def is_available(self, item_id: int, start: datetime, end: datetime) -> bool:
+        return self.availability.is_free(item_id, start, end)
+
+    def available_items(self, start: datetime, end: datetime) -> List[Item]:
+        """All items with no active booking overlapping [start, end)."""
+        return [self.items[i] for i in self.availability.available_items(self.items, start, end)]
+
+@dataclass
+class BatchResult:
+    """Result of a RentalService batch call: ids applied, and (id, reason) per rejected id."""
+    applied: List[int] = field(default_factory=list)
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+
 # --- Rental service with the tracker logic ---
 
 class RentalService:
     """
     Handles rental state transitions. The 'times_rented' tracker increments
     exactly once when a rental completes (status moves to RETURNED).
+    Listeners registered with subscribe() are called as fn(rental, old_status, new_status)
+    after each transition.
     """
     def __init__(self, repo: Repo):
         self.repo = repo
+        self._listeners: List[Callable[[Rental, RentalStatus, RentalStatus], None]] = []
+
+    def subscribe(self, fn: Callable[[Rental, RentalStatus, RentalStatus], None]) -> None:
+        self._listeners.append(fn)
+
+    def _emit(self, r: Rental, old: RentalStatus) -> None:
+        for fn in self._listeners:
+            fn(r, old, r.status)
 
     def accept(self, rental_id: int) -> None:
         r = self._require_rental(rental_id)
         if r.status != RentalStatus.PENDING:
             raise ValueError("Rental must be PENDING to accept.")
-        r.status = RentalStatus.ACCEPTED
+        self.repo.set_status(r, RentalStatus.ACCEPTED)
+        self._emit(r, RentalStatus.PENDING)
 
     def handover(self, rental_id: int) -> None:
         r = self._require_rental(rental_id)
         if r.status not in (RentalStatus.ACCEPTED,):
             raise ValueError("Rental must be ACCEPTED to hand over.")
-        r.status = RentalStatus.RENTED
+        self.repo.set_status(r, RentalStatus.RENTED)
+        self._emit(r, RentalStatus.ACCEPTED)
 
     def mark_returned(self, rental_id: int) -> None:
         r = self._require_rental(rental_id)
         if r.status != RentalStatus.RENTED:
             raise ValueError("Rental must be RENTED to return.")
-        r.status = RentalStatus.RETURNED
-
-        # --- TRACKER: increment item's times_rented here ---
-        item = self.repo.get_item(r.item_id)
-        if not item:
+        if not self.repo.get_item(r.item_id):
             raise ValueError("Item not found for rental.")
-        item.times_rented += 1
+        # --- TRACKER: status change + times_rented increment happen together ---
+        self.repo.complete_rental(r)
+        self._emit(r, RentalStatus.RENTED)
+
+    # --- batches: validate every id first, then apply the valid ones in one pass ---
+    def accept_many(self, rental_ids: Iterable[int]) -> BatchResult:
+        return self._batch(rental_ids, RentalStatus.PENDING, RentalStatus.ACCEPTED, "Rental must be PENDING to accept.")
+
+    def handover_many(self, rental_ids: Iterable[int]) -> BatchResult:
+        return self._batch(rental_ids, RentalStatus.ACCEPTED, RentalStatus.RENTED, "Rental must be ACCEPTED to hand over.")
+
+    def mark_returned_many(self, rental_ids: Iterable[int]) -> BatchResult:
+        """Batch mark_returned; times_rented is bumped once per item with the batch's count."""
+        return self._batch(rental_ids, RentalStatus.RENTED, RentalStatus.RETURNED, "Rental must be RENTED to return.")
+
+    def _batch(self, rental_ids: Iterable[int], required: RentalStatus, target: RentalStatus, wrong_status: str) -> BatchResult:
+        ids = list(rental_ids)
+        found = self.repo.get_rentals(ids)
+        result, valid, seen = BatchResult(), [], set()
+        for i in ids:
+            r = found.get(i)
+            if r is None:
+                result.rejected.append((i, "Rental not found."))
+            elif i in seen:
+                result.rejected.append((i, "Duplicate rental id in batch."))
+            elif r.status != required:
+                result.rejected.append((i, wrong_status))
+            elif target == RentalStatus.RETURNED and not self.repo.get_item(r.item_id):
+                result.rejected.append((i, "Item not found for rental."))
+            else:
+                valid.append(r)
+            seen.add(i)
+        if target == RentalStatus.RETURNED:
+            failed = set(self.repo.complete_rentals(valid))
+        else:
+            failed = set(self.repo.set_status_many(valid, target))
+        for r in valid:
+            if r.id in failed:
+                result.rejected.append((r.id, "Rental was modified concurrently."))
+            else:
+                result.applied.append(r.id)
+                self._emit(r, required)
+        return result
 
     def cancel(self, rental_id: int) -> None:
         r = self._require_rental(rental_id)
         if r.status in (RentalStatus.RETURNED,):
             raise ValueError("Cannot cancel a completed rental.")
-        r.status = RentalStatus.CANCELLED
+        old = r.status
+        self.repo.set_status(r, RentalStatus.CANCELLED)
+        self._emit(r, old)
 
     def _require_rental(self, rental_id: int) -> Rental:
         r = self.repo.get_rental(rental_id)
@@ -141,7 +446,7 @@ if __name__ == "__main__":
     print(f"After rental 2 return: times_rented={repo.get_item(jacket.id).times_rented}")
 
     # Optional: capture an item rating after a completed rental
-    item = repo.get_item(jacket.id)
-    item.add_rating(5)
-    item.add_rating(4)
-    print(f"Item rating: {item.avg_item_rating:.2f} from {item.rating_count} ratings")
+    repo.rate_item(jacket.id, 5)
+    item = repo.rate_item(jacket.id, 4)
+    print(f"Item rating: {item.avg_item_rating:.2f} from {item.rating_count} ratings "
+          f"(variance {item.rating_variance:.2f}, ranking score {item.rating_score():.2f})")
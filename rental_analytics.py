@@ -0,0 +1,186 @@
+"""
+rental_analytics.py
+-------------------
+Utilization analytics over rent_tracker data, on NumPy day buckets.
+
+  - occupancy[row, day] = 1 if the item was out (handed over) on that calendar day;
+    built from all Rental intervals in one vectorized pass (difference array + cumsum)
+  - per-item / per-owner utilization over any window, fleet-wide rolling utilization,
+    top items, revenue for a window given daily prices
+  - seasonal demand: accepted (not cancelled) bookings by start month and weekday
+  - incremental: subscribe to RentalService and each transition touches only that
+    rental's days instead of recomputing everything
+
+Usage:
+    analytics = RentalAnalytics.from_repo(repo, origin=date(2025, 1, 1))
+    service.subscribe(analytics.on_transition)
+    analytics.owner_utilization(101, date(2025, 6, 1), date(2025, 9, 1))
+"""
+
+from __future__ import annotations
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rent_tracker import Rental, RentalStatus, Repo
+
+# statuses whose booked days count as the item being out
+OCCUPYING = (RentalStatus.RENTED, RentalStatus.RETURNED)
+# accepted and not cancelled: what seasonal demand counts
+BOOKED = (RentalStatus.ACCEPTED,) + OCCUPYING
+
+class RentalAnalytics:
+    """
+    Day buckets cover [origin, origin + days); rental days outside that are ignored.
+    A rental occupies every calendar day it touches: start_date's day through the day
+    of the last instant before end_date.
+
+    The fleet is every item in the repo at rebuild() plus items seen in transitions
+    since; call track_item() for a new item so its idle days count too.
+    """
+    def __init__(self, repo: Repo, origin: date, days: int = 3 * 366):
+        self.repo = repo
+        self.origin = origin
+        self.days = days
+        self._row: Dict[int, int] = {}          # item id -> row
+        self._item_ids: List[int] = []          # row -> item id
+        self._owner_rows: Dict[int, List[int]] = {}
+        self.occupancy = np.zeros((0, days), dtype=np.int16)
+        self.demand_by_month = np.zeros(12, dtype=np.int64)
+        self.demand_by_weekday = np.zeros(7, dtype=np.int64)
+
+    @classmethod
+    def from_repo(cls, repo: Repo, origin: date, days: int = 3 * 366) -> "RentalAnalytics":
+        a = cls(repo, origin, days)
+        a.rebuild()
+        return a
+
+    # ----- rows -----
+    def _ensure_row(self, item_id: int) -> int:
+        row = self._row.get(item_id)
+        if row is not None:
+            return row
+        row = len(self._item_ids)
+        if row == self.occupancy.shape[0]:   # grow geometrically
+            grown = np.zeros((max(16, 2 * row), self.days), dtype=self.occupancy.dtype)
+            grown[:row] = self.occupancy
+            self.occupancy = grown
+        self._row[item_id] = row
+        self._item_ids.append(item_id)
+        item = self.repo.get_item(item_id)
+        self._owner_rows.setdefault(item.owner_id if item else -1, []).append(row)
+        return row
+
+    def track_item(self, item_id: int) -> None:
+        self._ensure_row(item_id)
+
+    def _occ(self) -> np.ndarray:
+        return self.occupancy[:len(self._item_ids)]
+
+    def _day(self, d: date) -> int:
+        return (d - self.origin).days
+
+    def _span(self, r: Rental) -> Tuple[int, int]:
+        """[first, last + 1) day buckets of `r`, clipped to the horizon."""
+        first = self._day(r.start_date.date())
+        last = self._day((r.end_date - timedelta(microseconds=1)).date())
+        return max(first, 0), min(last + 1, self.days)
+
+    def _window(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+        s = 0 if start is None else max(self._day(start), 0)
+        e = self.days if end is None else min(self._day(end), self.days)
+        return s, max(s, e)
+
+    # ----- bulk build -----
+    def rebuild(self) -> None:
+        """Recompute everything from the repo in one vectorized pass."""
+        self._row.clear(); self._item_ids.clear(); self._owner_rows.clear()
+        self.occupancy = np.zeros((0, self.days), dtype=np.int16)
+        self.demand_by_month[:] = 0
+        self.demand_by_weekday[:] = 0
+        for item_id in self.repo.items:
+            self._ensure_row(item_id)
+
+        rentals = list(self.repo.rentals.values())
+        out = [r for r in rentals if r.status in OCCUPYING]
+        if out:
+            rows = np.fromiter((self._ensure_row(r.item_id) for r in out), dtype=np.int64, count=len(out))
+            spans = np.array([self._span(r) for r in out], dtype=np.int64).reshape(-1, 2)
+            keep = spans[:, 0] < spans[:, 1]
+            rows, spans = rows[keep], spans[keep]
+            # difference array: +1 on the first day, -1 after the last, then a running sum
+            diff = np.zeros((len(self._item_ids), self.days + 1), dtype=np.int32)
+            np.add.at(diff, (rows, spans[:, 0]), 1)
+            np.add.at(diff, (rows, spans[:, 1]), -1)
+            self._occ()[:] = np.cumsum(diff[:, :-1], axis=1)
+
+        accepted = [r.start_date for r in rentals if r.status in BOOKED]
+        if accepted:
+            self.demand_by_month += np.bincount([d.month - 1 for d in accepted], minlength=12)
+            self.demand_by_weekday += np.bincount([d.weekday() for d in accepted], minlength=7)
+
+    # ----- incremental updates -----
+    def on_transition(self, rental: Rental, old: RentalStatus, new: RentalStatus) -> None:
+        """RentalService listener; O(rental length)."""
+        booked_delta = (new in BOOKED) - (old in BOOKED)
+        if booked_delta:
+            self.demand_by_month[rental.start_date.month - 1] += booked_delta
+            self.demand_by_weekday[rental.start_date.weekday()] += booked_delta
+        was, now = old in OCCUPYING, new in OCCUPYING
+        if was != now:
+            row = self._ensure_row(rental.item_id)
+            s, e = self._span(rental)
+            if s < e:
+                self.occupancy[row, s:e] += 1 if now else -1
+
+    # ----- queries -----
+    def item_utilization(self, item_id: int, start: Optional[date] = None, end: Optional[date] = None) -> float:
+        """Fraction of days in [start, end) the item was out."""
+        row = self._row.get(item_id)
+        s, e = self._window(start, end)
+        if row is None or s == e:
+            return 0.0
+        return float(np.count_nonzero(self.occupancy[row, s:e]) / (e - s))
+
+    def owner_utilization(self, owner_id: int, start: Optional[date] = None, end: Optional[date] = None) -> float:
+        """Fraction of item-days in [start, end) the owner's items were out."""
+        rows = self._owner_rows.get(owner_id)
+        s, e = self._window(start, end)
+        if not rows or s == e:
+            return 0.0
+        return float(np.count_nonzero(self.occupancy[rows, s:e]) / (len(rows) * (e - s)))
+
+    def daily_utilization(self) -> np.ndarray:
+        """Fraction of all items out on each day of the horizon."""
+        occ = self._occ()
+        if not len(occ):
+            return np.zeros(self.days)
+        return np.count_nonzero(occ, axis=0) / len(occ)
+
+    def rolling_utilization(self, window: int = 30) -> np.ndarray:
+        """Trailing `window`-day mean of daily_utilization (shorter at the start of the horizon)."""
+        daily = self.daily_utilization()
+        c = np.concatenate(([0.0], np.cumsum(daily)))
+        idx = np.arange(1, self.days + 1)
+        lo = np.maximum(idx - window, 0)
+        return (c[idx] - c[lo]) / (idx - lo)
+
+    def top_items(self, k: int = 10, start: Optional[date] = None, end: Optional[date] = None) -> List[Tuple[int, int]]:
+        """(item_id, days out) for the k busiest items in [start, end)."""
+        s, e = self._window(start, end)
+        occ = self._occ()
+        if not len(occ) or k <= 0:
+            return []
+        busy = np.count_nonzero(occ[:, s:e], axis=1)
+        k = min(k, len(busy))
+        top = np.argpartition(-busy, k - 1)[:k]
+        top = top[np.lexsort((top, -busy[top]))]
+        return [(self._item_ids[i], int(busy[i])) for i in top]
+
+    def revenue(self, daily_price: Dict[int, float], start: Optional[date] = None, end: Optional[date] = None) -> float:
+        """Sum of days out x daily price over [start, end); items without a price earn 0."""
+        s, e = self._window(start, end)
+        occ = self._occ()
+        prices = np.array([daily_price.get(i, 0.0) for i in self._item_ids], dtype=np.float64)
+        return float(np.count_nonzero(occ[:, s:e], axis=1) @ prices) if len(occ) else 0.0
@@ -0,0 +1,213 @@
+"""
+rental_events.py
+----------------
+Event-sourced rent_tracker.Repo: every change is an append-only event, and the
+current state is a projection of the log.
+
+  - Events (NDJSON records): item created, item rated, rental created, rental
+    status changed; each carries the epoch time it happened
+  - Projections kept up to date as events apply: Repo state (rentals, indexes,
+    calendar), Item.times_rented, per-rental status timeline, per-owner utilization,
+    time-to-accept
+  - Durability and fast startup come from review_store.ReviewStore: group-committed
+    log segments plus compacted snapshots, so a restart replays one snapshot plus
+    the tail of the log instead of every event ever written
+
+Every status is entered at most once (PENDING -> ACCEPTED -> RENTED -> RETURNED, or
+CANCELLED), so a rental's timeline of entry times is its full history; snapshots
+keep it, and history survives compaction. Setting a rental to the status it is
+already in (cancelling a cancelled rental) is a no-op, as in Repo, and logs nothing.
+
+Mutations and checkpoints are serialized by one lock, so a snapshot never sees a
+half-applied event; waiting for an event's fsync happens after releasing it.
+
+Usage:
+    store = ReviewStore("data/rentals")
+    repo = EventSourcedRepo(store=store)     # restores, then logs every change
+    service = RentalService(repo)
+    ...
+    store.close()
+"""
+
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rent_tracker import Item, Rental, RentalStatus, Repo, _clamp_stars
+
+@dataclass
+class OwnerStats:
+    items: int = 0
+    listed_since_sum: float = 0.0   # sum of the items' listing times (epoch seconds)
+    completed: int = 0
+    rented_seconds: float = 0.0     # handover -> return, completed rentals only
+
+    def utilization(self, now: float) -> float:
+        """Fraction of the owner's listed item-time that items spent rented out."""
+        listed = self.items * now - self.listed_since_sum
+        return self.rented_seconds / listed if listed > 0 else 0.0
+
+class EventSourcedRepo(Repo):
+    """
+    Same interface as Repo. Mutations are written to the store (if any) as events,
+    then applied; replaying the same events rebuilds the same state.
+    """
+    def __init__(self, store=None, clock: Callable[[], float] = time.time):
+        super().__init__()
+        self.clock = clock
+        self.timeline: Dict[int, Dict[str, float]] = {}   # rental id -> {status name: entered at}
+        self.listed_at: Dict[int, float] = {}
+        self.owners: Dict[int, OwnerStats] = {}
+        self._accept_wait_sum = 0.0
+        self._accept_wait_n = 0
+        self._lock = threading.Lock()   # validate + log + apply, and checkpoints
+        self._store = None
+        if store is not None:
+            store.restore(self)
+            self._store = store
+
+    # ----- log plumbing -----
+    def _commit(self, rec: dict):
+        # caller holds self._lock
+        ticket = self._store.append(rec) if self._store is not None else None
+        self._apply(rec)
+        return ticket
+
+    def _settle(self, ticket) -> None:
+        # wait for the event's fsync (if the store asks for it), then checkpoint if due
+        if self._store is not None:
+            self._store.wait(ticket)
+            self._maybe_checkpoint()
+
+    def _maybe_checkpoint(self) -> None:
+        if self._store is not None and self._store.checkpoint_due():
+            with self._lock:
+                if self._store.checkpoint_due():
+                    self._store.checkpoint(self)
+
+    def _apply(self, rec: dict) -> None:
+        op = rec["op"]
+        if op == "item":
+            item = self._add_item(Item(id=rec["id"], owner_id=rec["owner_id"], title=rec["title"],
+                                       rating_hist=list(rec.get("rating_hist", (0,) * 5))))
+            self.listed_at[item.id] = rec["at"]
+            o = self.owners.setdefault(item.owner_id, OwnerStats())
+            o.items += 1
+            o.listed_since_sum += rec["at"]
+        elif op == "rental":
+            status = RentalStatus[rec.get("status", "PENDING")]
+            rental = self._add_rental(Rental(id=rec["id"], item_id=rec["item_id"], renter_id=rec["renter_id"],
+                                             start_date=datetime.fromisoformat(rec["start"]),
+                                             end_date=datetime.fromisoformat(rec["end"]), status=status))
+            # a snapshot record carries the whole timeline; a creation event just its own time
+            times = rec.get("times") or {"PENDING": rec["at"]}
+            self.timeline[rental.id] = dict(times)
+            if "ACCEPTED" in times:
+                self._accept_wait_sum += times["ACCEPTED"] - times["PENDING"]
+                self._accept_wait_n += 1
+            if status == RentalStatus.RETURNED:
+                self._project_return(rental)
+        elif op == "rating":
+            Repo.rate_item(self, rec["item_id"], rec["stars"], rec.get("previous"))
+        elif op == "status":
+            rental = self.rentals[rec["id"]]
+            status = RentalStatus[rec["to"]]
+            Repo.set_status(self, rental, status)
+            times = self.timeline[rental.id]
+            times[status.name] = rec["at"]
+            if status == RentalStatus.ACCEPTED:
+                self._accept_wait_sum += rec["at"] - times["PENDING"]
+                self._accept_wait_n += 1
+            elif status == RentalStatus.RETURNED:
+                self._project_return(rental)
+        else:
+            raise ValueError(f"unknown record op {op!r}")
+
+    def _project_return(self, rental: Rental) -> None:
+        item = self.items[rental.item_id]
+        item.times_rented += 1
+        times = self.timeline[rental.id]
+        o = self.owners[item.owner_id]
+        o.completed += 1
+        o.rented_seconds += times["RETURNED"] - times.get("RENTED", times["RETURNED"])
+
+    def _records(self):
+        """Records that rebuild the current state (used for compacted snapshots)."""
+        for item in self.items.values():
+            yield {"op": "item", "id": item.id, "owner_id": item.owner_id, "title": item.title,
+                   "at": self.listed_at[item.id], "rating_hist": item.rating_hist}
+        for r in self.rentals.values():
+            yield {"op": "rental", "id": r.id, "item_id": r.item_id, "renter_id": r.renter_id,
+                   "start": r.start_date.isoformat(), "end": r.end_date.isoformat(),
+                   "status": r.status.name, "times": self.timeline[r.id]}
+
+    # ----- Repo mutations, as events -----
+    def create_item(self, owner_id: int, title: str) -> Item:
+        with self._lock:
+            item_id = self._next_item_id
+            ticket = self._commit({"op": "item", "id": item_id, "owner_id": owner_id, "title": title,
+                                   "at": self.clock()})
+        self._settle(ticket)
+        return self.items[item_id]
+
+    def rate_item(self, item_id: int, stars: int, previous: Optional[int] = None) -> Item:
+        with self._lock:
+            item = self.items.get(item_id)
+            if item is None:
+                raise ValueError("Item not found.")
+            if previous is not None and not item.rating_hist[_clamp_stars(previous) - 1]:
+                raise ValueError(f"Item has no {_clamp_stars(previous)}-star rating to remove.")
+            rec = {"op": "rating", "item_id": item_id, "stars": stars, "at": self.clock()}
+            if previous is not None:
+                rec["previous"] = previous
+            ticket = self._commit(rec)
+        self._settle(ticket)
+        return item
+
+    def create_rental(self, item_id: int, renter_id: int, start: datetime, end: datetime) -> Rental:
+        # validate before logging: a logged event must always apply
+        if item_id not in self.items:
+            raise ValueError("Item not found.")
+        if end <= start:
+            raise ValueError("Rental must end after it starts.")
+        with self._lock:
+            if not self.availability.is_free(item_id, start, end):
+                raise ValueError("Item is already booked for those dates.")
+            rental_id = self._next_rental_id
+            ticket = self._commit({"op": "rental", "id": rental_id, "item_id": item_id, "renter_id": renter_id,
+                                   "start": start.isoformat(), "end": end.isoformat(), "at": self.clock()})
+        self._settle(ticket)
+        return self.rentals[rental_id]
+
+    def set_status(self, rental: Rental, status: RentalStatus) -> None:
+        with self._lock:
+            if rental.status == status:
+                return   # already there: nothing to log
+            if status.name in self.timeline[rental.id]:
+                raise ValueError(f"Rental was already {status.name}.")
+            ticket = self._commit({"op": "status", "id": rental.id, "to": status.name, "at": self.clock()})
+        self._settle(ticket)
+
+    def complete_rental(self, rental: Rental) -> None:
+        # times_rented is a projection of the RETURNED event
+        self.set_status(rental, RentalStatus.RETURNED)
+
+    def complete_rentals(self, rentals: List[Rental]) -> List[int]:
+        return self.set_status_many(rentals, RentalStatus.RETURNED)
+
+    # ----- projections -----
+    def history(self, rental_id: int) -> List[Tuple[RentalStatus, datetime]]:
+        """(status, entered at) for each status the rental has been in, oldest first."""
+        times = self.timeline[rental_id]
+        return [(RentalStatus[s], datetime.fromtimestamp(t)) for s, t in sorted(times.items(), key=lambda kv: (kv[1], RentalStatus[kv[0]].value))]
+
+    def mean_time_to_accept(self) -> Optional[float]:
+        """Average seconds from request to acceptance, over accepted rentals."""
+        return self._accept_wait_sum / self._accept_wait_n if self._accept_wait_n else None
+
+    def owner_utilization(self, owner_id: int, now: Optional[float] = None) -> float:
+        o = self.owners.get(owner_id)
+        return o.utilization(self.clock() if now is None else now) if o else 0.0
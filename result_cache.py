@@ -0,0 +1,73 @@
+"""
+result_cache.py
+---------------
+LRU + TTL cache for computed results (e.g. top-k suggestions) that are only valid
+for one state "generation" of the engine that produced them.
+
+  - put(key, generation, value): store a result computed at `generation`
+  - get(key, generation): hit only if the entry is younger than `ttl` seconds AND
+    was computed at the same generation; otherwise it is dropped as stale
+  - stats(): hits / misses / stale / evictions and the hit rate
+
+Thread-safe. No external dependencies. Pure Python.
+"""
+
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISS = object()
+
+class ResultCache:
+    def __init__(self, max_entries: int = 10_000, ttl: Optional[float] = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, generation: int, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISS)
+            if entry is _MISS:
+                self.misses += 1
+                return default
+            gen, stored_at, value = entry
+            if gen != generation or (self.ttl is not None and now - stored_at > self.ttl):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, generation: int, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
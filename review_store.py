@@ -0,0 +1,245 @@
+"""
+review_store.py
+---------------
+Durable storage backend for customer_reviews.RatingsEngine (and
+rental_events.EventSourcedRepo; anything with _apply(rec) / _records()).
+
+  - Append-only write-ahead log (NDJSON, one mutation record per line)
+  - Group commit: a background thread fsyncs everything appended since the last
+    sync in one go, so writers don't each pay for an fsync
+  - Periodic compacted snapshots (the engine's current state as records), after
+    which older log segments are deleted
+  - Startup = load snapshot + replay the log segments written after it
+
+Usage:
+    store = ReviewStore("data/reviews")
+    eng = RatingsEngine(store=store)   # restores, then logs every mutation
+    ...
+    store.close()
+
+No external dependencies. Pure Python.
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+from typing import IO, Iterator, List, Optional, Tuple
+
+SNAPSHOT = "snapshot.ndjson"
+
+def _fsync_dir(directory: str) -> None:
+    # make renames/creations durable (not supported on every platform)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+# ---------------------------
+# Write-ahead log segment
+# ---------------------------
+class WriteAheadLog:
+    """
+    One append-only log file with group commit.
+    append() hands the record to the OS immediately (it survives a process crash) and
+    returns its sequence number; the flusher thread fsyncs at most every
+    `group_commit_ms`, outside the lock, so appends never wait behind a disk flush.
+    wait(seq) blocks until that record is on disk. With wait_for_fsync=True, append()
+    does that itself (the fsync is still shared with concurrent writers).
+    """
+    def __init__(self, path: str, group_commit_ms: float = 5.0, wait_for_fsync: bool = False):
+        self.path = path
+        self.wait_for_fsync = wait_for_fsync
+        self._interval = group_commit_ms / 1000.0
+        self._f: IO[str] = open(path, "a", encoding="utf-8")
+        self._cond = threading.Condition()
+        self._appended = 0   # sequence number of the last appended record
+        self._synced = 0     # sequence number of the last fsynced record
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def append(self, rec: dict) -> int:
+        line = json.dumps(rec, separators=(",", ":")) + "\n"
+        with self._cond:
+            if self._closed:
+                raise ValueError("write-ahead log is closed")
+            self._f.write(line)
+            self._f.flush()   # userspace buffer -> OS
+            self._appended += 1
+            seq = self._appended
+            self._cond.notify_all()
+        if self.wait_for_fsync:
+            self.wait(seq)
+        return seq
+
+    def wait(self, seq: int) -> None:
+        """Block until record `seq` (from append) is on disk."""
+        with self._cond:
+            while self._synced < seq:
+                self._cond.wait()
+
+    def _sync(self) -> None:
+        # everything up to `seq` is already in the OS (append flushes); only the
+        # fsync is left, and it runs without the lock so appends keep going
+        with self._cond:
+            seq = self._appended
+            if seq <= self._synced:
+                return
+            fd = self._f.fileno()
+        os.fsync(fd)
+        with self._cond:
+            if seq > self._synced:
+                self._synced = seq
+            self._cond.notify_all()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._synced == self._appended and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return   # close() does the final sync
+                # let more writers join this batch
+                self._cond.wait(self._interval)
+            self._sync()
+
+    def flush(self) -> None:
+        """Force everything appended so far to disk."""
+        self._sync()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._sync()
+        self._f.close()
+
+def read_records(path: str, truncate_torn_tail: bool = False) -> Iterator[dict]:
+    """
+    Yield the records of a log/snapshot file. A partial last line (crash mid-write) is
+    ignored, and cut off the file if truncate_torn_tail; corruption elsewhere raises.
+    """
+    good = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                raise ValueError(f"corrupt record in {path} at byte {good}")
+            good += len(raw)
+            yield rec
+    if truncate_torn_tail and os.path.getsize(path) > good:
+        with open(path, "r+b") as f:
+            f.truncate(good)
+
+# ---------------------------
+# Store = snapshot + log segments
+# ---------------------------
+class ReviewStore:
+    """
+    Directory layout:
+      snapshot.ndjson      {"op": "meta", "wal_gen": N} followed by state records
+      wal-<gen>.log        mutations after the snapshot, gen >= N
+
+    Engines append() while holding their own locks and wait() for the returned ticket
+    after releasing them, so writers that share a lock still share one fsync.
+    """
+    def __init__(self, directory: str, group_commit_ms: float = 5.0, wait_for_fsync: bool = False,
+                 snapshot_every: int = 100_000):
+        self.directory = directory
+        self.group_commit_ms = group_commit_ms
+        self.wait_for_fsync = wait_for_fsync
+        self.snapshot_every = snapshot_every
+        self._gen = 0
+        self._since_snapshot = 0
+        self._wal: Optional[WriteAheadLog] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _wal_path(self, gen: int) -> str:
+        return os.path.join(self.directory, f"wal-{gen:06d}.log")
+
+    def _segments(self) -> List[int]:
+        return sorted(int(fn[4:10]) for fn in os.listdir(self.directory)
+                      if fn.startswith("wal-") and fn.endswith(".log"))
+
+    def _open_wal(self, gen: int) -> None:
+        self._gen = gen
+        self._wal = WriteAheadLog(self._wal_path(gen), self.group_commit_ms)
+
+    # ----- engine hooks -----
+    def restore(self, engine) -> None:
+        """Rebuild `engine` from the snapshot and log, then start logging."""
+        first_gen = 0
+        snap = os.path.join(self.directory, SNAPSHOT)
+        if os.path.exists(snap):
+            records = read_records(snap)
+            meta = next(records)
+            first_gen = meta["wal_gen"]
+            for rec in records:
+                engine._apply(rec)
+        segments = [g for g in self._segments() if g >= first_gen]
+        for gen in segments:
+            for rec in read_records(self._wal_path(gen), truncate_torn_tail=(gen == segments[-1])):
+                engine._apply(rec)
+                self._since_snapshot += 1
+        self._open_wal(segments[-1] if segments else first_gen)
+
+    def append(self, rec: dict) -> Tuple[WriteAheadLog, int]:
+        """Log `rec` (in the OS, not yet fsynced); returns a ticket for wait()."""
+        wal = self._wal
+        seq = wal.append(rec)
+        self._since_snapshot += 1   # approximate under concurrent appends; only paces snapshots
+        return wal, seq
+
+    def wait(self, ticket: Tuple[WriteAheadLog, int]) -> None:
+        """With wait_for_fsync, block until the appended record is on disk. Call it
+        without holding engine locks. A checkpoint closes (so syncs) the old segment."""
+        if self.wait_for_fsync:
+            wal, seq = ticket
+            wal.wait(seq)
+
+    def checkpoint_due(self) -> bool:
+        return self._since_snapshot >= self.snapshot_every
+
+    # ----- maintenance -----
+    def checkpoint(self, engine) -> None:
+        """
+        Write a compacted snapshot of `engine` and drop the log segments it covers.
+        Must not race with mutations of the engine.
+        """
+        old_gen = self._gen
+        self._wal.close()
+        self._open_wal(old_gen + 1)
+
+        tmp = os.path.join(self.directory, SNAPSHOT + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "meta", "wal_gen": self._gen}) + "\n")
+            for rec in engine._records():
+                f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.directory, SNAPSHOT))
+        _fsync_dir(self.directory)
+        for gen in self._segments():
+            if gen < self._gen:
+                os.remove(self._wal_path(gen))
+        self._since_snapshot = 0
+
+    def flush(self) -> None:
+        self._wal.flush()
+
+    def close(self) -> None:
+        if self._wal is not None:
+            self._wal.close()
@@ -2,10 +2,21 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Set, Optional
+from array import array
+from bisect import bisect_left
+from collections.abc import ItemsView, Mapping, ValuesView
+from functools import wraps
+from itertools import repeat
+import json
+import os
+import shutil
+import tempfile
 import numpy as np
 import re
 
+from concurrency import RWLock
+
 TYPES = ["dress","jacket","coat","shirt","top","jeans","pants","skirt","sneakers","boots","hoodie","suit"]
 STYLES = ["formal","casual","vintage","streetwear","sport","festival","y2k","minimal","preppy","boho"]
 SEASONS = ["winter","summer","spring","autumn"]
@@ -34,6 +45,25 @@ def text_to_vec(text: str) -> np.ndarray:
     n = np.linalg.norm(v)
     return v / n if n else v
 
+# Batch tokenizer: same [a-z]+ tokens as _tokens, plus "\n" marking the boundary between texts.
+_BATCH_RE = re.compile(r"[a-z]+|\n")
+_BATCH_IDX = {**IDX, "\n": -1}
+_OOV = -2
+
+def texts_to_matrix(texts: Iterable[str]) -> np.ndarray:
+    """Batched text_to_vec: one weighted, L2-normalized row per text (float32, shape (n, len(VOCAB)))."""
+    texts = [t.replace("\n", " ") for t in texts]
+    n, V = len(texts), len(VOCAB)
+    toks = _BATCH_RE.findall("\n".join(texts).lower())
+    hits = np.fromiter(map(_BATCH_IDX.get, toks, repeat(_OOV, len(toks))), dtype=np.int64, count=len(toks))
+    rows = np.cumsum(hits == -1)
+    keep = hits >= 0
+    M = np.bincount(rows[keep] * V + hits[keep], minlength=n * V).astype(np.float32).reshape(n, V)
+    M *= WEIGHTS
+    norms = np.linalg.norm(M, axis=1, keepdims=True)
+    np.divide(M, norms, out=M, where=norms > 0)
+    return M
+
 def avg_and_norm(vecs: List[np.ndarray]) -> np.ndarray:
     if not vecs:
         return np.zeros(len(VOCAB), dtype=np.float32)
@@ -85,32 +115,482 @@ class User:
         n = np.linalg.norm(v)
         return v / n if n else v
 
-class SocialApp:
+# -----------------------------
+# Columnar storage (storage="columnar")
+# -----------------------------
+_PRIVACIES = list(Privacy)
+_PRIVACY_CODE = {p: i for i, p in enumerate(_PRIVACIES)}
+
+def _np_view(a: array) -> np.ndarray:
+    # zero-copy NumPy view over an array.array buffer
+    return np.frombuffer(a, dtype=f"i{a.itemsize}")
+
+class VecStore:
+    """
+    Growable float32 matrix. Rows are addressed by index; `matrix` is a view of the used
+    rows. Grows by 1/8 (list-style) rather than doubling, so unused capacity stays small.
+    """
+    def __init__(self, dim: int = len(VOCAB), capacity: int = 1024):
+        self._data = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._data[:self._n]
+
+    def row(self, i: int) -> np.ndarray:
+        return self._data[i]
+
+    @classmethod
+    def from_matrix(cls, M: np.ndarray) -> "VecStore":
+        # M may be a read-only memmap; it is copied on the first write
+        store = cls.__new__(cls)
+        store._data = M
+        store._n = len(M)
+        return store
+
+    def _resize(self, capacity: int) -> None:
+        grown = np.zeros((max(1, capacity), self._data.shape[1]), dtype=np.float32)
+        grown[:self._n] = self._data[:self._n]
+        self._data = grown
+
+    def set_row(self, i: int, vec: np.ndarray) -> None:
+        if not self._data.flags.writeable:
+            self._resize(len(self._data))
+        self._data[i] = vec
+
+    def _reserve(self, extra: int) -> None:
+        need, cap = self._n + extra, len(self._data)
+        if need > cap or not self._data.flags.writeable:
+            self._resize(max(need, cap + cap // 8 + 64) if need > cap else cap)
+
+    def append(self, vec: np.ndarray) -> int:
+        self._reserve(1)
+        self._data[self._n] = vec
+        self._n += 1
+        return self._n - 1
+
+    def extend(self, M: np.ndarray) -> None:
+        self._reserve(len(M))
+        self._data[self._n:self._n + len(M)] = M
+        self._n += len(M)
+
+class ListingStore:
+    """
+    One row per listing, in listing-id order (ids only ever increase), so the id column
+    doubles as the index: no per-listing objects are kept, see ListingTable.
+    """
+    def __init__(self):
+        self.vecs = VecStore()
+        self.ids = array("l")
+        self.owner_ids = array("l")
+        self.owner_rows = array("l")   # row of the owner in the UserStore
+        self.privacy = array("b")      # index into _PRIVACIES
+        self.titles: List[str] = []
+        self.descriptions: List[str] = []
+
+    def row_of(self, listing_id: int) -> int:
+        """Row of `listing_id`, or -1. O(1) while ids are contiguous, else a binary search."""
+        ids = self.ids
+        if not ids:
+            return -1
+        row = listing_id - ids[0]
+        if not (0 <= row < len(ids) and ids[row] == listing_id):
+            row = bisect_left(ids, listing_id)
+            if row == len(ids) or ids[row] != listing_id:
+                return -1
+        return row
+
+    def new_listing(self, listing_id: int, owner_id: int, owner_row: int, title: str,
+                    description: str, privacy: Privacy, vec: np.ndarray) -> None:
+        self.vecs.append(vec)
+        self.ids.append(listing_id)
+        self.owner_ids.append(owner_id)
+        self.owner_rows.append(owner_row)
+        self.privacy.append(_PRIVACY_CODE[privacy])
+        self.titles.append(title)
+        self.descriptions.append(description)
+
+    def new_listings(self, listing_ids: List[int], owner_ids: List[int], owner_rows: List[int],
+                     titles: List[str], descriptions: List[str], privacies: List[Privacy], M: np.ndarray) -> None:
+        self.vecs.extend(M)
+        self.ids.extend(listing_ids)
+        self.owner_ids.extend(owner_ids)
+        self.owner_rows.extend(owner_rows)
+        self.privacy.extend(_PRIVACY_CODE[p] for p in privacies)
+        self.titles.extend(titles)
+        self.descriptions.extend(descriptions)
+
+class UserStore:
     def __init__(self):
+        self.quiz = VecStore()
+        self.ids = array("l")
+        self.circle = array("h")       # index into circle_names
+        self.circle_names: List[str] = []
+        self.circle_codes: Dict[str, int] = {}
+
+    def circle_code(self, circle: str) -> int:
+        code = self.circle_codes.get(circle)
+        if code is None:
+            code = self.circle_codes[circle] = len(self.circle_names)
+            self.circle_names.append(circle)
+        return code
+
+    def new_user(self, user_id: int, name: str, circle: str) -> "UserRecord":
+        row = self.quiz.append(np.zeros(len(VOCAB), dtype=np.float32))
+        self.ids.append(user_id)
+        self.circle.append(self.circle_code(circle))
+        return UserRecord(self, row, user_id, name)
+
+class ListingRecord:
+    """Drop-in for Listing: a short-lived view of one ListingStore row (built on access)."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: ListingStore, row: int):
+        self._store = store; self._row = row
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ListingRecord) and other._store is self._store and other._row == self._row
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._row))
+
+    @property
+    def listing_id(self) -> int:
+        return self._store.ids[self._row]
+
+    @property
+    def owner_id(self) -> int:
+        return self._store.owner_ids[self._row]
+
+    @property
+    def title(self) -> str:
+        return self._store.titles[self._row]
+
+    @title.setter
+    def title(self, t: str) -> None:
+        self._store.titles[self._row] = t
+
+    @property
+    def description(self) -> str:
+        return self._store.descriptions[self._row]
+
+    @description.setter
+    def description(self, d: str) -> None:
+        self._store.descriptions[self._row] = d
+
+    @property
+    def vec(self) -> np.ndarray:
+        return self._store.vecs.row(self._row)
+
+    @vec.setter
+    def vec(self, v: np.ndarray) -> None:
+        self._store.vecs.set_row(self._row, v)
+
+    @property
+    def privacy(self) -> Privacy:
+        return _PRIVACIES[self._store.privacy[self._row]]
+
+    @privacy.setter
+    def privacy(self, p: Privacy) -> None:
+        self._store.privacy[self._row] = _PRIVACY_CODE[p]
+
+class _RecordValues(ValuesView):
+    def __iter__(self) -> Iterator[ListingRecord]:
+        store = self._mapping.store
+        return (ListingRecord(store, row) for row in range(len(store.ids)))
+
+class _RecordItems(ItemsView):
+    def __iter__(self) -> Iterator[Tuple[int, ListingRecord]]:
+        store = self._mapping.store
+        return ((lid, ListingRecord(store, row)) for row, lid in enumerate(store.ids))
+
+class ListingTable(Mapping):
+    """SocialApp.listings for columnar storage: listing_id -> ListingRecord, read from the columns."""
+    def __init__(self, store: ListingStore):
+        self.store = store
+
+    def __getitem__(self, listing_id: int) -> ListingRecord:
+        row = self.store.row_of(listing_id) if isinstance(listing_id, (int, np.integer)) else -1
+        if row < 0:
+            raise KeyError(listing_id)
+        return ListingRecord(self.store, row)
+
+    def __contains__(self, listing_id) -> bool:
+        return isinstance(listing_id, (int, np.integer)) and self.store.row_of(listing_id) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.store.ids.tolist())   # a copy: safe to iterate while listings are added
+
+    def __len__(self) -> int:
+        return len(self.store.ids)
+
+    def values(self) -> _RecordValues:
+        return _RecordValues(self)
+
+    def items(self) -> _RecordItems:
+        return _RecordItems(self)
+
+class UserRecord:
+    """Drop-in for User whose quiz_vec/circle live in a UserStore."""
+    __slots__ = ("user_id", "name", "owned_listing_ids", "quiz_answers", "liked_item_vecs", "_store", "_row")
+
+    def __init__(self, store: UserStore, row: int, user_id: int, name: str):
+        self._store = store; self._row = row
+        self.user_id = user_id; self.name = name
+        self.owned_listing_ids = array("l")
+        self.quiz_answers: Dict[str, object] = {}
+        self.liked_item_vecs: List[np.ndarray] = []
+
+    @property
+    def circle(self) -> str:
+        return self._store.circle_names[self._store.circle[self._row]]
+
+    @circle.setter
+    def circle(self, c: str) -> None:
+        self._store.circle[self._row] = self._store.circle_code(c)
+
+    @property
+    def quiz_vec(self) -> np.ndarray:
+        return self._store.quiz.row(self._row)
+
+    @quiz_vec.setter
+    def quiz_vec(self, v: np.ndarray) -> None:
+        self._store.quiz.set_row(self._row, v)
+
+    style_vec = User.style_vec
+
+# -----------------------------
+# Follow graph
+# -----------------------------
+class FollowGraph:
+    """
+    Directed follow graph with forward (following) and reverse (followers) adjacency
+    and a maintained set of mutual connections per user.
+    """
+    def __init__(self):
+        self.following: Dict[int, Set[int]] = {}
+        self.followers: Dict[int, Set[int]] = {}
+        self.mutual: Dict[int, Set[int]] = {}
+
+    def add_node(self, uid: int) -> None:
+        for adj in (self.following, self.followers, self.mutual):
+            adj.setdefault(uid, set())
+
+    def follow(self, a: int, b: int) -> bool:
+        """a follows b. Returns False if the edge already existed."""
+        if b in self.following[a]: return False
+        self.following[a].add(b)
+        self.followers[b].add(a)
+        if a in self.following[b]:
+            self.mutual[a].add(b); self.mutual[b].add(a)
+        return True
+
+    def unfollow(self, a: int, b: int) -> bool:
+        if b not in self.following[a]: return False
+        self.following[a].discard(b)
+        self.followers[b].discard(a)
+        self.mutual[a].discard(b); self.mutual[b].discard(a)
+        return True
+
+    def is_connected(self, a: int, b: int) -> bool:
+        return b in self.mutual.get(a, ())
+
+    def mutual_connections(self, a: int, b: int) -> Set[int]:
+        """Users connected (mutually) with both a and b."""
+        return self.mutual.get(a, set()) & self.mutual.get(b, set())
+
+    def friends_of_friends(self, uid: int, max_first_hop: int = 200, max_per_node: int = 200) -> Dict[int, int]:
+        """
+        Bounded 2-hop expansion over the accounts `uid` follows (mutual connections first).
+        Returns {candidate_id: number of first-hop accounts leading to it}, excluding `uid`
+        and accounts it already follows.
+        """
+        direct = self.following.get(uid, set())
+        mutual = self.mutual.get(uid, set())
+        first = list(mutual) + [v for v in direct if v not in mutual]
+        counts: Dict[int, int] = {}
+        for v in first[:max_first_hop]:
+            for n, w in enumerate(self.following[v]):
+                if n >= max_per_node: break
+                if w == uid or w in direct: continue
+                counts[w] = counts.get(w, 0) + 1
+        return counts
+
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Export the forward adjacency as (ids, indptr, indices): row i is user ids[i] and
+        indices[indptr[i]:indptr[i+1]] are the rows of the users it follows.
+        """
+        ids = np.fromiter(self.following, dtype=np.int64, count=len(self.following))
+        row = {uid: i for i, uid in enumerate(ids.tolist())}
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum([len(fs) for fs in self.following.values()], out=indptr[1:])
+        indices = np.fromiter((row[v] for fs in self.following.values() for v in sorted(fs)),
+                              dtype=np.int32, count=int(indptr[-1]))
+        return ids, indptr, indices
+
+    @classmethod
+    def from_csr(cls, ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> "FollowGraph":
+        g = cls()
+        ids = ids.tolist()
+        for uid in ids: g.add_node(uid)
+        targets = [ids[j] for j in indices.tolist()]
+        for i, uid in enumerate(ids):
+            for v in targets[indptr[i]:indptr[i + 1]]:
+                g.follow(uid, v)
+        return g
+
+# -----------------------------
+# Ranking features (hybrid suggest_listings)
+# -----------------------------
+@dataclass
+class RankWeights:
+    style: float = 1.0          # cosine similarity to the viewer's style vector
+    rating: float = 0.0         # overall review score, 1..5 mapped to 0..1 (unreviewed = 0.5)
+    review_count: float = 0.0   # log1p(count), scaled by the best candidate
+    popularity: float = 0.0     # log1p(times_rented), scaled by the best candidate
+
+class ListingFeatures:
+    """
+    Per-listing feature columns indexed directly by listing_id (this app's ids), so a
+    batch of candidate ids is joined with one fancy-index per column. Fed from
+    customer_reviews.RatingsEngine and rent_tracker.Repo through SocialApp.sync_features,
+    which maps their ids onto this app's. Columns only grow on writes; mutate through
+    SocialApp (set_listing_rating, set_listing_times_rented, sync_features) so writes
+    are serialized against readers.
+    """
+    def __init__(self, capacity: int = 1024):
+        self.overall = np.full(capacity, np.nan, dtype=np.float32)
+        self.review_count = np.zeros(capacity, dtype=np.int32)
+        self.times_rented = np.zeros(capacity, dtype=np.int32)
+
+    def _ensure(self, listing_id: int) -> None:
+        n = len(self.overall)
+        if listing_id < n: return
+        grow = max(2 * n, listing_id + 1) - n
+        self.overall = np.concatenate([self.overall, np.full(grow, np.nan, dtype=np.float32)])
+        self.review_count = np.concatenate([self.review_count, np.zeros(grow, dtype=np.int32)])
+        self.times_rented = np.concatenate([self.times_rented, np.zeros(grow, dtype=np.int32)])
+
+    def set_rating(self, listing_id: int, overall_score: Optional[float], review_count: int) -> None:
+        self._ensure(listing_id)
+        self.overall[listing_id] = np.nan if overall_score is None else overall_score
+        self.review_count[listing_id] = review_count
+
+    def set_times_rented(self, listing_id: int, times_rented: int) -> None:
+        self._ensure(listing_id)
+        self.times_rented[listing_id] = times_rented
+
+    def set_ratings(self, listing_ids: np.ndarray, overall: np.ndarray, review_count: np.ndarray) -> None:
+        if len(listing_ids) == 0: return
+        self._ensure(int(listing_ids.max()))
+        self.overall[listing_ids] = overall
+        self.review_count[listing_ids] = review_count
+
+    def set_times_rented_many(self, listing_ids: np.ndarray, times_rented: np.ndarray) -> None:
+        if len(listing_ids) == 0: return
+        self._ensure(int(listing_ids.max()))
+        self.times_rented[listing_ids] = times_rented
+
+    def rerank(self, listing_ids: np.ndarray, style: np.ndarray, w: RankWeights) -> np.ndarray:
+        # read-only: ids past the columns' capacity have never been set, so take the defaults
+        def gather(col: np.ndarray, default) -> np.ndarray:
+            out = np.full(len(listing_ids), default, dtype=col.dtype)
+            inside = listing_ids < len(col)
+            out[inside] = col[listing_ids[inside]]
+            return out
+
+        def scaled(col: np.ndarray) -> np.ndarray:
+            x = np.log1p(gather(col, 0).astype(np.float32))
+            top = x.max(initial=0.0)
+            return x / top if top > 0 else x
+
+        rating = (gather(self.overall, np.nan) - 1.0) / 4.0
+        rating = np.where(np.isnan(rating), 0.5, rating)
+        return (w.style * style + w.rating * rating
+                + w.review_count * scaled(self.review_count) + w.popularity * scaled(self.times_rented))
+
+def _extend_from_numpy(arr: array, values: np.ndarray) -> None:
+    # the array's C type (e.g. "l" is 4 bytes on Windows, 8 on Linux) decides the width
+    arr.frombytes(np.asarray(values).astype(np.dtype(arr.typecode), copy=False).tobytes())
+
+# SocialApp is shared across server threads: mutations take the write lock, reads the
+# read lock (reads never block each other). Helpers called under a lock must not
+# re-acquire it, so decorated methods only call undecorated ones.
+# Every mutation that changes state also bumps SocialApp.generation, which result caches
+# compare against; a write that raises, or clears self._changed (a no-op), leaves it alone.
+def _reads(fn):
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self._rw.read():
+            return fn(self, *args, **kwargs)
+    return wrapper
+
+def _writes(fn):
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self._rw.write():
+            self._changed = True
+            result = fn(self, *args, **kwargs)
+            if self._changed:
+                self.generation += 1
+            return result
+    return wrapper
+
+class SocialApp:
+    def __init__(self, storage: str = "dict"):
+        if storage not in ("dict", "columnar"):
+            raise ValueError("storage must be 'dict' or 'columnar'")
+        self.storage = storage
         self._next_user_id = 1
         self._next_listing_id = 1
         self.users: Dict[int, User] = {}
-        self.listings: Dict[int, Listing] = {}
-        self.following: Dict[int, Set[int]] = {}
+        self.graph = FollowGraph()
+        self.following: Dict[int, Set[int]] = self.graph.following
+        self._user_store = UserStore() if storage == "columnar" else None
+        self._listing_store = ListingStore() if storage == "columnar" else None
+        # columnar: a read-only view over the store; listings are added through the store
+        self.listings: Dict[int, Listing] = ListingTable(self._listing_store) if storage == "columnar" else {}
+        self.features = ListingFeatures()
+        self._rw = RWLock()
+        self.generation = 0
+        self._changed = False   # set by _writes; a write that turns out a no-op clears it
 
     # users
+    @_writes
     def add_user(self, name: str, circle: str) -> int:
         uid = self._next_user_id; self._next_user_id += 1
-        self.users[uid] = User(user_id=uid, name=name, circle=circle)
-        self.following[uid] = set()
+        if self._user_store is not None:
+            self.users[uid] = self._user_store.new_user(uid, name, circle)
+        else:
+            self.users[uid] = User(user_id=uid, name=name, circle=circle)
+        self.graph.add_node(uid)
         return uid
 
     # follow/connect
+    @_writes
     def follow(self, follower_id: int, followee_id: int):
         if follower_id not in self.users or followee_id not in self.users:
             raise ValueError("user not found")
-        if follower_id == followee_id: return
-        self.following[follower_id].add(followee_id)
+        if follower_id == followee_id or not self.graph.follow(follower_id, followee_id):
+            self._changed = False
+
+    @_writes
+    def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        if follower_id not in self.users or followee_id not in self.users:
+            raise ValueError("user not found")
+        self._changed = removed = self.graph.unfollow(follower_id, followee_id)
+        return removed
 
     def is_connected(self, a: int, b: int) -> bool:
-        return (b in self.following.get(a, set())) and (a in self.following.get(b, set()))
+        return self.graph.is_connected(a, b)
 
     # quiz
+    @_writes
     def take_style_quiz(
         self,
         user_id: int,
@@ -151,42 +631,97 @@ class SocialApp:
         u.quiz_vec = qvec
 
     # listings
+    @_writes
     def add_listing(self, owner_id: int, title: str, description: str, privacy: str = "public") -> int:
         if owner_id not in self.users: raise ValueError("owner not found")
         p = Privacy(privacy.lower())
         lid = self._next_listing_id; self._next_listing_id += 1
-        listing = Listing.from_text(lid, owner_id, title, description, p)
-        self.listings[lid] = listing
+        if self._listing_store is not None:
+            self._listing_store.new_listing(lid, owner_id, self.users[owner_id]._row, title, description,
+                                            p, text_to_vec(f"{title} {description}"))
+        else:
+            self.listings[lid] = Listing.from_text(lid, owner_id, title, description, p)
         self.users[owner_id].owned_listing_ids.append(lid)
         return lid
 
+    @_writes
+    def add_listings(self, rows: Iterable[Tuple[int, str, str, str]]) -> List[int]:
+        """Bulk add_listing for (owner_id, title, description, privacy) rows; vectorizes all texts in one batch."""
+        rows = list(rows)
+        for owner_id, _, _, _ in rows:
+            if owner_id not in self.users: raise ValueError("owner not found")
+        privs = [Privacy(privacy.lower()) for _, _, _, privacy in rows]
+        vecs = texts_to_matrix(f"{title} {description}" for _, title, description, _ in rows)
+        lids = list(range(self._next_listing_id, self._next_listing_id + len(rows)))
+        self._next_listing_id += len(rows)
+        if self._listing_store is not None:
+            owners = [r[0] for r in rows]
+            self._listing_store.new_listings(lids, owners, [self.users[o]._row for o in owners],
+                                             [r[1] for r in rows], [r[2] for r in rows], privs, vecs)
+        for lid, (owner_id, title, description, _), p, vec in zip(lids, rows, privs, vecs):
+            if self._listing_store is None:
+                self.listings[lid] = Listing(listing_id=lid, owner_id=owner_id, title=title, description=description,
+                                             privacy=p, vec=vec)
+            self.users[owner_id].owned_listing_ids.append(lid)
+        return lids
+
+    @_writes
+    def set_listing_privacy(self, listing_id: int, privacy: str) -> None:
+        if listing_id not in self.listings: raise ValueError("listing not found")
+        self.listings[listing_id].privacy = Privacy(privacy.lower())
+
     def can_view_listing(self, viewer_id: int, listing: Listing) -> bool:
         if listing.privacy == Privacy.PUBLIC: return True
         owner = self.users[listing.owner_id]; viewer = self.users[viewer_id]
         return (viewer.circle == owner.circle) or (viewer_id == listing.owner_id)
 
+    @_reads
     def visible_listings_for(self, viewer_id: int) -> List[Listing]:
+        return self._visible_listings(viewer_id)
+
+    def _visible_listings(self, viewer_id: int) -> List[Listing]:
         return [lst for lst in self.listings.values() if self.can_view_listing(viewer_id, lst)]
 
     # suggestions
-    def suggest_people(self, user_id: int, k: int = 5, min_sim: float = 0.0, exclude_followed: bool = True) -> List[Tuple[int, str, float]]:
+    @_reads
+    def suggest_people(self, user_id: int, k: int = 5, min_sim: float = 0.0, exclude_followed: bool = True,
+                       w_graph: float = 0.0) -> List[Tuple[int, str, float]]:
+        """
+        Rank other users by style similarity. With w_graph > 0 the score blends in
+        friends-of-friends counts: (1 - w_graph) * sim + w_graph * count / max_count.
+        """
         if user_id not in self.users: raise ValueError("user not found")
         base = self.users[user_id].style_vec(self.listings)
         results = []
         already = self.following.get(user_id, set())
+        fof = self.graph.friends_of_friends(user_id) if w_graph > 0 else {}
+        max_fof = max(fof.values(), default=0)
         for other_id, other in self.users.items():
             if other_id == user_id: continue
             if exclude_followed and (other_id in already): continue
             sim = cosine(base, other.style_vec(self.listings))
+            if max_fof:
+                sim = (1 - w_graph) * sim + w_graph * fof.get(other_id, 0) / max_fof
             if sim >= min_sim:
                 results.append((other_id, other.name, round(sim, 4)))
         results.sort(key=lambda x: x[2], reverse=True)
         return results[:k]
 
-    def suggest_listings(self, user_id: int, k: int = 10) -> List[Tuple[int, str, str, float]]:
+    @_reads
+    def suggest_listings(self, user_id: int, k: int = 10, weights: Optional[RankWeights] = None,
+                         candidates: int = 500) -> List[Tuple[int, str, str, float]]:
+        """
+        Without `weights`, ranks visible listings by style similarity. With `weights`, runs
+        a two-stage pipeline: the top `candidates` by style similarity are re-ranked with
+        the feature columns in self.features.
+        """
         if user_id not in self.users: raise ValueError("user not found")
         base = self.users[user_id].style_vec(self.listings)
-        vis = self.visible_listings_for(user_id)
+        if weights is not None:
+            return self._suggest_listings_ranked(user_id, base, k, weights, candidates)
+        if self._listing_store is not None:
+            return self._suggest_listings_columnar(user_id, base, k)
+        vis = self._visible_listings(user_id)
         scored = []
         for lst in vis:
             owner_name = self.users[lst.owner_id].name
@@ -194,3 +729,220 @@ class SocialApp:
             scored.append((lst.listing_id, lst.title, owner_name, round(score, 4)))
         scored.sort(key=lambda x: x[3], reverse=True)
         return scored[:k]
+
+    def _visible_mask(self, viewer_id: int) -> np.ndarray:
+        ls, us = self._listing_store, self._user_store
+        viewer_circle = us.circle[self.users[viewer_id]._row]
+        owner_circles = _np_view(us.circle)[_np_view(ls.owner_rows)]
+        return ((_np_view(ls.privacy) == _PRIVACY_CODE[Privacy.PUBLIC])
+                | (owner_circles == viewer_circle)
+                | (_np_view(ls.owner_ids) == viewer_id))
+
+    def _style_scores(self, user_id: int, base: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(listing_ids, cosine scores) for every listing visible to user_id, in listing order."""
+        if self._listing_store is not None:
+            # score the whole matrix in place, then keep the visible entries: gathering the
+            # visible rows first would copy every one of their vectors on each call
+            visible = self._visible_mask(user_id)
+            ids = _np_view(self._listing_store.ids)[visible]
+            M = self._listing_store.vecs.matrix
+        else:
+            visible = None
+            vis = self._visible_listings(user_id)
+            ids = np.array([lst.listing_id for lst in vis], dtype=np.int64)
+            M = np.stack([lst.vec for lst in vis]) if vis else np.zeros((0, len(VOCAB)), dtype=np.float32)
+        d = np.sqrt(np.einsum("ij,ij->i", M, M)) * np.linalg.norm(base)
+        scores = np.divide(M @ base, d, out=np.zeros(len(M), dtype=np.float32), where=d > 0)
+        return ids, (scores if visible is None else scores[visible])
+
+    def _top_k(self, ids: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, str, str, float]]:
+        scores = np.round(scores, 4)   # rank on rounded scores like the dict path
+        order = np.arange(len(scores))
+        if 0 < k < len(scores):
+            # everything tied with the k-th best goes through, so the stable sort below
+            # still breaks ties by listing order
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            order = np.flatnonzero(scores >= kth)
+        out = []
+        for i in order[np.argsort(-scores[order], kind="stable")][:k]:
+            lst = self.listings[int(ids[i])]
+            out.append((lst.listing_id, lst.title, self.users[lst.owner_id].name, round(float(scores[i]), 4)))
+        return out
+
+    def _suggest_listings_columnar(self, user_id: int, base: np.ndarray, k: int) -> List[Tuple[int, str, str, float]]:
+        ids, scores = self._style_scores(user_id, base)
+        return self._top_k(ids, scores, k)
+
+    def _suggest_listings_ranked(self, user_id: int, base: np.ndarray, k: int, weights: RankWeights,
+                                 candidates: int) -> List[Tuple[int, str, str, float]]:
+        ids, style = self._style_scores(user_id, base)
+        if len(ids) > candidates:
+            keep = np.sort(np.argpartition(-style, candidates - 1)[:candidates])
+            ids, style = ids[keep], style[keep]
+        return self._top_k(ids, self.features.rerank(ids, style, weights), k)
+
+    # ranking features (see ListingFeatures)
+    @_writes
+    def set_listing_rating(self, listing_id: int, overall_score: Optional[float], review_count: int) -> None:
+        self.features.set_rating(listing_id, overall_score, review_count)
+
+    @_writes
+    def set_listing_times_rented(self, listing_id: int, times_rented: int) -> None:
+        self.features.set_times_rented(listing_id, times_rented)
+
+    def sync_features(self, ratings=None, rentals=None, rating_ids: Optional[Mapping[int, int]] = None,
+                      rental_ids: Optional[Mapping[int, int]] = None) -> None:
+        """
+        Refresh the ranking columns from a RatingsEngine and/or a rent_tracker Repo.
+        rating_ids maps this app's listing ids to the engine's listing ids, rental_ids to
+        the repo's item ids; without a mapping the ids are taken to be shared. Everything
+        is fetched before the write lock is taken, so readers only wait for the column writes.
+        """
+        rated = rented = None
+        if ratings is not None:
+            pairs = list(rating_ids.items()) if rating_ids is not None else [(l, l) for l in list(ratings.listings)]
+            found, _ = ratings.get_listing_summaries([eid for _, eid in pairs])
+            pairs = [(lid, found[eid]) for lid, eid in pairs if eid in found]
+            rated = (np.array([lid for lid, _ in pairs], dtype=np.int64),
+                     np.array([np.nan if s["overall_score"] is None else s["overall_score"] for _, s in pairs],
+                              dtype=np.float32),
+                     np.array([s["count"] for _, s in pairs], dtype=np.int32))
+        if rentals is not None:
+            items = rentals.items   # a fresh snapshot for SqliteRepo: read it once
+            pairs = list(rental_ids.items()) if rental_ids is not None else [(i, i) for i in list(items)]
+            pairs = [(lid, items[iid].times_rented) for lid, iid in pairs if iid in items]
+            rented = (np.array([lid for lid, _ in pairs], dtype=np.int64),
+                      np.array([n for _, n in pairs], dtype=np.int32))
+        self._set_features(rated, rented)
+
+    @_writes
+    def _set_features(self, rated, rented) -> None:
+        if rated is not None:
+            self.features.set_ratings(*rated)
+        if rented is not None:
+            self.features.set_times_rented_many(*rented)
+
+    # snapshot / reload
+    @_reads
+    def save(self, path: str) -> None:
+        """
+        Write a snapshot into directory `path`: vectors, integer columns and the follow
+        graph (CSR) as .npy, everything else in meta.json. The snapshot is built in a
+        fresh sibling directory and swapped in by rename, so an existing snapshot at
+        `path` (possibly memory-mapped by this very app) is never overwritten in place.
+        """
+        if os.path.isdir(path) and os.listdir(path) and not os.path.exists(os.path.join(path, "meta.json")):
+            raise ValueError(f"{path} exists and is not a snapshot directory")
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".snapshot-", dir=parent)
+        try:
+            self._write_snapshot(tmp_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        old = None
+        if os.path.exists(path):
+            old = tempfile.mkdtemp(prefix=".old-snapshot-", dir=parent)
+            os.replace(path, os.path.join(old, "snapshot"))
+        os.replace(tmp_dir, path)
+        if old is not None:
+            # open mmaps of the old files stay valid: unlinking keeps the inodes alive
+            shutil.rmtree(old, ignore_errors=True)
+
+    def _write_snapshot(self, path: str) -> None:
+        users = list(self.users.values())
+        V = len(VOCAB)
+
+        def vecs(vs) -> np.ndarray:
+            return np.stack(vs).astype(np.float32, copy=False) if vs else np.zeros((0, V), dtype=np.float32)
+
+        ls = self._listing_store
+        if ls is not None:
+            listing_vecs, quiz_vecs = ls.vecs.matrix, self._user_store.quiz.matrix
+            listing_ids, owner_ids, privacy = _np_view(ls.ids), _np_view(ls.owner_ids), np.frombuffer(ls.privacy, np.int8)
+            titles, descriptions = ls.titles, ls.descriptions
+        else:
+            listings = list(self.listings.values())
+            listing_vecs, quiz_vecs = vecs([l.vec for l in listings]), vecs([u.quiz_vec for u in users])
+            listing_ids, owner_ids = [l.listing_id for l in listings], [l.owner_id for l in listings]
+            privacy = [_PRIVACY_CODE[l.privacy] for l in listings]
+            titles, descriptions = [l.title for l in listings], [l.description for l in listings]
+        circles = UserStore()
+        np.save(os.path.join(path, "listing_vecs.npy"), listing_vecs)
+        np.save(os.path.join(path, "quiz_vecs.npy"), quiz_vecs)
+        np.save(os.path.join(path, "liked_vecs.npy"), vecs([v for u in users for v in u.liked_item_vecs]))
+        np.save(os.path.join(path, "listing_ids.npy"), np.asarray(listing_ids, dtype=np.int64))
+        np.save(os.path.join(path, "listing_owner_ids.npy"), np.asarray(owner_ids, dtype=np.int64))
+        np.save(os.path.join(path, "listing_privacy.npy"), np.asarray(privacy, dtype=np.int8))
+        np.save(os.path.join(path, "user_ids.npy"), np.array([u.user_id for u in users], dtype=np.int64))
+        np.save(os.path.join(path, "user_circles.npy"), np.array([circles.circle_code(u.circle) for u in users], dtype=np.int16))
+        follow_ids, follow_indptr, follow_indices = self.graph.to_csr()
+        np.save(os.path.join(path, "follow_ids.npy"), follow_ids)
+        np.save(os.path.join(path, "follow_indptr.npy"), follow_indptr)
+        np.save(os.path.join(path, "follow_indices.npy"), follow_indices)
+        meta = {
+            "version": 2,
+            "next_user_id": self._next_user_id,
+            "next_listing_id": self._next_listing_id,
+            "circle_names": circles.circle_names,
+            "user_names": [u.name for u in users],
+            "quiz_answers": [u.quiz_answers for u in users],
+            "liked_counts": [len(u.liked_item_vecs) for u in users],
+            "listing_titles": titles,
+            "listing_descriptions": descriptions,
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "SocialApp":
+        """
+        Rebuild a columnar SocialApp from a snapshot written by save(). With mmap=True the
+        vector matrices are memory-mapped read-only (shared between processes) and copied
+        only if this process mutates them.
+        """
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != 2:
+            raise ValueError("unsupported snapshot version")
+
+        def npy(name: str, mapped: bool = False) -> np.ndarray:
+            return np.load(os.path.join(path, name), mmap_mode="r" if (mapped and mmap) else None)
+
+        app = cls(storage="columnar")
+        app._next_user_id = meta["next_user_id"]
+        app._next_listing_id = meta["next_listing_id"]
+
+        us = app._user_store
+        us.quiz = VecStore.from_matrix(npy("quiz_vecs.npy", mapped=True))
+        user_ids = npy("user_ids.npy")
+        _extend_from_numpy(us.ids, user_ids)
+        _extend_from_numpy(us.circle, npy("user_circles.npy"))
+        for name in meta["circle_names"]:
+            us.circle_code(name)
+        liked = npy("liked_vecs.npy")
+        offsets = np.concatenate(([0], np.cumsum(meta["liked_counts"], dtype=np.int64)))
+        for row, (uid, name, answers) in enumerate(zip(user_ids.tolist(), meta["user_names"], meta["quiz_answers"])):
+            u = UserRecord(us, row, uid, name)
+            u.quiz_answers = answers
+            u.liked_item_vecs = list(liked[offsets[row]:offsets[row + 1]])
+            app.users[uid] = u
+        app.graph = FollowGraph.from_csr(npy("follow_ids.npy"), npy("follow_indptr.npy"), npy("follow_indices.npy"))
+        app.following = app.graph.following
+
+        ls = app._listing_store
+        ls.vecs = VecStore.from_matrix(npy("listing_vecs.npy", mapped=True))
+        listing_ids = npy("listing_ids.npy")
+        owner_ids = npy("listing_owner_ids.npy")
+        _extend_from_numpy(ls.ids, listing_ids)
+        _extend_from_numpy(ls.owner_ids, owner_ids)
+        _extend_from_numpy(ls.privacy, npy("listing_privacy.npy"))
+        user_row = {uid: row for row, uid in enumerate(user_ids.tolist())}
+        ls.owner_rows.extend(user_row[o] for o in owner_ids.tolist())
+        ls.titles = meta["listing_titles"]
+        ls.descriptions = meta["listing_descriptions"]
+        users = app.users
+        for lid, owner_id in zip(listing_ids.tolist(), owner_ids.tolist()):
+            users[owner_id].owned_listing_ids.append(lid)
+        return app
@@ -0,0 +1,327 @@
+"""
+sqlite_repo.py
+--------------
+SQLite-backed drop-in for rent_tracker.Repo (same methods, used by RentalService).
+
+  - Every state transition is one transaction; status changes are optimistic
+    (UPDATE ... WHERE id = ? AND status = <status the caller read>), so two workers
+    racing on the same rental cannot both win
+  - complete_rental() flips the status and bumps times_rented atomically
+  - Booking overlap checks run inside the insert transaction (BEGIN IMMEDIATE)
+  - A small connection pool; sqlite3 caches each connection's prepared statements,
+    and every query here is a constant SQL string, so statements are reused
+  - Read-through LRU cache of hot Item rows
+
+Usage:
+    repo = SqliteRepo("rentals.db")
+    service = RentalService(repo)
+
+Standard library only.
+"""
+
+from __future__ import annotations
+import json
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from rent_tracker import ACTIVE_STATUSES, Item, Rental, RentalStatus, _clamp_stars
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id            INTEGER PRIMARY KEY,
+    owner_id      INTEGER NOT NULL,
+    title         TEXT    NOT NULL,
+    times_rented  INTEGER NOT NULL DEFAULT 0,
+    stars_1       INTEGER NOT NULL DEFAULT 0,   -- rating histogram
+    stars_2       INTEGER NOT NULL DEFAULT 0,
+    stars_3       INTEGER NOT NULL DEFAULT 0,
+    stars_4       INTEGER NOT NULL DEFAULT 0,
+    stars_5       INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rentals (
+    id          INTEGER PRIMARY KEY,
+    item_id     INTEGER NOT NULL REFERENCES items(id),
+    renter_id   INTEGER NOT NULL,
+    start_date  TEXT    NOT NULL,
+    end_date    TEXT    NOT NULL,
+    status      TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rentals_item_start ON rentals(item_id, start_date);
+CREATE INDEX IF NOT EXISTS rentals_renter ON rentals(renter_id);
+CREATE INDEX IF NOT EXISTS rentals_status_end ON rentals(status, end_date);
+"""
+
+_ACTIVE = tuple(s.name for s in ACTIVE_STATUSES)
+_ACTIVE_SQL = ",".join("?" * len(_ACTIVE))
+_RENTAL_COLS = "id, item_id, renter_id, start_date, end_date, status"
+_ITEM_COLS = "id, owner_id, title, times_rented, stars_1, stars_2, stars_3, stars_4, stars_5"
+# one constant statement per star bucket, so each stays a cached prepared statement
+_ADD_STAR = {s: f"UPDATE items SET stars_{s} = stars_{s} + 1 WHERE id = ?" for s in range(1, 6)}
+_DROP_STAR = {s: f"UPDATE items SET stars_{s} = stars_{s} - 1 WHERE id = ? AND stars_{s} > 0" for s in range(1, 6)}
+
+class ConcurrentUpdateError(ValueError):
+    """The rental's status changed between reading it and updating it."""
+
+def _ts(dt: datetime) -> str:
+    # ISO strings sort like the datetimes (all naive, or all in one timezone)
+    return dt.isoformat()
+
+def _rental(row) -> Rental:
+    return Rental(id=row[0], item_id=row[1], renter_id=row[2], start_date=datetime.fromisoformat(row[3]),
+                  end_date=datetime.fromisoformat(row[4]), status=RentalStatus[row[5]])
+
+def _item(row) -> Item:
+    return Item(id=row[0], owner_id=row[1], title=row[2], times_rented=row[3], rating_hist=list(row[4:9]))
+
+class SqliteRepo:
+    def __init__(self, path: str, pool_size: int = 4, item_cache_size: int = 10_000):
+        if path == ":memory:":
+            pool_size = 1   # every connection to ":memory:" would be a separate database
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False,
+                                   cached_statements=256, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._pool.put(conn)
+        with self._conn() as c:
+            c.executescript(SCHEMA)
+        self._item_cache: "OrderedDict[int, Item]" = OrderedDict()
+        self._item_cache_size = item_cache_size
+        # item id -> [reads in flight, evictions since the oldest of them started]; guards
+        # cache fills, and holds only items being read, so it stays as small as the pool
+        self._item_reads: Dict[int, List[int]] = {}
+        self._cache_lock = threading.Lock()
+
+    # --- plumbing ---
+    @contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """One write transaction; BEGIN IMMEDIATE takes the write lock up front."""
+        with self._conn() as c:
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                yield c
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+            c.execute("COMMIT")
+
+    def _cache_fill(self, item_id: int, item: Optional[Item], evictions: int) -> None:
+        """End a read of `item_id` that started after `evictions` evictions, and cache
+        its row unless a write evicted the item since."""
+        with self._cache_lock:
+            reads = self._item_reads[item_id]
+            reads[0] -= 1
+            if not reads[0]:
+                del self._item_reads[item_id]
+            if item is None or reads[1] != evictions:
+                return
+            self._item_cache[item.id] = item
+            self._item_cache.move_to_end(item.id)
+            if len(self._item_cache) > self._item_cache_size:
+                self._item_cache.popitem(last=False)
+
+    def _cache_evict(self, item_id: int) -> None:
+        with self._cache_lock:
+            self._item_cache.pop(item_id, None)
+            reads = self._item_reads.get(item_id)
+            if reads is not None:
+                reads[1] += 1
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    # --- items ---
+    def create_item(self, owner_id: int, title: str) -> Item:
+        with self._tx() as c:
+            cur = c.execute("INSERT INTO items (owner_id, title) VALUES (?, ?)", (owner_id, title))
+        return Item(id=cur.lastrowid, owner_id=owner_id, title=title)
+
+    def get_item(self, item_id: int) -> Optional[Item]:
+        """Read-through cached. Treat the result as read-only; writes go through the repo."""
+        with self._cache_lock:
+            item = self._item_cache.get(item_id)
+            if item is not None:
+                self._item_cache.move_to_end(item_id)
+                return item
+            # writers evict after committing: a row read before an evict can be stale
+            reads = self._item_reads.setdefault(item_id, [0, 0])
+            reads[0] += 1
+            evictions = reads[1]
+        item = None
+        try:
+            with self._conn() as c:
+                row = c.execute(f"SELECT {_ITEM_COLS} FROM items WHERE id = ?", (item_id,)).fetchone()
+            item = _item(row) if row is not None else None
+        finally:
+            self._cache_fill(item_id, item, evictions)
+        return item
+
+    def rate_item(self, item_id: int, stars: int, previous: Optional[int] = None) -> Item:
+        """Add a rating, or replace the rater's `previous` one, in one transaction."""
+        with self._tx() as c:
+            if previous is not None:
+                if c.execute(_DROP_STAR[_clamp_stars(previous)], (item_id,)).rowcount != 1:
+                    raise ValueError(f"Item not found or has no {_clamp_stars(previous)}-star rating to remove.")
+            if c.execute(_ADD_STAR[_clamp_stars(stars)], (item_id,)).rowcount != 1:
+                raise ValueError("Item not found.")
+        self._cache_evict(item_id)
+        return self.get_item(item_id)
+
+    @property
+    def items(self) -> Dict[int, Item]:
+        """All items, freshly read (a snapshot, unlike Repo.items)."""
+        with self._conn() as c:
+            return {row[0]: _item(row) for row in c.execute(f"SELECT {_ITEM_COLS} FROM items ORDER BY id")}
+
+    # --- rentals ---
+    def create_rental(self, item_id: int, renter_id: int, start: datetime, end: datetime) -> Rental:
+        if end <= start:
+            raise ValueError("Rental must end after it starts.")
+        with self._tx() as c:
+            if c.execute("SELECT 1 FROM items WHERE id = ?", (item_id,)).fetchone() is None:
+                raise ValueError("Item not found.")
+            clash = c.execute(
+                f"SELECT 1 FROM rentals WHERE item_id = ? AND status IN ({_ACTIVE_SQL}) "
+                f"AND start_date < ? AND end_date > ? LIMIT 1",
+                (item_id, *_ACTIVE, _ts(end), _ts(start))).fetchone()
+            if clash:
+                raise ValueError("Item is already booked for those dates.")
+            cur = c.execute(
+                "INSERT INTO rentals (item_id, renter_id, start_date, end_date, status) VALUES (?, ?, ?, ?, ?)",
+                (item_id, renter_id, _ts(start), _ts(end), RentalStatus.PENDING.name))
+        return Rental(id=cur.lastrowid, item_id=item_id, renter_id=renter_id,
+                      start_date=start, end_date=end, status=RentalStatus.PENDING)
+
+    def get_rental(self, rental_id: int) -> Optional[Rental]:
+        with self._conn() as c:
+            row = c.execute(f"SELECT {_RENTAL_COLS} FROM rentals WHERE id = ?", (rental_id,)).fetchone()
+        return _rental(row) if row else None
+
+    @property
+    def rentals(self) -> Dict[int, Rental]:
+        """All rentals, freshly read (a snapshot, unlike Repo.rentals)."""
+        with self._conn() as c:
+            return {row[0]: _rental(row) for row in c.execute(f"SELECT {_RENTAL_COLS} FROM rentals ORDER BY id")}
+
+    def _guarded_update(self, c: sqlite3.Connection, rental: Rental, status: RentalStatus) -> None:
+        cur = c.execute("UPDATE rentals SET status = ? WHERE id = ? AND status = ?",
+                        (status.name, rental.id, rental.status.name))
+        if cur.rowcount != 1:
+            raise ConcurrentUpdateError("Rental was modified concurrently; reload and retry.")
+
+    def set_status(self, rental: Rental, status: RentalStatus) -> None:
+        """Move `rental` from the status it was read with to `status`, or raise ConcurrentUpdateError."""
+        with self._tx() as c:
+            self._guarded_update(c, rental, status)
+        rental.status = status
+
+    def complete_rental(self, rental: Rental) -> None:
+        with self._tx() as c:
+            self._guarded_update(c, rental, RentalStatus.RETURNED)
+            c.execute("UPDATE items SET times_rented = times_rented + 1 WHERE id = ?", (rental.item_id,))
+        rental.status = RentalStatus.RETURNED
+        self._cache_evict(rental.item_id)
+
+    # --- batches: one transaction each ---
+    def get_rentals(self, rental_ids: Iterable[int]) -> Dict[int, Rental]:
+        # json_each keeps this one constant statement whatever the batch size
+        with self._conn() as c:
+            rows = c.execute(f"SELECT {_RENTAL_COLS} FROM rentals WHERE id IN (SELECT value FROM json_each(?))",
+                             (json.dumps(list(rental_ids)),)).fetchall()
+        return {row[0]: _rental(row) for row in rows}
+
+    def set_status_many(self, rentals: List[Rental], status: RentalStatus) -> List[int]:
+        """Guarded set_status for all of `rentals` in one transaction; returns the ids that lost a race."""
+        return self._apply_many(rentals, status, bump_items=False)
+
+    def complete_rentals(self, rentals: List[Rental]) -> List[int]:
+        """complete_rental for all of `rentals` in one transaction, one times_rented update per item."""
+        return self._apply_many(rentals, RentalStatus.RETURNED, bump_items=True)
+
+    def _apply_many(self, rentals: List[Rental], status: RentalStatus, bump_items: bool) -> List[int]:
+        if not rentals:
+            return []
+        with self._tx() as c:
+            # the write lock is held, so statuses read here cannot change before the update
+            current = dict(c.execute("SELECT id, status FROM rentals WHERE id IN (SELECT value FROM json_each(?))",
+                                     (json.dumps([r.id for r in rentals]),)))
+            ok = [r for r in rentals if current.get(r.id) == r.status.name]
+            lost = [r.id for r in rentals if current.get(r.id) != r.status.name]
+            c.executemany("UPDATE rentals SET status = ? WHERE id = ?", [(status.name, r.id) for r in ok])
+            per_item: Dict[int, int] = {}
+            if bump_items:
+                for r in ok:
+                    per_item[r.item_id] = per_item.get(r.item_id, 0) + 1
+                c.executemany("UPDATE items SET times_rented = times_rented + ? WHERE id = ?",
+                              [(n, item_id) for item_id, n in per_item.items()])
+        for r in ok:
+            r.status = status
+        for item_id in per_item:
+            self._cache_evict(item_id)
+        return lost
+
+    # --- availability ---
+    def is_available(self, item_id: int, start: datetime, end: datetime) -> bool:
+        with self._conn() as c:
+            return c.execute(
+                f"SELECT 1 FROM rentals WHERE item_id = ? AND status IN ({_ACTIVE_SQL}) "
+                f"AND start_date < ? AND end_date > ? LIMIT 1",
+                (item_id, *_ACTIVE, _ts(end), _ts(start))).fetchone() is None
+
+    def available_items(self, start: datetime, end: datetime) -> List[Item]:
+        with self._conn() as c:
+            rows = c.execute(
+                f"SELECT {_ITEM_COLS} FROM items WHERE id NOT IN ("
+                f"  SELECT item_id FROM rentals WHERE status IN ({_ACTIVE_SQL}) AND start_date < ? AND end_date > ?"
+                f") ORDER BY id",
+                (*_ACTIVE, _ts(end), _ts(start))).fetchall()
+        return [_item(r) for r in rows]
+
+    # --- queries ---
+    def _rentals_where(self, where: str, args: tuple) -> List[Rental]:
+        with self._conn() as c:
+            return [_rental(r) for r in c.execute(f"SELECT {_RENTAL_COLS} FROM rentals WHERE {where}", args)]
+
+    def rentals_for_renter(self, renter_id: int, statuses: Optional[Iterable[RentalStatus]] = None) -> List[Rental]:
+        if statuses is None:
+            return self._rentals_where("renter_id = ? ORDER BY id", (renter_id,))
+        # json_each keeps this one constant statement whatever the set of statuses
+        return self._rentals_where("renter_id = ? AND status IN (SELECT value FROM json_each(?)) ORDER BY id",
+                                   (renter_id, json.dumps([s.name for s in statuses])))
+
+    def active_rentals_for_renter(self, renter_id: int) -> List[Rental]:
+        return self.rentals_for_renter(renter_id, ACTIVE_STATUSES)
+
+    def rentals_for_item(self, item_id: int) -> List[Rental]:
+        return self._rentals_where("item_id = ? ORDER BY id", (item_id,))
+
+    def rentals_with_status(self, status: RentalStatus) -> List[Rental]:
+        return self._rentals_where("status = ? ORDER BY id", (status.name,))
+
+    def count_by_status(self) -> Dict[RentalStatus, int]:
+        counts = {s: 0 for s in RentalStatus}
+        with self._conn() as c:
+            for name, n in c.execute("SELECT status, COUNT(*) FROM rentals GROUP BY status"):
+                counts[RentalStatus[name]] = n
+        return counts
+
+    def overdue_rentals(self, now: datetime) -> List[Rental]:
+        return self._rentals_where("status = ? AND end_date < ? ORDER BY end_date, id",
+                                   (RentalStatus.RENTED.name, _ts(now)))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Stress test for concurrent access to RatingsEngine and SocialApp, the way
+ratings.py shares them across uvicorn's threadpool.
+Hammers both engines from many threads, then checks the invariants. Also checks
+that BoundedExecutor sheds calls past max_pending and times out slow ones.
+
+Run with pytest or directly: python test_concurrency.py
+"""
+
+import asyncio
+import random
+import tempfile
+import threading
+
+from concurrency import BoundedExecutor, Overloaded, StripedLock
+from customer_reviews import RatingsEngine
+from review_store import ReviewStore
+from social_style import ListingFeatures, RankWeights, SocialApp
+
+THREADS = 16
+
+def _run(workers):
+    errors = []
+    def guard(fn, i):
+        try:
+            fn(i)
+        except Exception as e:   # surface worker failures in the main thread
+            errors.append(e)
+    threads = [threading.Thread(target=guard, args=(fn, i)) for i, fn in enumerate(workers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert not errors, errors
+
+def _check_aggregates(eng):
+    for lid in eng.listings:
+        reviews = eng.get_reviews_for_listing(lid)
+        s = eng.get_listing_summary(lid)
+        assert s["count"] == len(reviews)
+        if reviews:
+            assert s["avg_material"] == round(sum(r.material_construction for r in reviews) / len(reviews), 2)
+    assert sum(len(eng.get_reviews_for_listing(l)) for l in eng.listings) == len(eng._reviews)
+
+def test_ratings_engine_concurrent_writes():
+    data_dir = tempfile.mkdtemp()
+    store = ReviewStore(data_dir, snapshot_every=500)
+    eng = RatingsEngine(store=store)
+
+    ids = [[] for _ in range(THREADS)]
+    def add_users(i):
+        for n in range(100):
+            ids[i].append(eng.add_user(f"u{i}-{n}", "USYD"))
+    _run([add_users] * THREADS)
+    all_ids = [u for chunk in ids for u in chunk]
+    assert len(set(all_ids)) == len(all_ids) == len(eng.users) == THREADS * 100
+
+    owner = all_ids[0]
+    listings = [eng.add_listing(owner, f"item {n}") for n in range(20)]
+    raters = all_ids[1:]
+
+    def hammer(i):
+        rng = random.Random(i)
+        for _ in range(1500):
+            r, l = rng.choice(raters), rng.choice(listings)
+            if rng.random() < 0.25:
+                eng.delete_review(r, l)
+            else:
+                eng.add_or_update_review(r, l, rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5))
+            if rng.random() < 0.05:
+                eng.get_listing_summaries(listings)
+    _run([hammer] * THREADS)
+    _check_aggregates(eng)
+    store.close()
+
+    # the log replays to the same state
+    restored = RatingsEngine(store=ReviewStore(data_dir))
+    assert restored.get_listing_summaries(listings) == eng.get_listing_summaries(listings)
+    restored._store.close()
+    print("   ✅ RatingsEngine: unique ids, consistent aggregates, log replays")
+
+def test_social_app_concurrent_reads_and_writes():
+    app = SocialApp(storage="columnar")
+    users = [app.add_user(f"u{n}", random.choice(["USYD", "UNSW"])) for n in range(50)]
+
+    def writer(i):
+        rng = random.Random(i)
+        for n in range(200):
+            app.add_listing(rng.choice(users), f"{rng.choice(['red', 'black'])} dress", "casual", rng.choice(["public", "circle"]))
+            a, b = rng.sample(users, 2)
+            app.follow(a, b)
+            if rng.random() < 0.2:
+                app.unfollow(b, a)
+
+    def reader(i):
+        rng = random.Random(1000 + i)
+        for _ in range(100):
+            u = rng.choice(users)
+            assert len(app.suggest_listings(u, k=5)) <= 5
+            app.suggest_people(u, k=3, w_graph=0.3)
+
+    _run([writer] * (THREADS // 2) + [reader] * (THREADS // 2))
+
+    assert len(app.listings) == (THREADS // 2) * 200
+    assert sorted(app.listings) == list(range(1, len(app.listings) + 1))
+    g = app.graph
+    for a, fs in g.following.items():
+        for b in fs:
+            assert a in g.followers[b]
+    for a, ms in g.mutual.items():
+        for b in ms:
+            assert b in g.following[a] and a in g.following[b]
+    print("   ✅ SocialApp: unique listing ids, consistent follow graph")
+
+def test_ranked_suggestions_while_features_change():
+    app = SocialApp(storage="columnar")
+    app.features = ListingFeatures(capacity=4)   # every new listing id is past capacity
+    users = [app.add_user(f"u{n}", "USYD") for n in range(20)]
+    weights = RankWeights(style=1.0, rating=0.5, popularity=0.2)
+
+    def writer(i):
+        rng = random.Random(i)
+        for n in range(150):
+            lid = app.add_listing(rng.choice(users), "black dress", "casual")
+            before = app.generation
+            app.set_listing_rating(lid, rng.uniform(1, 5), rng.randint(1, 20))
+            app.set_listing_times_rented(lid, rng.randint(0, 9))
+            assert app.generation > before
+
+    def reader(i):
+        rng = random.Random(2000 + i)
+        for _ in range(150):
+            assert len(app.suggest_listings(rng.choice(users), k=5, weights=weights)) <= 5
+
+    _run([writer] * 2 + [reader] * 6)
+    print("   ✅ SocialApp: ranked reads never grow feature columns")
+
+def test_striped_lock_groups_match_per_key_stripes():
+    locks = StripedLock(stripes=8)
+    keys = list(range(1, 200, 3)) + ["a", (1, 2)]
+    groups = locks.groups(keys)
+    assert sorted(map(str, (k for _, ks in groups for k in ks))) == sorted(map(str, keys))
+    assert len({id(lock) for lock, _ in groups}) == len(groups) <= 8
+    assert all(locks(k) is lock for lock, ks in groups for k in ks)
+
+def test_bounded_executor_sheds_and_times_out():
+    release = threading.Event()
+    pool = BoundedExecutor(workers=2, max_pending=3, timeout=0.2)
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert pool.pending == 3
+        try:
+            await pool.run(sum, [1, 2])
+        except Overloaded:
+            pass
+        else:
+            raise AssertionError("a 4th call must be shed")
+        assert pool.rejected == 1
+        results = await asyncio.gather(*blocked, return_exceptions=True)
+        assert all(isinstance(r, asyncio.TimeoutError) for r in results) and pool.timed_out == 3
+        assert pool.pending == 2   # the two running calls hold their slots; the queued one was cancelled
+        release.set()
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.pending == 0
+        assert await pool.run(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+    print("   ✅ BoundedExecutor: sheds past max_pending, times out, frees slots")
+
+if __name__ == "__main__":
+    print("🌿 Concurrency stress test 🌿")
+    test_ratings_engine_concurrent_writes()
+    test_social_app_concurrent_reads_and_writes()
+    test_ranked_suggestions_while_features_change()
+    test_striped_lock_groups_match_per_key_stripes()
+    test_bounded_executor_sheds_and_times_out()
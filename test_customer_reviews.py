@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+RatingsEngine bulk and read paths: ingest_reviews per-row rejection, ranking_scores
+while listings are being added, batch summaries, cursor paging while reviews come
+and go, and the NDJSON export.
+
+Run with pytest or directly: python test_customer_reviews.py
+"""
+
+import itertools
+import json
+import math
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from customer_reviews import RatingsEngine
+
+def _engine():
+    eng = RatingsEngine()
+    owner = eng.add_user("owner", "USYD")
+    rater = eng.add_user("rater", "USYD")
+    lid = eng.add_listing(owner, "Linen shirt")
+    return eng, owner, rater, lid
+
+def test_ingest_rejects_malformed_rows_individually():
+    eng, owner, rater, lid = _engine()
+    ok = dict(rater_id=rater, listing_id=lid, material_construction=4, performance_durability=3, aesthetics_comfort=5)
+    rows = [
+        ok,
+        {**ok, "rater_id": [rater]},                # unhashable ids / scores must not raise
+        {**ok, "listing_id": [lid]},
+        {**ok, "material_construction": [1]},
+        {**ok, "aesthetics_comfort": True},         # bool is not a score
+        {**ok, "rater_id": owner},
+        ["not", "a", "dict"],
+        {**ok, "performance_durability": 5},        # later row for the same review wins
+    ]
+    report = eng.ingest_reviews(rows, chunk_size=1)
+    assert report.applied == 2
+    assert [i for i, _ in report.rejected] == [1, 2, 3, 4, 5, 6]
+    assert eng.get_listing_summary(lid)["avg_performance"] == 5
+
+def test_ingest_chunk_reasons_match_per_call_errors():
+    """One column-wise chunk gives each bad row the reason add_or_update_review would."""
+    eng, owner, rater, lid = _engine()
+    ok = dict(rater_id=rater, listing_id=lid, material_construction=4, performance_durability=3, aesthetics_comfort=5)
+    rows = [
+        {**ok, "comment": "fine"},
+        {k: v for k, v in ok.items() if k != "aesthetics_comfort"},
+        {**ok, "rater_id": 999},
+        {**ok, "listing_id": 2**70},                # beyond int64
+        {**ok, "rater_id": owner},
+        {**ok, "material_construction": 6},
+        {**ok, "updated_at": datetime(2025, 1, 1)}, # naive
+        ["not", "a", "dict"],
+        {**ok, "updated_at": datetime(2025, 1, 1, tzinfo=timezone.utc)},
+    ]
+    report = eng.ingest_reviews(rows)
+    assert report.applied == 2
+    assert report.rejected == [(1, "missing field"), (2, "rater not found"), (3, "listing not found"),
+                               (4, "owners cannot review their own listing"),
+                               (5, "All ratings must be integers in the range 1..5"),
+                               (6, "updated_at must be a timezone-aware datetime"), (7, "missing field")]
+    (review,) = eng.get_reviews_for_listing(lid)
+    assert review.comment == "" and review.updated_at == datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def test_ranking_scores_with_concurrent_listings():
+    eng, owner, rater, lid = _engine()
+    eng.add_or_update_review(rater, lid, 5, 5, 5)
+    def add_listings():
+        for _ in range(3000):
+            eng.add_listing(owner, "Wool coat")
+    t = threading.Thread(target=add_listings)
+    t.start()
+    while t.is_alive():
+        scores = eng.ranking_scores()
+        assert scores[lid] > 3 and math.isnan(scores[0])
+    t.join()
+    scores = eng.ranking_scores("decayed")
+    assert len(scores) == max(eng.listings) + 1 and math.isnan(scores[0])
+
+def _seed(eng, owner, raters=60):
+    """A listing with `raters` reviews whose updated_at ties in threes."""
+    ids = [eng.add_user(f"r{i}", "USYD") for i in range(raters)]
+    lid = eng.add_listing(owner, "Wool coat")
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    eng.ingest_reviews([dict(rater_id=r, listing_id=lid, material_construction=1 + i % 5, performance_durability=3,
+                             aesthetics_comfort=4, updated_at=base + timedelta(hours=i // 3))
+                        for i, r in enumerate(ids)])
+    return lid
+
+def test_summaries_match_single_lookups():
+    eng, owner, rater, lid = _engine()
+    other = _seed(eng, owner)
+    eng.add_or_update_review(rater, lid, 2, 4, 5)
+    empty = eng.add_listing(owner, "Silk scarf")
+    found, missing = eng.get_listing_summaries([other, 10**6, empty, lid, -1])
+    assert list(found) == [other, empty, lid] and missing == [10**6, -1]
+    for l, summary in found.items():
+        assert summary == pytest.approx(eng.get_listing_summary(l))
+    assert found[empty]["count"] == 0 and found[empty]["overall_score"] is None
+
+@pytest.mark.parametrize("newest_first", [True, False])
+def test_pages_visit_every_review_once(newest_first):
+    """Between pages a review is added, an unseen one deleted and the cursor's own review deleted."""
+    eng, owner, rater, _ = _engine()
+    lid = _seed(eng, owner)
+    late = [eng.add_user(f"late{i}", "USYD") for i in range(12)]
+    start = {r.rater_id for r in eng.get_reviews_for_listing(lid)}
+    seen, gone_unseen, cursor = [], set(), None
+    for page_no in itertools.count():
+        page, cursor = eng.get_reviews_page(lid, limit=7, cursor=cursor, newest_first=newest_first)
+        seen += [r.rater_id for r in page]
+        if page_no < len(late):
+            eng.add_or_update_review(late[page_no], lid, 5, 5, 5)
+        unseen = sorted(start - set(seen) - gone_unseen)
+        if unseen:
+            gone_unseen.add(unseen[len(unseen) // 2])
+            assert eng.delete_review(unseen[len(unseen) // 2], lid)
+        if page:
+            eng.delete_review(page[-1].rater_id, lid)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen))
+    assert start - gone_unseen <= set(seen) and not gone_unseen & set(seen)
+    added = set(seen) - start   # new reviews are the newest: only oldest-first paging reaches them
+    assert not added if newest_first else added and added <= set(late)
+    with pytest.raises(ValueError):
+        eng.get_reviews_page(lid, cursor="not a cursor")
+
+def test_export_lines_match_engine():
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import ratings
+
+    eng, owner, rater, lid = _engine()
+    other = _seed(eng, owner)
+    eng.add_or_update_review(rater, lid, 1, 2, 3, "snug")
+    eng.delete_review(rater + 1, other)
+    ratings.eng, real = eng, ratings.eng
+    try:
+        with TestClient(ratings.app) as client:
+            res = client.get("/reviews/export")
+    finally:
+        ratings.eng = real
+    assert res.status_code == 200 and res.headers["content-type"].startswith("application/x-ndjson")
+    lines = res.text.splitlines()
+    expected = [r for l in eng.listings for r in eng.get_reviews_for_listing(l)]
+    assert len(lines) == len(expected) == 60
+    got = {(o["listing_id"], o["rater_id"]): o for o in map(json.loads, lines)}
+    assert len(got) == len(lines)
+    for r in expected:
+        o = got[(r.listing_id, r.rater_id)]
+        assert (o["material_construction"], o["performance_durability"], o["aesthetics_comfort"], o["comment"]) == \
+               (r.material_construction, r.performance_durability, r.aesthetics_comfort, r.comment)
+        assert datetime.fromisoformat(o["updated_at"]) == r.updated_at
+
+if __name__ == "__main__":
+    print("⭐ RatingsEngine bulk path tests ⭐")
+    test_ingest_rejects_malformed_rows_individually()
+    test_ingest_chunk_reasons_match_per_call_errors()
+    test_ranking_scores_with_concurrent_listings()
+    test_summaries_match_single_lookups()
+    test_pages_visit_every_review_once(True)
+    test_pages_visit_every_review_once(False)
+    test_export_lines_match_engine()
+    print("   ✅ ingest_reviews rejects bad rows one by one; ranking_scores is race-free;"
+          " pages and export cover every review once")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+rent_tracker.Item keeps its ratings as a histogram; the legacy constructor
+arguments (avg_item_rating, rating_count) must still round-trip. Batch returns
+reject rentals whose item is gone, row by row, before changing any status.
+
+Run with pytest or directly: python test_rent_tracker.py
+"""
+
+import dataclasses
+from datetime import datetime, timedelta
+
+from rent_tracker import Item, RentalService, RentalStatus, Repo
+
+def test_legacy_aggregates_round_trip():
+    item = Item(id=1, owner_id=2, title="Wool coat")
+    for stars in (5, 4, 4, 2, 5, 3, 1):
+        item.add_rating(stars)
+    legacy = Item(1, 2, "Wool coat", item.times_rented, item.avg_item_rating, item.rating_count)
+    assert (legacy.rating_count, legacy.avg_item_rating) == (item.rating_count, item.avg_item_rating)
+    assert sum(legacy.rating_hist) == legacy.rating_count and legacy.rating_sum == item.rating_sum
+
+    seeded = Item(id=3, owner_id=2, title="Silk scarf", avg_item_rating=4.2, rating_count=5)
+    assert seeded.rating_hist == [0, 0, 0, 4, 1] and seeded.avg_item_rating == 4.2
+    seeded.update_rating(5, 1)
+    assert (seeded.rating_count, seeded.avg_item_rating) == (5, 3.4)
+
+    assert Item(id=4, owner_id=2, title="t", avg_item_rating=9.0, rating_count=2).rating_hist == [0, 0, 0, 0, 2]
+    assert Item(id=5, owner_id=2, title="t", avg_item_rating=3.0, rating_count=0).avg_item_rating == 0.0
+    # an explicit histogram wins over the legacy aggregates, and dataclasses.replace keeps it
+    assert Item(id=6, owner_id=2, title="t", avg_item_rating=1.0, rating_count=9, rating_hist=[0, 0, 1, 0, 1]).rating_count == 2
+    copy = dataclasses.replace(item)
+    assert (copy.rating_hist, copy.rating_sum, copy.rating_sumsq) == (item.rating_hist, item.rating_sum, item.rating_sumsq)
+
+def test_batch_return_rejects_missing_item_per_row():
+    repo = Repo()
+    service = RentalService(repo)
+    start = datetime(2025, 9, 1)
+    items = [repo.create_item(owner_id=1, title=f"item {n}") for n in range(3)]
+    rentals = [repo.create_rental(i.id, renter_id=2, start=start, end=start + timedelta(days=2)).id for i in items]
+    for rid in rentals:
+        service.accept(rid)
+        service.handover(rid)
+    del repo.items[items[1].id]          # e.g. deleted by its owner while rented out
+    result = service.mark_returned_many(rentals)
+    assert result.applied == [rentals[0], rentals[2]]
+    assert result.rejected == [(rentals[1], "Item not found for rental.")]
+    assert repo.get_rental(rentals[1]).status == RentalStatus.RENTED
+    assert [i.times_rented for i in (items[0], items[2])] == [1, 1]
+
+if __name__ == "__main__":
+    print("🧥 rent_tracker Item tests 🧥")
+    test_legacy_aggregates_round_trip()
+    test_batch_return_rejects_missing_item_per_row()
+    print("   ✅ legacy avg_item_rating / rating_count still round-trip; batch returns check items")
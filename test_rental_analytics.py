@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+RentalAnalytics kept up to date from RentalService transitions must match a
+full rebuild from the repo, and the utilization numbers must match the
+rentals' calendar days.
+
+Run with pytest or directly: python test_rental_analytics.py
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from rent_tracker import RentalService, Repo
+from rental_analytics import RentalAnalytics
+
+DAY = timedelta(days=1)
+ORIGIN = date(2025, 1, 1)
+
+def _fleet():
+    repo = Repo()
+    service = RentalService(repo)
+    live = RentalAnalytics.from_repo(repo, ORIGIN, days=120)
+    service.subscribe(live.on_transition)
+    items = []
+    for n in range(4):
+        items.append(repo.create_item(owner_id=100 + n % 2, title=f"item {n}"))
+        live.track_item(items[-1].id)
+    return repo, service, live, items
+
+def test_incremental_matches_rebuild():
+    repo, service, live, items = _fleet()
+    start = datetime(2025, 1, 3, 18, 0)
+    for week in range(8):
+        for n, item in enumerate(items):
+            s = start + (7 * week + n) * DAY
+            rid = repo.create_rental(item.id, renter_id=200 + n, start=s, end=s + (1 + n) * DAY).id
+            stage = (week + n) % 4
+            if stage == 3:
+                service.cancel(rid)
+                continue
+            service.accept(rid)
+            if stage >= 1:
+                service.handover(rid)
+            if stage == 2:
+                service.mark_returned(rid)
+    rebuilt = RentalAnalytics.from_repo(repo, ORIGIN, days=120)
+    assert np.array_equal(live._occ(), rebuilt._occ())
+    assert np.array_equal(live.demand_by_month, rebuilt.demand_by_month)
+    assert np.array_equal(live.demand_by_weekday, rebuilt.demand_by_weekday)
+    assert live.top_items(3) == rebuilt.top_items(3)
+    assert np.allclose(live.rolling_utilization(7), rebuilt.rolling_utilization(7))
+
+def test_utilization_counts_calendar_days():
+    repo, service, live, items = _fleet()
+    # out from Jan 10 18:00 to Jan 12 09:00: touches Jan 10, 11 and 12
+    rid = repo.create_rental(items[0].id, renter_id=7, start=datetime(2025, 1, 10, 18), end=datetime(2025, 1, 12, 9)).id
+    service.accept(rid)
+    assert live.item_utilization(items[0].id) == 0.0   # booked, not out yet
+    service.handover(rid)
+    assert live.item_utilization(items[0].id, date(2025, 1, 10), date(2025, 1, 20)) == 0.3
+    assert live.owner_utilization(100, date(2025, 1, 10), date(2025, 1, 20)) == 3 / 20   # items 0 and 2
+    assert live.owner_utilization(101, date(2025, 1, 10), date(2025, 1, 20)) == 0.0
+    assert live.top_items(1) == [(items[0].id, 3)]
+    assert live.revenue({items[0].id: 12.5}) == 37.5
+    service.mark_returned(rid)
+    assert live.item_utilization(items[0].id, date(2025, 1, 10), date(2025, 1, 20)) == 0.3
+    assert live.demand_by_month[0] == 1 and live.demand_by_weekday[date(2025, 1, 10).weekday()] == 1
+
+if __name__ == "__main__":
+    print("📈 Rental analytics tests 📈")
+    test_incremental_matches_rebuild()
+    test_utilization_counts_calendar_days()
+    print("   ✅ incremental analytics match a rebuild")
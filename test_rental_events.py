@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+EventSourcedRepo projections must not depend on how the state was rebuilt:
+the live repo, a full replay of the log, and a compacted snapshot plus the log
+tail must agree on items (times_rented, ratings), rental statuses and the status
+indexes, the due-date heap, availability, timelines, owner stats and
+time-to-accept. Re-entering the current status is a no-op as in Repo, and
+checkpoints taken while other threads write restore the same state.
+
+Run with pytest or directly: python test_rental_events.py
+"""
+
+import itertools
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from rent_tracker import RentalService, RentalStatus, Repo
+from rental_events import EventSourcedRepo
+from review_store import ReviewStore, read_records
+
+DAY = timedelta(days=1)
+T0 = datetime(2025, 9, 1, 10, 0)
+NOW = datetime(2026, 1, 1)
+
+def _clock():
+    ticks = itertools.count(1_756_000_000.0, 37.5)
+    return lambda: next(ticks)
+
+def _run(repo):
+    """Rentals in every status, some overdue, some ratings replaced."""
+    service = RentalService(repo)
+    items = [repo.create_item(owner_id=100 + n % 3, title=f"item {n}") for n in range(5)]
+    rentals = []
+    for week in range(5):
+        for n, item in enumerate(items):
+            start = T0 + 7 * week * DAY + n * timedelta(hours=2)
+            rentals.append(repo.create_rental(item.id, renter_id=200 + (week + n) % 4,
+                                              start=start, end=start + 3 * DAY).id)
+    for i, rid in enumerate(rentals):
+        stage = i % 5   # 0 pending, 1 accepted, 2 rented (overdue by NOW), 3 returned, 4 cancelled
+        if stage == 4:
+            service.cancel(rid)
+            if i % 2:
+                service.cancel(rid)   # allowed by Repo too: nothing changes
+            continue
+        if stage >= 1:
+            service.accept(rid)
+        if stage >= 2:
+            service.handover(rid)
+        if stage == 3:
+            service.mark_returned(rid)
+        if i % 7 == 0:
+            item = repo.items[repo.rentals[rid].item_id]
+            repo.rate_item(item.id, 1 + i % 5)
+            repo.rate_item(item.id, 4, previous=1 + i % 5)
+    service.mark_returned_many([rid for i, rid in enumerate(rentals) if i % 5 == 2][:3])
+    return rentals
+
+def _state(repo, ordered_indexes=True):
+    """Everything the projections expose. A snapshot rebuilds the status indexes in
+    rental-id order rather than transition order, so compare those as sets then."""
+    by_status = {s: [r.id for r in repo.rentals_with_status(s)] for s in RentalStatus}
+    if not ordered_indexes:
+        by_status = {s: sorted(ids) for s, ids in by_status.items()}
+    return (
+        {i.id: (i.owner_id, i.title, i.times_rented, list(i.rating_hist)) for i in repo.items.values()},
+        {r.id: r.status for r in repo.rentals.values()},
+        repo.count_by_status(),
+        by_status,
+        [r.id for r in repo.overdue_rentals(NOW)],
+        [r.id for r in repo.overdue_rentals(T0 + 30 * DAY)],
+        [i.id for i in repo.available_items(T0 + 14 * DAY, T0 + 15 * DAY)],
+        {rid: dict(times) for rid, times in repo.timeline.items()},
+        {rid: repo.history(rid) for rid in repo.rentals},
+        dict(repo.owners),
+        {owner: repo.owner_utilization(owner, now=1_757_000_000.0) for owner in repo.owners},
+        repo.mean_time_to_accept(),
+        [r.id for r in repo.active_rentals_for_renter(201)],
+    )
+
+def test_replay_matches_live():
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d, snapshot_every=10**9)
+        live = EventSourcedRepo(store=store, clock=_clock())
+        _run(live)
+        store.close()
+        assert os.listdir(d) == ["wal-000000.log"]   # no snapshot: every event is replayed
+        replayed = EventSourcedRepo(store=ReviewStore(d))
+        assert _state(replayed) == _state(live)
+        assert live.mean_time_to_accept() is not None
+        assert sum(i.times_rented for i in live.items.values()) == live.count_by_status()[RentalStatus.RETURNED]
+        replayed._store.close()
+
+def test_snapshot_plus_tail_matches_live():
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d, snapshot_every=40)
+        live = EventSourcedRepo(store=store, clock=_clock())
+        _run(live)
+        store.close()
+        files = sorted(os.listdir(d))
+        assert "snapshot.ndjson" in files
+        tail = [rec for fn in files if fn.startswith("wal-") for rec in read_records(os.path.join(d, fn))]
+        assert tail and {rec["op"] for rec in tail} - {"item"}   # state split across snapshot and log
+        restored = EventSourcedRepo(store=ReviewStore(d))
+        assert _state(restored, ordered_indexes=False) == _state(live, ordered_indexes=False)
+        restored._store.close()
+
+def test_live_matches_plain_repo_counts():
+    """The projection of RETURNED events gives the same times_rented as Repo.complete_rental,
+    and repeated cancels leave the same statuses."""
+    live, plain = EventSourcedRepo(clock=_clock()), Repo()
+    _run(live)
+    _run(plain)
+    assert [i.times_rented for i in live.items.values()] == [i.times_rented for i in plain.items.values()]
+    assert live.count_by_status() == plain.count_by_status()
+    assert {r.id: r.status for r in live.rentals.values()} == {r.id: r.status for r in plain.rentals.values()}
+    assert [i.id for i in live.available_items(T0, T0 + 40 * DAY)] == \
+           [i.id for i in plain.available_items(T0, T0 + 40 * DAY)]
+
+def test_status_is_entered_once():
+    repo = EventSourcedRepo(clock=_clock())
+    item = repo.create_item(owner_id=1, title="Wool coat")
+    rental = repo.create_rental(item.id, renter_id=2, start=T0, end=T0 + DAY)
+    repo.set_status(rental, RentalStatus.ACCEPTED)
+    repo.set_status(rental, RentalStatus.ACCEPTED)   # already there: a no-op, as in Repo
+    repo.set_status(rental, RentalStatus.RENTED)
+    with pytest.raises(ValueError):
+        repo.set_status(rental, RentalStatus.ACCEPTED)
+    assert [s for s, _ in repo.history(rental.id)] == [RentalStatus.PENDING, RentalStatus.ACCEPTED, RentalStatus.RENTED]
+
+def test_checkpoints_during_concurrent_writes():
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d, snapshot_every=25)
+        live = EventSourcedRepo(store=store, clock=_clock())
+        items = [live.create_item(owner_id=1, title=f"item {n}") for n in range(8)]
+        errors = []
+
+        def writer(n):
+            try:
+                service = RentalService(live)
+                item = items[n]
+                for week in range(30):
+                    start = T0 + 7 * week * DAY
+                    rid = live.create_rental(item.id, renter_id=n, start=start, end=start + DAY).id
+                    service.accept(rid)
+                    service.handover(rid)
+                    service.mark_returned(rid)
+                    live.rate_item(item.id, 1 + week % 5)
+            except Exception as e:   # surface worker failures in the main thread
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(len(items))]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        assert not errors, errors
+        store.close()
+        restored = EventSourcedRepo(store=ReviewStore(d))
+        assert _state(restored, ordered_indexes=False) == _state(live, ordered_indexes=False)
+        assert [i.times_rented for i in restored.items.values()] == [30] * len(items)
+        restored._store.close()
+
+if __name__ == "__main__":
+    print("📜 Rental event replay tests 📜")
+    test_replay_matches_live()
+    test_snapshot_plus_tail_matches_live()
+    test_live_matches_plain_repo_counts()
+    test_status_is_entered_once()
+    test_checkpoints_during_concurrent_writes()
+    print("   ✅ live, full replay and snapshot + tail agree")
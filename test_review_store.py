@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+review_store durability: WAL replay, torn-tail truncation, checkpoint + segment
+deletion, and group commit that never holds the log lock (or an engine lock)
+across an fsync.
+
+Run with pytest or directly: python test_review_store.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import review_store
+from customer_reviews import RatingsEngine
+from review_store import ReviewStore, WriteAheadLog, read_records
+
+def _populate(eng, listings=5, raters=8):
+    owner = eng.add_user("owner", "USYD")
+    raters = [eng.add_user(f"r{n}", "USYD") for n in range(raters)]
+    lids = [eng.add_listing(owner, f"listing {n}") for n in range(listings)]
+    for i, lid in enumerate(lids):
+        for j, rid in enumerate(raters):
+            eng.add_or_update_review(rid, lid, 1 + (i + j) % 5, 1 + (i * j) % 5, 1 + j % 5, f"c{i}{j}")
+    eng.delete_review(raters[0], lids[0])
+    return lids
+
+def _summaries(eng):
+    return {lid: eng.get_listing_summary(lid) for lid in eng.listings}
+
+def test_replay_rebuilds_engine():
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d)
+        eng = RatingsEngine(store=store)
+        _populate(eng)
+        store.close()
+        restored = RatingsEngine(store=ReviewStore(d))
+        assert _summaries(restored) == _summaries(eng)
+        assert sorted(restored.users) == sorted(eng.users)
+        restored._store.close()
+
+def test_torn_tail_is_truncated():
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d)
+        eng = RatingsEngine(store=store)
+        _populate(eng)
+        store.close()
+        wal = os.path.join(d, sorted(f for f in os.listdir(d) if f.startswith("wal-"))[-1])
+        good_size = os.path.getsize(wal)
+        with open(wal, "a", encoding="utf-8") as f:
+            f.write('{"op":"review","listing_id":1,"rat')   # crash mid-write
+        restored = RatingsEngine(store=ReviewStore(d))
+        assert os.path.getsize(wal) == good_size
+        assert _summaries(restored) == _summaries(eng)
+        restored._store.close()
+
+def test_checkpoint_drops_covered_segments():
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d, snapshot_every=10)
+        eng = RatingsEngine(store=store)
+        _populate(eng)
+        store.close()
+        files = sorted(os.listdir(d))
+        segments = [f for f in files if f.startswith("wal-")]
+        assert "snapshot.ndjson" in files and len(segments) == 1
+        meta = next(read_records(os.path.join(d, "snapshot.ndjson")))
+        assert segments == [f"wal-{meta['wal_gen']:06d}.log"]
+        restored = RatingsEngine(store=ReviewStore(d))
+        assert _summaries(restored) == _summaries(eng)
+        restored._store.close()
+
+def test_append_reaches_os_and_never_waits_for_fsync(monkeypatch):
+    fsync_started = threading.Event()
+    real_fsync = os.fsync
+    def slow_fsync(fd):
+        fsync_started.set()
+        time.sleep(0.3)
+        real_fsync(fd)
+    monkeypatch.setattr(review_store.os, "fsync", slow_fsync)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "wal-000000.log")
+        wal = WriteAheadLog(path, group_commit_ms=1.0)
+        wal.append({"op": "x", "n": 0})
+        assert os.path.getsize(path) > 0        # in the OS, not a userspace buffer
+        assert fsync_started.wait(2.0)           # flusher is now inside the slow fsync
+        t0 = time.perf_counter()
+        wal.append({"op": "x", "n": 1})
+        assert time.perf_counter() - t0 < 0.1    # not blocked behind it
+        wal.close()
+        assert [r["n"] for r in read_records(path)] == [0, 1]
+
+def test_wait_for_fsync_acknowledges_after_sync(monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    def recording_fsync(fd):
+        real_fsync(fd)
+        synced.append(time.perf_counter())
+    monkeypatch.setattr(review_store.os, "fsync", recording_fsync)
+    with tempfile.TemporaryDirectory() as d:
+        wal = WriteAheadLog(os.path.join(d, "wal-000000.log"), group_commit_ms=1.0, wait_for_fsync=True)
+        wal.append({"op": "x"})
+        acked = time.perf_counter()
+        assert synced and synced[0] <= acked
+        wal.close()
+
+def test_engine_writers_share_fsync_without_holding_locks(monkeypatch):
+    """Same-listing writers with wait_for_fsync: all of them finish in a couple of fsyncs,
+    and reads of that listing never queue behind one."""
+    fsync_s = 0.1
+    real_fsync = os.fsync
+    def slow_fsync(fd):
+        time.sleep(fsync_s)
+        real_fsync(fd)
+    with tempfile.TemporaryDirectory() as d:
+        store = ReviewStore(d, group_commit_ms=1.0, wait_for_fsync=True)
+        eng = RatingsEngine(store=store)
+        owner = eng.add_user("owner", "USYD")
+        raters = [eng.add_user(f"r{n}", "USYD") for n in range(16)]
+        lid = eng.add_listing(owner, "Wool coat")
+        monkeypatch.setattr(review_store.os, "fsync", slow_fsync)
+
+        done = threading.Event()
+        read_waits = []
+        def read():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                eng.get_listing_summary(lid)
+                read_waits.append(time.perf_counter() - t0)
+                time.sleep(0.002)
+        writers = [threading.Thread(target=eng.add_or_update_review, args=(rid, lid, 5, 4, 3)) for rid in raters]
+        reader = threading.Thread(target=read)
+        reader.start()
+        t0 = time.perf_counter()
+        for t in writers:
+            t.start()
+        for t in writers:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        done.set()
+        reader.join()
+
+        assert eng.get_listing_summary(lid)["count"] == 16
+        assert elapsed < 4 * fsync_s           # one lock-serialized fsync each would be 16
+        assert max(read_waits) < fsync_s / 2
+        store.close()
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Point-to-point searches in dijkstra_algorithm must agree with dijkstra():
+A*, bidirectional Dijkstra and the CSR variant, on random road-like graphs
+(two-way and with one-way streets).
+
+Run with pytest or directly: python test_routing.py
+"""
+
+import math
+import random
+
+import pytest
+
+from dijkstra_algorithm import (Graph, astar, bidirectional_dijkstra, dijkstra, dijkstra_csr,
+                                distance_matrix, haversine_km, shortest_paths)
+
+SEARCHES = [astar, bidirectional_dijkstra]
+
+def _random_city(seed, nodes=400, one_way=0.0):
+    """Random points around Sydney, each linked to a few near neighbours; km >= straight line."""
+    rng = random.Random(seed)
+    g = Graph()
+    for n in range(nodes):
+        g.set_coords(n, -33.87 + rng.uniform(-0.05, 0.05), 151.21 + rng.uniform(-0.05, 0.05))
+        g.adj.setdefault(n, [])
+    for u in range(nodes):
+        near = sorted(range(nodes), key=lambda v: haversine_km(g.coords[u], g.coords[v]))[1:4]
+        for v in near:
+            km = haversine_km(g.coords[u], g.coords[v]) * rng.uniform(1.0, 1.5)
+            g.add_edge(u, v, km, bidirectional=rng.random() >= one_way)
+    return g
+
+def _pairs(g, seed, count=60):
+    rng = random.Random(seed)
+    nodes = list(g.adj)
+    return [tuple(rng.sample(nodes, 2)) for _ in range(count)]
+
+def _reference(g, s, t):
+    try:
+        return dijkstra(g, s, t)
+    except ValueError:
+        return None
+
+@pytest.mark.parametrize("one_way", [0.0, 0.3])
+def test_same_distances_as_dijkstra(one_way):
+    g = _random_city(seed=7, one_way=one_way)
+    csr = g.freeze()
+    checked = 0
+    for s, t in _pairs(g, seed=11):
+        ref = _reference(g, s, t)
+        for search in SEARCHES + [lambda g_, s_, t_: dijkstra_csr(csr, s_, t_)]:
+            if ref is None:
+                with pytest.raises(ValueError):
+                    search(g, s, t)
+                continue
+            got = search(g, s, t)
+            assert got.distance_km == ref.distance_km
+            assert got.path[0] == s and got.path[-1] == t
+            checked += 1
+    assert checked > 0
+
+def test_astar_and_bidirectional_settle_fewer_nodes():
+    g = _random_city(seed=3, nodes=900)
+    totals = {"dijkstra": 0, "astar": 0, "bidirectional": 0}
+    for s, t in _pairs(g, seed=5, count=30):
+        if _reference(g, s, t) is None:
+            continue
+        totals["dijkstra"] += dijkstra(g, s, t).settled
+        totals["astar"] += astar(g, s, t).settled
+        totals["bidirectional"] += bidirectional_dijkstra(g, s, t).settled
+    assert totals["astar"] < totals["dijkstra"]
+    assert totals["bidirectional"] < totals["dijkstra"]
+
+def test_route_result_fields():
+    g = _random_city(seed=1, nodes=50)
+    s, t = _pairs(g, seed=2, count=1)[0]
+    ref = dijkstra(g, s, t, emission_rate_kg_per_km=0.18)
+    for search in SEARCHES:
+        got = search(g, s, t, emission_rate_kg_per_km=0.18)
+        assert got.emissions_kg == pytest.approx(ref.emissions_kg)
+        assert sum(min(w for v, w in g.adj[a] if v == b) for a, b in zip(got.path, got.path[1:])) \
+            == pytest.approx(got.distance_km)
+        assert search(g, s, s).path == [s] and search(g, s, s).distance_km == 0.0
+
+def test_distance_matrix_matches_pairwise():
+    g = _random_city(seed=9, nodes=200, one_way=0.2)
+    rng = random.Random(4)
+    sources, targets = rng.sample(list(g.adj), 5), rng.sample(list(g.adj), 7)
+    m = distance_matrix(g, sources, targets)
+    for i, s in enumerate(sources):
+        tree = shortest_paths(g, s, targets)
+        for j, t in enumerate(targets):
+            ref = _reference(g, s, t)
+            assert m[i, j] == (ref.distance_km if ref else math.inf) == tree.distance(t)
+
+if __name__ == "__main__":
+    print("🧭 Routing equivalence tests 🧭")
+    for one_way in (0.0, 0.3):
+        test_same_distances_as_dijkstra(one_way)
+    test_astar_and_bidirectional_settle_fewer_nodes()
+    test_route_result_fields()
+    test_distance_matrix_matches_pairwise()
+    print("   ✅ A*, bidirectional and CSR Dijkstra match dijkstra()")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+SocialApp snapshots: save -> load (memory-mapped) -> mutate -> save over the same
+directory -> load must give back exactly the live app's state.
+
+Run with pytest or directly: python test_snapshot.py
+"""
+
+import os
+import random
+import tempfile
+
+from social_style import SocialApp, STYLES, COLORS, SEASONS, FITS
+
+def _build(users=40, listings=1500, seed=0):
+    rng = random.Random(seed)
+    app = SocialApp(storage="columnar")
+    uids = [app.add_user(f"user {i}", rng.choice(["usyd", "unsw", "uts"])) for i in range(users)]
+    for uid in uids:
+        app.take_style_quiz(uid, rng.sample(STYLES, 2), rng.sample(COLORS, 2), rng.sample(SEASONS, 1), rng.sample(FITS, 1))
+    words = STYLES + COLORS + SEASONS + FITS
+    app.add_listings((rng.choice(uids), " ".join(rng.sample(words, 3)).title(), " ".join(rng.sample(words, 6)), "public")
+                     for _ in range(listings))
+    for _ in range(users * 3):
+        a, b = rng.sample(uids, 2)
+        app.follow(a, b)
+    return app
+
+def _state(app):
+    uids = sorted(app.users)
+    return (
+        sorted((u.user_id, u.name, u.circle, u.quiz_vec.tolist(), u.quiz_answers) for u in app.users.values()),
+        sorted((l.listing_id, l.owner_id, l.title, l.vec.tolist()) for l in app.listings.values()),
+        {u: sorted(app.following.get(u, ())) for u in uids},
+        [app.suggest_people(u, k=3) for u in uids[:5]],
+        [app.suggest_listings(u, k=5) for u in uids[:5]],
+    )
+
+def test_resave_over_loaded_snapshot():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "snap")
+        live = _build()
+        live.save(path)
+        loaded = SocialApp.load(path)   # mmap'd from the files save() is about to replace
+        assert _state(loaded) == _state(live)
+        loaded.save(path)               # still backed by those mmaps: nothing copied yet
+        assert _state(loaded) == _state(live)
+        loaded = SocialApp.load(path)
+        assert _state(loaded) == _state(live)
+
+        for app in (live, loaded):
+            uid = app.add_user("late joiner", "usyd")
+            app.take_style_quiz(uid, ["vintage"], ["black"], ["winter"], ["oversized"])
+            app.take_style_quiz(1, ["streetwear"], ["white"], ["summer"], ["relaxed"])
+            app.add_listing(uid, "Vintage Black Coat", "oversized winter coat")
+            app.follow(uid, 1)
+        assert _state(loaded) == _state(live)
+
+        loaded.save(path)
+        assert _state(loaded) == _state(live)   # the mmaps it was loaded from are still intact
+        again = SocialApp.load(path)
+        assert _state(again) == _state(live)
+        assert sorted(os.listdir(d)) == ["snap"]   # no temp directories left behind
+
+if __name__ == "__main__":
+    print("💾 Snapshot round-trip test 💾")
+    test_resave_over_loaded_snapshot()
+    print("   ✅ save -> load -> mutate -> save -> load round-trips")
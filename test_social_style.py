@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+SocialApp behaves the same with storage="dict" and storage="columnar": listings
+lookups and iteration, privacy, and suggest_listings / suggest_people results;
+top-k selection keeps ties in listing order. sync_features maps engine and repo
+ids onto the app's and fetches before taking the write lock. Only writes that
+change something move the generation that result caches key on. texts_to_matrix
+gives the same rows as text_to_vec.
+
+Run with pytest or directly: python test_social_style.py
+"""
+
+import math
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from customer_reviews import RatingsEngine
+from rent_tracker import Repo
+from result_cache import ResultCache
+from social_style import (COLORS, FITS, SEASONS, STYLES, TYPES, RankWeights, SocialApp, text_to_vec,
+                          texts_to_matrix)
+
+def _build(storage, seed=0, users=30, listings=600):
+    rng = random.Random(seed)
+    app = SocialApp(storage=storage)
+    uids = [app.add_user(f"user {i}", rng.choice(["usyd", "unsw"])) for i in range(users)]
+    for uid in uids[: users // 2]:
+        app.take_style_quiz(uid, rng.sample(STYLES, 2), rng.sample(COLORS, 2), rng.sample(SEASONS, 1), rng.sample(FITS, 1))
+    words = TYPES[:4] + STYLES[:4] + COLORS[:4]   # a small vocabulary: plenty of tied scores
+    rows = [(rng.choice(uids), " ".join(rng.sample(words, 2)), " ".join(rng.sample(words, 2)),
+             rng.choice(["public", "circle"])) for _ in range(listings)]
+    app.add_listings(rows[: listings // 2])
+    for row in rows[listings // 2:]:
+        app.add_listing(*row)
+    for lid in range(1, listings, 7):
+        app.set_listing_privacy(lid, "public" if lid % 2 else "circle")
+    for _ in range(users * 2):
+        a, b = rng.sample(uids, 2)
+        app.follow(a, b)
+    return app, uids
+
+def test_columnar_matches_dict():
+    (d, uids), (c, _) = _build("dict"), _build("columnar")
+    assert len(c.listings) == len(d.listings) and list(c.listings) == list(d.listings)
+    for lid in (1, 2, 300, len(d.listings)):
+        a, b = d.listings[lid], c.listings[lid]
+        assert (a.listing_id, a.owner_id, a.title, a.description, a.privacy) == \
+               (b.listing_id, b.owner_id, b.title, b.description, b.privacy)
+        assert np.array_equal(a.vec, b.vec)
+    assert 0 not in c.listings and len(d.listings) + 1 not in c.listings and "1" not in c.listings
+    with pytest.raises(KeyError):
+        c.listings[len(d.listings) + 1]
+    assert c.listings.get(10**6) is None
+    assert [l.listing_id for l in c.listings.values()] == [l.listing_id for l in d.listings.values()]
+    assert [lid for lid, _ in c.listings.items()] == list(d.listings)
+
+    weights = RankWeights(style=1.0, rating=0.5, popularity=0.2)
+    for app in (d, c):
+        for lid in range(1, len(app.listings), 5):
+            app.set_listing_rating(lid, 1 + lid % 5, lid % 9)
+            app.set_listing_times_rented(lid, lid % 4)
+    for uid in uids:
+        assert [l.listing_id for l in c.visible_listings_for(uid)] == [l.listing_id for l in d.visible_listings_for(uid)]
+        # the batched float32 scores can differ from the per-listing ones in the last rounded digit
+        full_c, full_d = c.suggest_listings(uid, k=10_000), d.suggest_listings(uid, k=10_000)
+        assert len(full_c) == len(full_d)
+        got = {lid: score for lid, _, _, score in full_c}
+        assert all(got[lid] == pytest.approx(score, abs=2e-4) for lid, _, _, score in full_d)
+        for k in (1, 5, 40):   # top-k selection keeps the full sort's order, ties included
+            assert c.suggest_listings(uid, k=k) == full_c[:k]
+        ranked = c.suggest_listings(uid, k=10_000, weights=weights, candidates=50)
+        assert c.suggest_listings(uid, k=8, weights=weights, candidates=50) == ranked[:8]
+        assert c.suggest_people(uid, k=5) == d.suggest_people(uid, k=5)
+
+def test_columnar_records_write_through():
+    app, uids = _build("columnar", listings=20)
+    rec = app.listings[3]
+    assert rec == app.listings[3] and hash(rec) == hash(app.listings[3])
+    rec.title = "renamed"
+    rec.vec = np.ones_like(rec.vec) / np.sqrt(rec.vec.size)
+    assert app.listings[3].title == "renamed"
+    assert np.allclose(app.listings[3].vec, rec.vec)
+    lid = app.add_listing(uids[0], "late coat", "wool winter")
+    assert app.listings[lid].title == "late coat" and lid in app.listings
+
+def test_sync_features_maps_ids_and_fetches_unlocked():
+    app, uids = _build("columnar", listings=6)
+    eng, repo = RatingsEngine(), Repo()
+    owner, rater = eng.add_user("owner", "USYD"), eng.add_user("rater", "USYD")
+    for _ in range(10):   # engine ids 1..10; only 7 and 9 are this app's listings (3 and 5)
+        eng.add_listing(owner, "coat")
+    eng.add_or_update_review(rater, 7, 5, 5, 5)
+    eng.add_or_update_review(rater, 9, 1, 1, 1)
+    items = [repo.create_item(owner_id=1, title=f"item {n}") for n in range(4)]
+    items[2].times_rented = 6
+
+    fetch = eng.get_listing_summaries
+    readers = []
+    def fetch_while_reading(ids):
+        reader = threading.Thread(target=lambda: readers.append(app.suggest_listings(uids[0], k=3)))
+        reader.start(); reader.join(timeout=5)   # would block if the write lock were held
+        return fetch(ids)
+    eng.get_listing_summaries = fetch_while_reading
+    app.sync_features(ratings=eng, rentals=repo, rating_ids={3: 7, 5: 9, 6: 99}, rental_ids={4: items[2].id})
+    assert len(readers) == 1
+
+    f = app.features
+    assert (f.overall[3], f.review_count[3], f.overall[5]) == (5.0, 1, 1.0)
+    assert math.isnan(f.overall[6]) and math.isnan(f.overall[7]) and f.review_count[7] == 0
+    assert (f.times_rented[4], f.times_rented[items[2].id]) == (6, 0)
+
+def test_failed_and_noop_writes_keep_cache_valid():
+    app, uids = _build("dict", users=4, listings=4)
+    a, b = uids[0], uids[1]
+    app.unfollow(a, b)
+    cache = ResultCache(ttl=None)
+    cache.put("top", app.generation, app.suggest_listings(a, k=2))
+    for write in (lambda: app.follow(a, 10**6), lambda: app.add_listing(10**6, "coat", ""),
+                  lambda: app.set_listing_privacy(10**6, "public")):
+        with pytest.raises(ValueError):
+            write()
+    app.follow(a, a)
+    assert app.unfollow(a, b) is False
+    assert cache.get("top", app.generation) is not None
+    app.follow(a, b)
+    assert cache.get("top", app.generation) is None
+    cache.put("top", app.generation, app.suggest_listings(a, k=2))
+    app.follow(a, b)                     # already following
+    assert cache.get("top", app.generation) is not None
+    assert app.unfollow(a, b) is True
+    assert cache.get("top", app.generation) is None
+
+def test_texts_to_matrix_matches_text_to_vec():
+    texts = ["Black linen DRESS, casual summer", "", "no known words here", "red\nred red", "dress\n\ncoat",
+             "minimalist-black_boho 42 Dress"]
+    M = texts_to_matrix(texts)
+    assert M.dtype == np.float32 and M.shape == (len(texts), len(text_to_vec("")))
+    for row, text in zip(M, texts):
+        assert np.allclose(row, text_to_vec(text), atol=1e-6)
+    assert texts_to_matrix([]).shape == (0, M.shape[1])
+
+if __name__ == "__main__":
+    print("🧵 SocialApp storage tests 🧵")
+    test_columnar_matches_dict()
+    test_columnar_records_write_through()
+    test_sync_features_maps_ids_and_fetches_unlocked()
+    test_failed_and_noop_writes_keep_cache_valid()
+    test_texts_to_matrix_matches_text_to_vec()
+    print("   ✅ columnar storage matches dict storage")
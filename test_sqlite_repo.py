@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SqliteRepo behind RentalService must behave like the in-memory Repo: same
+times_rented, statuses and ratings, plus optimistic-conflict errors, booking
+overlap checks, persistence across reopen, and an item cache that never keeps
+a row a concurrent write has replaced and tracks only the reads in flight.
+
+Run with pytest or directly: python test_sqlite_repo.py
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+import sqlite_repo
+from rent_tracker import RentalService, RentalStatus, Repo
+from sqlite_repo import ConcurrentUpdateError, SqliteRepo
+
+DAY = timedelta(days=1)
+T0 = datetime(2025, 9, 1, 10, 0)
+
+def _scenario(repo):
+    """The same RentalService traffic for any repo; returns what should match."""
+    service = RentalService(repo)
+    items = [repo.create_item(owner_id=100 + n % 3, title=f"item {n}") for n in range(6)]
+    rentals = []
+    for week in range(4):
+        for n, item in enumerate(items):
+            start = T0 + 7 * week * DAY + n * timedelta(hours=1)
+            rentals.append(repo.create_rental(item.id, renter_id=200 + n, start=start, end=start + 3 * DAY).id)
+    for rid in rentals[:6]:              # one at a time
+        service.accept(rid)
+        service.handover(rid)
+        service.mark_returned(rid)
+    batch = rentals[6:18]                # batches, with bad and duplicate ids mixed in
+    accepted = service.accept_many(batch + [batch[0], 10_000])
+    handed = service.handover_many(batch[:9] + [rentals[20]])
+    returned = service.mark_returned_many(batch[:6])
+    service.accept(rentals[20])
+    service.cancel(rentals[20])
+    service.cancel(rentals[21])
+    for n, item in enumerate(items):
+        repo.rate_item(item.id, 1 + n % 5)
+        repo.rate_item(item.id, 5)
+    repo.rate_item(items[0].id, 2, previous=5)
+    return (
+        [(i.owner_id, i.title, i.times_rented, list(i.rating_hist)) for i in repo.items.values()],
+        [repo.get_rental(rid).status for rid in rentals],
+        repo.count_by_status(),
+        [(r.applied, r.rejected) for r in (accepted, handed, returned)],
+        [r.id for r in repo.overdue_rentals(T0 + 60 * DAY)],
+        [i.id for i in repo.available_items(T0, T0 + DAY)],
+        [[r.id for r in repo.rentals_for_renter(200 + n, [RentalStatus.RETURNED, RentalStatus.CANCELLED])]
+         + [r.id for r in repo.active_rentals_for_renter(200 + n)] for n in range(6)],
+    )
+
+@pytest.fixture
+def db_path():
+    with tempfile.TemporaryDirectory() as d:
+        yield os.path.join(d, "rentals.db")
+
+def test_matches_in_memory_repo(db_path):
+    repo = SqliteRepo(db_path)
+    assert _scenario(repo) == _scenario(Repo())
+    repo.close()
+
+def test_state_survives_reopen(db_path):
+    repo = SqliteRepo(db_path)
+    expected = _scenario(repo)
+    before = ([i.times_rented for i in repo.items.values()], repo.count_by_status())
+    repo.close()
+    reopened = SqliteRepo(db_path)
+    assert ([i.times_rented for i in reopened.items.values()], reopened.count_by_status()) == before
+    assert before[1] == expected[2]
+    reopened.close()
+
+def test_stale_rental_raises_concurrent_update(db_path):
+    repo = SqliteRepo(db_path)
+    item = repo.create_item(owner_id=1, title="Wool coat")
+    rid = repo.create_rental(item.id, renter_id=2, start=T0, end=T0 + DAY).id
+    first, second = repo.get_rental(rid), repo.get_rental(rid)   # two workers read PENDING
+    repo.set_status(first, RentalStatus.ACCEPTED)
+    with pytest.raises(ConcurrentUpdateError):
+        repo.set_status(second, RentalStatus.CANCELLED)
+    assert repo.get_rental(rid).status == RentalStatus.ACCEPTED
+    repo.set_status(first, RentalStatus.RENTED)
+    with pytest.raises(ConcurrentUpdateError):
+        repo.complete_rental(second)
+    assert repo.get_item(item.id).times_rented == 0
+    assert repo.set_status_many([second], RentalStatus.CANCELLED) == [rid]
+    assert repo.complete_rentals([first]) == []
+    assert repo.get_item(item.id).times_rented == 1
+    repo.close()
+
+def test_overlapping_booking_rejected(db_path):
+    repo = SqliteRepo(db_path)
+    item = repo.create_item(owner_id=1, title="Wool coat")
+    first = repo.create_rental(item.id, renter_id=2, start=T0, end=T0 + 3 * DAY)
+    with pytest.raises(ValueError, match="already booked"):
+        repo.create_rental(item.id, renter_id=3, start=T0 + DAY, end=T0 + 4 * DAY)
+    repo.create_rental(item.id, renter_id=3, start=T0 + 3 * DAY, end=T0 + 4 * DAY)   # touching is fine
+    repo.set_status(first, RentalStatus.CANCELLED)                                   # frees the dates
+    repo.create_rental(item.id, renter_id=4, start=T0 + DAY, end=T0 + 2 * DAY)
+    with pytest.raises(ValueError):
+        repo.create_rental(item.id, renter_id=4, start=T0, end=T0)
+    repo.close()
+
+def test_cache_never_keeps_row_read_before_a_write(db_path, monkeypatch):
+    repo = SqliteRepo(db_path)
+    item = repo.create_item(owner_id=1, title="Wool coat")
+    real_item = sqlite_repo._item
+    raced = []
+    def write_between_select_and_fill(row):
+        if not raced:                    # the reader has its row; a writer commits and evicts now
+            raced.append(True)
+            repo.rate_item(item.id, 5)
+        return real_item(row)
+    monkeypatch.setattr(sqlite_repo, "_item", write_between_select_and_fill)
+    stale = repo.get_item(item.id)
+    assert stale.rating_count == 0
+    assert repo.get_item(item.id).rating_hist == [0, 0, 0, 0, 1]
+    repo.close()
+
+def test_cache_bookkeeping_only_for_reads_in_flight(db_path):
+    repo = SqliteRepo(db_path, item_cache_size=8)
+    items = [repo.create_item(owner_id=1, title=f"item {n}") for n in range(100)]
+    for item in items:
+        repo.rate_item(item.id, 4)
+        assert repo.get_item(item.id).rating_count == 1
+    assert repo.get_item(10_000) is None
+    assert repo._item_reads == {} and len(repo._item_cache) == 8
+    repo.close()
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))